@@ -3,36 +3,85 @@ Configuração de conexão com PostgreSQL - BullBot Telegram
 """
 
 import os
+import time
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from src.database.models import Base
+from src.utils.metrics import DB_QUERY_SECONDS
 
 
 # URL de conexão PostgreSQL
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 
+# Engine e session factory são criados no primeiro uso: processos que nunca
+# tocam o banco (beat, filhos recém-criados do pool) não pagam por eles
+_engine = None
+_session_factory = None
+
+
+def get_engine():
+    """Obter engine do SQLAlchemy, criando-o na primeira chamada"""
+    global _engine
+
+    if _engine is None:
+        # Set echo to True for SQL debugging
+        _engine = create_engine(
+            DATABASE_URL,
+            pool_pre_ping=True,
+            pool_recycle=300,
+            echo=False,
+        )
+        event.listen(_engine, "before_cursor_execute", _start_query_timer)
+        event.listen(_engine, "after_cursor_execute", _observe_query_time)
+
+    return _engine
+
+
+def get_session_factory():
+    """Obter session factory ligada ao engine"""
+    global _session_factory
+
+    if _session_factory is None:
+        _session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=get_engine()
+        )
+
+    return _session_factory
+
+
+def dispose_engine_after_fork():
+    """
+    Descartar conexões herdadas do processo pai após um fork
+
+    As conexões continuam abertas no pai; o filho abre as suas no primeiro uso.
+    """
+    if _engine is not None:
+        _engine.dispose(close=False)
+
+
 def get_db():
     """Dependency para obter sessão do banco"""
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
         db.close()
 
 
-# Engine do SQLAlchemy - Set to True for SQL debugging
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=False,
-)
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started_at"] = time.perf_counter()
+
+
+def _observe_query_time(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started_at", None)
+    if started is not None:
+        DB_QUERY_SECONDS.labels(statement=statement.split(None, 1)[0].upper()).observe(
+            time.perf_counter() - started
+        )
 
 
 def create_tables():
     """Criar todas as tabelas"""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
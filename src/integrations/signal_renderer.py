@@ -0,0 +1,290 @@
+"""
+Renderização de mensagens de sinais - BullBot Telegram
+Templates pré-compilados e cache por sinal para renderizar uma vez por sinal
+"""
+
+from collections import OrderedDict
+from string import Formatter
+from typing import Dict, Any, List, Optional, Tuple
+from src.utils.config import settings
+from src.utils.logger import get_logger
+from src.utils.price_formatter import format_crypto_price
+
+logger = get_logger(__name__)
+
+# Emojis por tipo de sinal
+SIGNAL_EMOJI = {
+    "BUY": "🚀🟢",
+    "SELL": "📉🔴",
+    "HOLD": "⏸️🟡",
+}
+
+# Emoji de força
+STRENGTH_EMOJI = {
+    "STRONG": "💪",
+    "MODERATE": "👍",
+    "WEAK": "👌",
+}
+
+SIGNAL_TEMPLATE = """{signal_emoji} <b>SINAL DE TRADING</b> {signal_emoji}
+
+{strength_icon} <b>{symbol}</b> - {strength}
+💰 Preço: {price}
+📊 RSI: {rsi_value:.1f}
+⏰ Timeframe: {timeframe}
+🔗 Fonte: {source}
+
+{message}
+
+{footer}"""
+
+# Variantes de template: envio individual (assinantes) e grupo fixo
+TEMPLATE_FOOTERS = {
+    "user": "<i>🤖 BullBot Signals</i>",
+    "group": "🔔 <i>BullBot Signals</i>",
+}
+
+DEFAULT_VARIANT = "user"
+
+# Limite de caracteres de uma mensagem do Telegram
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+STALE_SUMMARY_HEADER = "⏳ <b>SINAIS EXPIRADOS</b> ({count})"
+DIGEST_HEADER = "📬 <b>RESUMO DE SINAIS</b> ({count})"
+DIGEST_LINE_TEMPLATE = (
+    "{signal_emoji} <b>{symbol}</b> {timeframe} - {strength_icon} {strength}\n"
+    "    💰 {price} | 📊 RSI: {rsi_value:.1f}"
+)
+
+
+def _compile_template(template: str):
+    """Pré-processar o template uma única vez em (texto, campo, formato)"""
+    return [
+        (literal, field, spec)
+        for literal, field, spec, _ in Formatter().parse(template)
+    ]
+
+
+_COMPILED_SIGNAL_TEMPLATE = _compile_template(SIGNAL_TEMPLATE)
+_COMPILED_DIGEST_LINE = _compile_template(DIGEST_LINE_TEMPLATE)
+
+
+def _apply_template(compiled, values: Dict[str, Any]) -> str:
+    """Montar mensagem a partir do template pré-compilado"""
+    parts = []
+    for literal, field, spec in compiled:
+        parts.append(literal)
+        if field is not None:
+            parts.append(format(values[field], spec))
+    return "".join(parts)
+
+
+def _telegram_length(text: str) -> int:
+    """Tamanho da mensagem em unidades UTF-16, como o Telegram conta"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def extract_rsi_value(indicator_data: Optional[Dict[str, Any]]) -> float:
+    """
+    Obter valor do RSI dos dados do indicador
+
+    Aceita os formatos {"rsi_value": x}, {"RSI": {"value": x}} e o detalhamento
+    do sistema de confluência.
+    """
+    if not indicator_data:
+        return 0
+
+    if indicator_data.get("rsi_value") is not None:
+        return indicator_data["rsi_value"]
+
+    rsi = indicator_data.get("RSI")
+    if isinstance(rsi, dict) and rsi.get("value") is not None:
+        return rsi["value"]
+
+    details = indicator_data.get("confluence_score", {}).get("details", {})
+    rsi = details.get("RSI")
+    if isinstance(rsi, dict) and rsi.get("value") is not None:
+        return rsi["value"]
+
+    return 0
+
+
+class SignalRenderer:
+    """Renderiza mensagens de sinais com cache por (signal_id, variante)"""
+
+    def __init__(self, max_cache_size: Optional[int] = None):
+        self.logger = logger
+        self._max_cache_size = max_cache_size
+        self._cache: "OrderedDict[Tuple[Any, str], str]" = OrderedDict()
+
+    @property
+    def max_cache_size(self) -> int:
+        """Tamanho do cache; sem valor explícito, lido das configurações no primeiro uso"""
+        if self._max_cache_size is None:
+            self._max_cache_size = settings.signal_render_cache_size
+        return self._max_cache_size
+
+    def render(
+        self, signal_data: Dict[str, Any], variant: str = DEFAULT_VARIANT
+    ) -> str:
+        """
+        Renderizar mensagem do sinal
+
+        Destinatários do mesmo sinal e variante compartilham a mesma string.
+
+        Args:
+            signal_data: Dados do sinal
+            variant: Variante do template ("user" ou "group")
+
+        Returns:
+            Mensagem HTML pronta para envio
+        """
+        signal_id = signal_data.get("id")
+        cache_key = (signal_id, variant)
+
+        if signal_id is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+
+        message = self._render(signal_data, variant)
+
+        if signal_id is not None:
+            self._cache[cache_key] = message
+            if len(self._cache) > self.max_cache_size:
+                self._cache.popitem(last=False)
+
+        return message
+
+    def _render(self, signal_data: Dict[str, Any], variant: str) -> str:
+        """Renderizar mensagem sem cache"""
+        try:
+            signal_type = signal_data.get("signal_type") or "UNKNOWN"
+            strength = signal_data.get("strength") or "UNKNOWN"
+
+            values = {
+                "signal_emoji": SIGNAL_EMOJI.get(signal_type.upper(), "📊"),
+                "strength_icon": STRENGTH_EMOJI.get(strength.upper(), "📊"),
+                "symbol": signal_data.get("symbol", "UNKNOWN"),
+                "strength": strength,
+                "price": format_crypto_price(signal_data.get("price", 0)),
+                "rsi_value": extract_rsi_value(signal_data.get("indicator_data")),
+                "timeframe": signal_data.get("timeframe", "UNKNOWN"),
+                "source": signal_data.get("source", "UNKNOWN"),
+                "message": signal_data.get("message") or "",
+                "footer": TEMPLATE_FOOTERS.get(
+                    variant, TEMPLATE_FOOTERS[DEFAULT_VARIANT]
+                ),
+            }
+
+            return _apply_template(_COMPILED_SIGNAL_TEMPLATE, values).strip()
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao formatar mensagem: {e}")
+            return f"Sinal: {signal_data.get('symbol', 'N/A')} {signal_data.get('signal_type', 'N/A')}"
+
+    def render_digest(self, signals: List[Dict[str, Any]]) -> List[str]:
+        """
+        Renderizar resumo de vários sinais para um chat
+
+        Args:
+            signals: Sinais do resumo (formato compacto do buffer)
+
+        Returns:
+            Lista de mensagens, cada uma dentro do limite do Telegram
+        """
+        return [message for message, _ in self.render_digest_parts(signals)]
+
+    def render_digest_parts(
+        self, signals: List[Dict[str, Any]]
+    ) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Renderizar resumo mantendo os sinais de cada mensagem
+
+        Returns:
+            Lista de (mensagem, sinais da mensagem), na ordem de envio; em
+            falha parcial só os sinais das mensagens não enviadas voltam ao buffer
+        """
+        footer = TEMPLATE_FOOTERS[DEFAULT_VARIANT]
+        # Reserva para cabeçalho, rodapé e separadores
+        budget = TELEGRAM_MESSAGE_LIMIT - _telegram_length(footer) - 64
+
+        chunks = []
+        current = []
+        current_signals = []
+        current_size = 0
+
+        for signal in signals:
+            line = self._render_digest_line(signal)
+            line_size = _telegram_length(line) + 2
+            if current and current_size + line_size > budget:
+                chunks.append((current, current_signals))
+                current = []
+                current_signals = []
+                current_size = 0
+            current.append(line)
+            current_signals.append(signal)
+            current_size += line_size
+
+        if current:
+            chunks.append((current, current_signals))
+
+        return [
+            (
+                "\n\n".join([DIGEST_HEADER.format(count=len(lines)), *lines, footer]),
+                chunk_signals,
+            )
+            for lines, chunk_signals in chunks
+        ]
+
+    def _render_digest_line(self, signal: Dict[str, Any]) -> str:
+        """Renderizar uma linha do resumo"""
+        signal_type = signal.get("signal_type") or "UNKNOWN"
+        strength = signal.get("strength") or "UNKNOWN"
+
+        return _apply_template(
+            _COMPILED_DIGEST_LINE,
+            {
+                "signal_emoji": SIGNAL_EMOJI.get(signal_type.upper(), "📊"),
+                "strength_icon": STRENGTH_EMOJI.get(strength.upper(), "📊"),
+                "symbol": signal.get("symbol", "UNKNOWN"),
+                "timeframe": signal.get("timeframe", "UNKNOWN"),
+                "strength": strength,
+                "price": format_crypto_price(signal.get("price") or 0),
+                "rsi_value": signal.get("rsi_value") or 0,
+            },
+        )
+
+    def render_stale_summary(self, stale_signals: List[Tuple[str, str]]) -> str:
+        """
+        Renderizar resumo único dos sinais descartados por idade
+
+        Args:
+            stale_signals: Lista de (timeframe, symbol)
+        """
+        by_timeframe: Dict[str, Dict[str, int]] = {}
+        for timeframe, symbol in stale_signals:
+            symbols = by_timeframe.setdefault(timeframe, {})
+            symbols[symbol] = symbols.get(symbol, 0) + 1
+
+        lines = [
+            STALE_SUMMARY_HEADER.format(count=len(stale_signals)),
+            "Sinais não enviados por terem passado do prazo de validade:",
+        ]
+        for timeframe, symbols in sorted(by_timeframe.items()):
+            top_symbols = sorted(symbols, key=symbols.get, reverse=True)[:10]
+            lines.append(
+                f"• <b>{timeframe}</b>: {sum(symbols.values())} ({', '.join(top_symbols)})"
+            )
+        lines.append(TEMPLATE_FOOTERS["group"])
+
+        return "\n".join(lines)
+
+    def clear(self):
+        """Limpar cache de renderização"""
+        self._cache.clear()
+
+
+# Instância global do renderizador
+signal_renderer = SignalRenderer()
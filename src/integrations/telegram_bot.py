@@ -3,12 +3,9 @@ Cliente Telegram para envio de sinais - BullBot Telegram
 Simplificado para envio direto para grupo fixo
 """
 
-from typing import Dict, Any
-from telegram import Bot
-from telegram.error import TelegramError
-from telegram.request import HTTPXRequest
+from typing import Dict, Any, Optional
+from src.integrations.signal_renderer import signal_renderer
 from src.utils.logger import get_logger
-from src.utils.price_formatter import format_crypto_price
 from src.utils.config import settings
 
 logger = get_logger(__name__)
@@ -18,6 +15,10 @@ class TelegramClient:
     """Cliente para envio de mensagens via Telegram - Simplificado para grupo fixo"""
 
     def __init__(self, bot_token: str):
+        # python-telegram-bot só é importado quando o cliente é criado
+        from telegram import Bot
+        from telegram.request import HTTPXRequest
+
         # Configurar request personalizado com pool de conexões otimizado
         self.request = HTTPXRequest(
             connection_pool_size=settings.telegram_connection_pool_size,
@@ -27,7 +28,11 @@ class TelegramClient:
             pool_timeout=settings.telegram_pool_timeout,  # Configurável
         )
 
-        self.bot = Bot(token=bot_token, request=self.request)
+        self.bot = Bot(
+            token=bot_token,
+            base_url=settings.telegram_api_base_url,
+            request=self.request,
+        )
         self.bot_token = bot_token
 
         # Chat ID do grupo fixo (configurável via env)
@@ -42,6 +47,8 @@ class TelegramClient:
         """
         Envia sinal para o grupo fixo do Telegram
         """
+        from telegram.error import TelegramError
+
         try:
             message = self._format_signal_message(signal_data)
 
@@ -62,54 +69,31 @@ class TelegramClient:
             logger.error(f"❌ Erro inesperado ao enviar sinal: {e}")
             return False
 
+    async def send_message(self, message: str) -> bool:
+        """
+        Envia mensagem já formatada para o grupo fixo do Telegram
+        """
+        from telegram.error import TelegramError
+
+        try:
+            await self.bot.send_message(
+                chat_id=self.group_chat_id,
+                text=message,
+                parse_mode="HTML",
+                disable_web_page_preview=True,
+            )
+            return True
+
+        except TelegramError as e:
+            logger.error(f"❌ Erro ao enviar para grupo {self.group_chat_id}: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"❌ Erro inesperado ao enviar mensagem: {e}")
+            return False
+
     def _format_signal_message(self, signal_data: Dict[str, Any]) -> str:
         """Formatar mensagem do sinal"""
-        symbol = signal_data.get("symbol", "UNKNOWN")
-        signal_type = signal_data.get("signal_type", "UNKNOWN")
-        rsi_value = signal_data.get("indicator_data", {}).get("RSI", {}).get("value", 0)
-        current_price = signal_data.get("price", 0)
-        strength = signal_data.get("strength", "UNKNOWN")
-        timeframe = signal_data.get("timeframe", "UNKNOWN")
-        message = signal_data.get("message", "")
-        source = signal_data.get("source", "UNKNOWN")
-
-        # Emojis por tipo de sinal
-        emoji_map = {
-            "BUY": "🚀🟢",
-            "SELL": "📉🔴",
-            "HOLD": "⏸️🟡",
-        }
-
-        # Emoji de força
-        strength_emoji = {
-            "STRONG": "💪",
-            "MODERATE": "👍",
-            "WEAK": "👌",
-        }
-
-        # Emoji do tipo de sinal
-        signal_emoji = emoji_map.get(signal_type, "📊")
-        strength_icon = strength_emoji.get(strength, "📊")
-
-        # Formatar preço
-        formatted_price = format_crypto_price(current_price)
-
-        # Template da mensagem
-        template = f"""
-{signal_emoji} <b>SINAL DE TRADING</b> {signal_emoji}
-
-{strength_icon} <b>{symbol}</b> - {strength}
-💰 Preço: {formatted_price}
-📊 RSI: {rsi_value:.1f}
-⏰ Timeframe: {timeframe}
-🔗 Fonte: {source}
-
-{message}
-
-🔔 <i>BullBot Signals</i>
-        """.strip()
-
-        return template
+        return signal_renderer.render(signal_data, variant="group")
 
     async def test_connection(self) -> bool:
         """Testar conexão com a API do Telegram"""
@@ -123,5 +107,16 @@ class TelegramClient:
             return False
 
 
-# Instância global do cliente
-telegram_client = TelegramClient(settings.telegram_bot_token)
+# Instância global do cliente, criada no primeiro uso (e no início de cada
+# processo do worker) para não abrir o pool HTTP no import
+_telegram_client: Optional[TelegramClient] = None
+
+
+def get_telegram_client() -> TelegramClient:
+    """Obter o cliente Telegram do processo, criando-o na primeira chamada"""
+    global _telegram_client
+
+    if _telegram_client is None:
+        _telegram_client = TelegramClient(settings.telegram_bot_token)
+
+    return _telegram_client
@@ -0,0 +1,47 @@
+"""
+Classificação de erros de entrega do Telegram - BullBot Telegram
+Separa falhas permanentes (chat morto) de falhas transitórias
+"""
+
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from telegram.error import TelegramError
+
+# Trechos da descrição do erro que indicam chat inexistente ou inacessível
+PERMANENT_ERROR_MARKERS = {
+    "bot was blocked by the user": "bot_blocked",
+    "bot was kicked": "bot_kicked",
+    "bot is not a member": "bot_kicked",
+    "user is deactivated": "user_deactivated",
+    "chat not found": "chat_not_found",
+    "group chat was deleted": "chat_deleted",
+    "peer_id_invalid": "chat_not_found",
+}
+
+
+def classify_delivery_error(error: "TelegramError") -> Optional[str]:
+    """
+    Classificar erro de envio como permanente
+
+    Args:
+        error: Exceção levantada pelo python-telegram-bot
+
+    Returns:
+        Motivo do erro permanente (ex: "bot_blocked") ou None se transitório
+    """
+    from telegram.error import BadRequest, Forbidden
+
+    if not isinstance(error, (Forbidden, BadRequest)):
+        return None
+
+    description = str(error.message).lower()
+    for marker, reason in PERMANENT_ERROR_MARKERS.items():
+        if marker in description:
+            return reason
+
+    # Qualquer outro Forbidden também impede entregas futuras
+    if isinstance(error, Forbidden):
+        return "forbidden"
+
+    return None
@@ -10,6 +10,7 @@ from telegram.ext import Application, CommandHandler, MessageHandler, filters
 from telegram.constants import ParseMode
 from src.utils.config import settings
 from src.utils.logger import get_logger
+from src.utils.metrics import start_metrics_server
 from src.services.user_config_service import user_config_service
 from src.integrations.telegram_messages import *
 
@@ -322,6 +323,74 @@ class TelegramBot:
             logger.error(f"❌ Erro no comando /rsi: {e}")
             await update.message.reply_text(ERROR_RSI)
 
+    async def digest_handler(self, update: Update, context):
+        """Handler para comando /digest - Modo resumo (OPCIONAL)"""
+        try:
+            chat_id = str(update.effective_chat.id)
+            logger.info(f"Comando /digest solicitado pelo chat {chat_id}")
+
+            # Atualizar atividade do usuário
+            user_config_service.update_last_activity(chat_id)
+
+            if not context.args:
+                help_text = DIGEST_HELP.format(
+                    max_window=settings.digest_max_window_minutes,
+                    default_window=settings.digest_default_window_minutes,
+                )
+
+                await update.message.reply_text(help_text, parse_mode=ParseMode.HTML)
+                return
+
+            mode = context.args[0].strip().lower()
+
+            if mode == "off":
+                success = user_config_service.update_user_digest_config(
+                    user_id=int(chat_id), enabled=False
+                )
+                response_text = DIGEST_DISABLED if success else DIGEST_ERROR
+                await update.message.reply_text(
+                    response_text, parse_mode=ParseMode.HTML
+                )
+                return
+
+            if mode != "on":
+                await update.message.reply_text(INVALID_DIGEST_FORMAT)
+                return
+
+            # Processar janela do resumo
+            try:
+                window = (
+                    int(context.args[1])
+                    if len(context.args) > 1
+                    else settings.digest_default_window_minutes
+                )
+            except ValueError:
+                await update.message.reply_text(INVALID_DIGEST_FORMAT)
+                return
+
+            if window < 1 or window > settings.digest_max_window_minutes:
+                await update.message.reply_text(
+                    INVALID_DIGEST_WINDOW.format(
+                        max_window=settings.digest_max_window_minutes
+                    )
+                )
+                return
+
+            success = user_config_service.update_user_digest_config(
+                user_id=int(chat_id), enabled=True, window_minutes=window
+            )
+
+            if success:
+                response_text = DIGEST_ENABLED.format(window=window)
+            else:
+                response_text = DIGEST_ERROR
+
+            await update.message.reply_text(response_text, parse_mode=ParseMode.HTML)
+
+        except Exception as e:
+            logger.error(f"❌ Erro no comando /digest: {e}")
+            await update.message.reply_text(ERROR_DIGEST)
+
     async def unknown_handler(self, update: Update, context):
         """Handler para comandos desconhecidos"""
         try:
@@ -360,6 +429,7 @@ class TelegramBot:
 
             # Handlers de configuração (opcionais)
             self.application.add_handler(CommandHandler("rsi", self.rsi_handler))
+            self.application.add_handler(CommandHandler("digest", self.digest_handler))
 
             # Handler para mensagens desconhecidas
             self.application.add_handler(
@@ -424,6 +494,7 @@ async def run_telegram_bot():
             return
 
         logger.info("🤖 Iniciando BullBot Telegram...")
+        start_metrics_server(settings.metrics_bot_port)
         await bot.start_polling()
 
         # Manter o bot rodando
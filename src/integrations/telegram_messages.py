@@ -78,6 +78,7 @@ HELP_MESSAGE = """📚 <b>Comandos do BullBot Signals</b>
 
 <b>🔧 Configuração (OPCIONAIS):</b>
 /rsi 20,80 - Configurar níveis de RSI (padrão: 20-80)
+/digest on 10 - Receber sinais agrupados a cada 10 minutos
 
 <b>🔔 Tipos de sinais:</b>
 • 🟢 COMPRA: RSI ≤ 20 (sobrevenda)
@@ -151,6 +152,19 @@ RSI_HELP = """<b>💡 Como usar o comando /rsi</b>
 
 <i>🔧 Este comando é OPCIONAL. Se não usar, valores padrão serão aplicados.</i>"""
 
+DIGEST_HELP = """<b>💡 Como usar o comando /digest</b>
+
+<b>Formato:</b> /digest on 10 ou /digest off
+
+<b>📋 Parâmetros:</b>
+• <b>on/off:</b> Ativa ou desativa o modo resumo
+• <b>Minutos:</b> Janela de agrupamento (1 a {max_window}, padrão: {default_window})
+
+<b>📊 Como funciona:</b>
+Em vez de uma mensagem por sinal, você recebe uma única mensagem com todos os sinais detectados na janela.
+
+<i>🔧 Este comando é OPCIONAL. Ideal para quem monitora muitos símbolos.</i>"""
+
 # Mensagens de resposta para comandos
 SYMBOLS_SUCCESS = """✅ <b>Símbolos atualizados com sucesso!</b>
 
@@ -217,6 +231,24 @@ Possíveis causas:
 
 💡 <b>Solução:</b> Use /start primeiro, depois tente novamente"""
 
+DIGEST_ENABLED = """✅ <b>Modo resumo ativado!</b>
+
+📬 Seus sinais serão agrupados e enviados a cada <b>{window} minutos</b>.
+
+<i>💡 Use /digest off para voltar a receber cada sinal na hora</i>"""
+
+DIGEST_DISABLED = """✅ <b>Modo resumo desativado!</b>
+
+🔔 Você voltará a receber cada sinal assim que for detectado."""
+
+DIGEST_ERROR = """❌ <b>Erro ao configurar modo resumo</b>
+
+Possíveis causas:
+• Você não tem configuração criada (use /start primeiro)
+• Erro interno do sistema
+
+💡 <b>Solução:</b> Use /start primeiro, depois tente novamente"""
+
 # Mensagens de configuração
 SETTINGS_NO_CONFIG = """❌ <b>Nenhuma configuração encontrada</b>
 
@@ -258,6 +290,7 @@ ERROR_SYMBOLS = "❌ Erro ao processar símbolos. Tente novamente mais tarde."
 ERROR_TIMEFRAMES = "❌ Erro ao processar timeframes. Tente novamente mais tarde."
 ERROR_SETTINGS = "❌ Erro ao obter configurações. Tente novamente mais tarde."
 ERROR_RSI = "❌ Erro ao processar configuração de RSI. Tente novamente mais tarde."
+ERROR_DIGEST = "❌ Erro ao processar modo resumo. Tente novamente mais tarde."
 ERROR_INTERNAL = "❌ Erro interno. Tente novamente mais tarde."
 
 # Mensagens de validação
@@ -268,6 +301,8 @@ INVALID_RSI_VALUES = "❌ Valores devem ser números inteiros. Use: /rsi 20,80"
 INVALID_OVERSOLD_RANGE = "❌ Sobrevenda deve estar entre 0 e 50"
 INVALID_OVERBOUGHT_RANGE = "❌ Sobrecompra deve estar entre 50 e 100"
 INVALID_RSI_RANGE = "❌ Sobrevenda deve ser menor que sobrecompra"
+INVALID_DIGEST_FORMAT = "❌ Formato inválido. Use: /digest on 10 ou /digest off"
+INVALID_DIGEST_WINDOW = "❌ Janela deve estar entre 1 e {max_window} minutos"
 
 # Mensagens de comandos desconhecidos
 UNKNOWN_COMMAND = """❓ <b>Comando não reconhecido</b>
@@ -7,7 +7,7 @@ import asyncio
 import logging
 from src.utils.logger import get_logger
 from src.services.signal_reader import signal_reader
-from src.integrations.telegram_bot import telegram_client
+from src.integrations.telegram_bot import get_telegram_client
 
 logger = get_logger(__name__)
 
@@ -23,7 +23,7 @@ async def test_initial_connections():
         return False
 
     # Testar conexão com Telegram
-    telegram_ok = await telegram_client.test_connection()
+    telegram_ok = await get_telegram_client().test_connection()
     if not telegram_ok:
         logger.error("❌ Falha na conexão com Telegram")
         return False
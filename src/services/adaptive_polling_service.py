@@ -0,0 +1,131 @@
+"""
+Intervalo adaptativo de polling de sinais - BullBot Telegram
+Drena backlog sem espera, recua exponencialmente quando ocioso e aprende
+a taxa de chegada de sinais
+"""
+
+import time
+from typing import Optional
+from src.utils.config import settings
+from src.utils.logger import get_logger
+from src.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+
+STATE_KEY = "signal_polling_state"
+CHAIN_KEY = "signal_polling_chain"
+
+
+class AdaptivePollingService:
+    """
+    Calcula o atraso até o próximo ciclo de processamento de sinais
+
+    O estado (intervalo atual, taxa EWMA de chegada, último ciclo) fica em
+    um hash Redis compartilhado entre workers. Uma única cadeia de ciclos
+    auto-agendados é identificada pelo task_id do próximo ciclo; o beat só
+    roda como watchdog quando essa cadeia morre.
+    """
+
+    def __init__(self):
+        self.logger = logger
+
+    def should_run(self, task_id: Optional[str], chained: bool) -> bool:
+        """
+        Verificar se este ciclo deve rodar
+
+        Args:
+            task_id: ID da task em execução
+            chained: True se o ciclo foi auto-agendado pela cadeia adaptativa
+
+        Returns:
+            bool: Ciclos da cadeia rodam só se ainda forem o próximo esperado;
+            ciclos do beat rodam só se não houver cadeia ativa
+        """
+        try:
+            expected = get_redis().get(CHAIN_KEY)
+            if chained:
+                return expected is not None and expected.decode() == task_id
+            return expected is None
+
+        except Exception as e:
+            self.logger.warning(f"⚠️ Erro ao verificar cadeia de polling: {e}")
+            return not chained
+
+    def next_delay(
+        self, backlog_remaining: int, new_signals: int, made_progress: bool = True
+    ) -> float:
+        """
+        Calcular atraso até o próximo ciclo e atualizar o estado
+
+        Args:
+            backlog_remaining: Sinais ainda pendentes após este ciclo
+            new_signals: Sinais novos observados neste ciclo
+            made_progress: False se o ciclo não tirou nenhum sinal do backlog
+                (ex: falha ao marcar processado); o backlog então recua como
+                ocioso em vez de repetir o ciclo imediatamente
+
+        Returns:
+            Atraso em segundos
+        """
+        now = time.time()
+        min_interval = settings.polling_min_interval_seconds
+        base_interval = settings.polling_base_interval_seconds
+        max_interval = settings.polling_max_interval_seconds
+
+        try:
+            state = get_redis().hgetall(STATE_KEY)
+            interval = float(state.get(b"interval", base_interval))
+            rate = float(state.get(b"arrival_rate", 0.0))
+            last_run_at = float(state.get(b"last_run_at", now))
+
+            # Taxa de chegada (sinais/s) suavizada por EWMA
+            elapsed = now - last_run_at
+            if elapsed > 0:
+                alpha = settings.polling_rate_ewma_alpha
+                rate = alpha * (max(new_signals, 0) / elapsed) + (1 - alpha) * rate
+
+            if backlog_remaining > 0 and made_progress:
+                # Backlog: próximo ciclo imediatamente
+                interval = min_interval
+                delay = min_interval
+            else:
+                if new_signals > 0:
+                    interval = base_interval
+                else:
+                    interval = min(
+                        max(interval, min_interval) * settings.polling_backoff_factor,
+                        max_interval,
+                    )
+
+                # Com chegada frequente, consultar perto do intervalo esperado
+                delay = interval
+                if rate > 0:
+                    delay = min(delay, max(min_interval, 1 / rate))
+
+            get_redis().hset(
+                STATE_KEY,
+                mapping={
+                    "interval": interval,
+                    "arrival_rate": rate,
+                    "last_run_at": now,
+                    "last_delay": delay,
+                },
+            )
+            return delay
+
+        except Exception as e:
+            self.logger.warning(f"⚠️ Erro ao calcular intervalo de polling: {e}")
+            return base_interval
+
+    def claim_next_cycle(self, task_id: str, delay: float) -> None:
+        """Registrar o task_id do próximo ciclo como dono da cadeia"""
+        get_redis().set(
+            CHAIN_KEY,
+            task_id,
+            ex=int(delay + settings.polling_chain_grace_seconds),
+        )
+
+
+# Instância global do serviço
+adaptive_polling_service = AdaptivePollingService()
@@ -0,0 +1,103 @@
+"""
+Medição de capacidade dos workers - BullBot Telegram
+Profundidade das filas do broker, backlog de sinais e resumos pendentes
+"""
+
+import math
+import os
+from typing import Dict, List
+from src.services.digest_service import digest_service
+from src.utils.config import settings
+from src.utils.logger import get_logger
+from src.utils.redis_client import get_redis
+import redis
+
+logger = get_logger(__name__)
+
+# Mesmos passos de prioridade de broker_transport_options (celery_app)
+PRIORITY_STEPS = range(10)
+PRIORITY_SEP = ":"
+
+# Backlog de sinais publicado pelo ciclo de despacho
+SIGNAL_BACKLOG_KEY = "capacity:signal_backlog"
+SIGNAL_BACKLOG_TTL_SECONDS = 300
+
+
+def _broker_client() -> redis.Redis:
+    """Cliente do broker: reutiliza o pool compartilhado se for o mesmo Redis"""
+    broker_url = os.getenv("CELERY_BROKER_URL", settings.redis_url)
+    if broker_url == settings.redis_url:
+        return get_redis()
+    return redis.Redis.from_url(broker_url, max_connections=1)
+
+
+class CapacityService:
+    """Mede a carga do pipeline e converte trabalho pendente em processos"""
+
+    def __init__(self):
+        self.logger = logger
+        self._broker = None
+
+    def get_queue_lengths(self, queues: List[str]) -> Dict[str, int]:
+        """
+        Mensagens aguardando em cada fila (somando as sub-filas de prioridade)
+        """
+        try:
+            if self._broker is None:
+                self._broker = _broker_client()
+
+            pipe = self._broker.pipeline(transaction=False)
+            for queue in queues:
+                for priority in PRIORITY_STEPS:
+                    pipe.llen(f"{queue}{PRIORITY_SEP}{priority}" if priority else queue)
+            lengths = pipe.execute()
+
+            steps = len(PRIORITY_STEPS)
+            return {
+                queue: sum(lengths[i * steps : (i + 1) * steps])
+                for i, queue in enumerate(queues)
+            }
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao medir filas do broker: {e}")
+            return {}
+
+    def record_signal_backlog(self, backlog: int) -> None:
+        """Publicar o backlog medido pelo ciclo de despacho"""
+        try:
+            get_redis().set(
+                SIGNAL_BACKLOG_KEY, max(0, backlog), ex=SIGNAL_BACKLOG_TTL_SECONDS
+            )
+        except Exception as e:
+            self.logger.warning(f"⚠️ Erro ao publicar backlog de sinais: {e}")
+
+    def get_signal_backlog(self) -> int:
+        """
+        Sinais não processados segundo o último ciclo de despacho
+
+        Lido do Redis: o autoscaler roda em uma thread do worker e não deve
+        consultar o banco. Sem ciclo recente o valor expira e conta como 0.
+        """
+        try:
+            return int(get_redis().get(SIGNAL_BACKLOG_KEY) or 0)
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao ler backlog de sinais: {e}")
+            return 0
+
+    def get_digest_outbox(self) -> int:
+        """Chats com resumo aguardando envio"""
+        return digest_service.get_pending_count()
+
+    def processes_for(self, pending_tasks: int) -> int:
+        """Processos necessários para o trabalho pendente, dentro dos limites"""
+        desired = math.ceil(
+            pending_tasks / max(1, settings.autoscale_tasks_per_process)
+        )
+        return max(
+            settings.autoscale_min_processes,
+            min(desired, settings.autoscale_max_processes),
+        )
+
+
+# Instância global do serviço
+capacity_service = CapacityService()
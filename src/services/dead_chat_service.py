@@ -0,0 +1,135 @@
+"""
+Serviço de poda de chats mortos - BullBot Telegram
+Desativa assinaturas de chats que bloquearam o bot ou deixaram de existir
+"""
+
+from typing import Dict, Any
+from src.services.user_config_service import user_config_service
+from src.utils.config import settings
+from src.utils.logger import get_logger
+from src.utils.redis_client import get_async_redis, get_redis
+
+logger = get_logger(__name__)
+
+
+FAILURES_KEY_PREFIX = "dead_chat_failures:"
+PRUNED_TOTAL_KEY = "dead_chats_pruned_total"
+PRUNED_BY_REASON_KEY = "dead_chats_pruned_by_reason"
+
+# Incrementa o contador e define o TTL só na criação (janela fixa)
+COUNT_FAILURE_SCRIPT = """
+local failures = redis.call('incr', KEYS[1])
+if failures == 1 then
+    redis.call('expire', KEYS[1], ARGV[1])
+end
+return failures
+"""
+
+
+class DeadChatService:
+    """
+    Contabiliza falhas permanentes de entrega e poda chats mortos
+
+    A contagem roda no event loop de envio pelo cliente Redis assíncrono; os
+    chats que atingem o limite ficam pendentes em memória e são desativados
+    no banco por flush_pending(), chamado pela task fora do event loop (como
+    o SignalStatsWriter).
+    """
+
+    def __init__(self):
+        self.logger = logger
+        self.pending: Dict[str, str] = {}
+
+    async def record_permanent_failure(self, chat_id: str, reason: str) -> bool:
+        """
+        Registrar falha permanente de entrega para um chat
+
+        A janela de contagem é fixa: o TTL é definido só quando o contador
+        é criado, não renovado a cada falha.
+
+        Args:
+            chat_id: ID do chat do Telegram
+            reason: Motivo classificado (ex: "bot_blocked", "chat_not_found")
+
+        Returns:
+            bool: True se o chat atingiu o limite e aguarda desativação
+        """
+        if not settings.dead_chat_pruning_enabled:
+            return False
+
+        try:
+            failures = await get_async_redis().register_script(COUNT_FAILURE_SCRIPT)(
+                keys=[f"{FAILURES_KEY_PREFIX}{chat_id}"],
+                args=[settings.dead_chat_failure_ttl_seconds],
+            )
+
+            self.logger.warning(
+                f"⚠️ Falha permanente para {chat_id} ({reason}): {failures}/{settings.dead_chat_failure_threshold}"
+            )
+
+            if failures < settings.dead_chat_failure_threshold:
+                return False
+
+            self.pending[str(chat_id)] = reason
+            return True
+
+        except Exception as e:
+            self.logger.error(
+                f"❌ Erro ao registrar falha permanente de {chat_id}: {e}"
+            )
+            return False
+
+    def flush_pending(self) -> int:
+        """
+        Desativar no banco os chats que atingiram o limite de falhas
+
+        Returns:
+            Número de chats desativados
+        """
+        if not self.pending:
+            return 0
+
+        pending, self.pending = self.pending, {}
+        pruned = 0
+
+        for chat_id, reason in pending.items():
+            try:
+                if not user_config_service.unsubscribe_user(chat_id):
+                    continue
+
+                pipe = get_redis().pipeline()
+                pipe.delete(f"{FAILURES_KEY_PREFIX}{chat_id}")
+                pipe.incr(PRUNED_TOTAL_KEY)
+                pipe.hincrby(PRUNED_BY_REASON_KEY, reason, 1)
+                pipe.execute()
+
+                pruned += 1
+                self.logger.info(
+                    f"Chat {chat_id} desativado automaticamente ({reason})"
+                )
+
+            except Exception as e:
+                self.logger.error(f"❌ Erro ao desativar chat {chat_id}: {e}")
+
+        return pruned
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Obter métricas de chats podados"""
+        try:
+            pruned_total = get_redis().get(PRUNED_TOTAL_KEY)
+            by_reason = get_redis().hgetall(PRUNED_BY_REASON_KEY)
+
+            return {
+                "pruned_total": int(pruned_total) if pruned_total else 0,
+                "pruned_by_reason": {
+                    reason.decode(): int(count) for reason, count in by_reason.items()
+                },
+            }
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao obter métricas de chats podados: {e}")
+            return {}
+
+
+# Instância global do serviço
+dead_chat_service = DeadChatService()
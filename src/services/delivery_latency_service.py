@@ -0,0 +1,212 @@
+"""
+Serviço de latência de entrega - BullBot Telegram
+Mede o tempo entre a criação do sinal e o ack do Telegram, por estágio do pipeline
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+from src.utils.config import settings
+from src.utils.logger import get_logger
+from src.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+
+HISTOGRAM_KEY_PREFIX = "delivery_latency:"
+HISTOGRAM_INDEX_KEY = "delivery_latency_keys"
+HISTOGRAM_TTL_SECONDS = 7 * 86400
+
+# Limites superiores dos buckets em milissegundos (último é +inf)
+LATENCY_BUCKETS_MS = [
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+    30000,
+    60000,
+    120000,
+    300000,
+    600000,
+    1800000,
+    3600000,
+]
+
+# Estágios do pipeline:
+# pickup - criação do sinal até o worker buscá-lo
+# match  - busca até o fim da determinação de usuários elegíveis
+# render - renderização da mensagem
+# send   - requisição ao Telegram até o ack (inclui retries)
+# total  - criação do sinal até o ack do Telegram
+PIPELINE_STAGES = ["pickup", "match", "render", "send", "total"]
+
+
+def _bucket_label(value_ms: float) -> str:
+    for upper in LATENCY_BUCKETS_MS:
+        if value_ms <= upper:
+            return str(upper)
+    return "inf"
+
+
+def parse_signal_timestamp(value: Any) -> Optional[float]:
+    """Converter created_at (isoformat, naive em UTC) para epoch"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value) if isinstance(value, str) else value
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def mark_pipeline_stage(signal_data: Dict[str, Any], stage: str):
+    """Registrar timestamp de um estágio no próprio dicionário do sinal
+
+    Os timestamps viajam junto com o sinal, inclusive para tasks de fan-out.
+    """
+    signal_data.setdefault("pipeline_timestamps", {})[stage] = time.time()
+
+
+class LatencyRecorder:
+    """Acumula observações de latência de um sinal em memória"""
+
+    def __init__(self, signal_data: Dict[str, Any]):
+        self.timeframe = signal_data.get("timeframe") or "unknown"
+        self.strength = (signal_data.get("strength") or "unknown").upper()
+        self.created_at = parse_signal_timestamp(signal_data.get("created_at"))
+        self.timestamps = signal_data.get("pipeline_timestamps") or {}
+        self.histograms: Dict[str, Dict[str, float]] = {}
+
+    def observe(self, stage: str, seconds: float):
+        """Registrar uma observação em milissegundos no histograma do estágio"""
+        if seconds is None or seconds < 0:
+            return
+
+        value_ms = seconds * 1000
+        histogram = self.histograms.setdefault(stage, {"count": 0, "sum_ms": 0.0})
+        bucket = _bucket_label(value_ms)
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+        histogram["count"] += 1
+        histogram["sum_ms"] += value_ms
+
+    def observe_signal_stages(self):
+        """
+        Registrar estágios por sinal (pickup e match)
+
+        Chamado uma vez por sinal pelo ciclo de despacho, logo após a
+        elegibilidade; o envio (inline ou por chunk) só mede render e send.
+        """
+        picked_up = self.timestamps.get("picked_up")
+        matched = self.timestamps.get("matched")
+
+        if self.created_at and picked_up:
+            self.observe("pickup", picked_up - self.created_at)
+        if picked_up and matched:
+            self.observe("match", matched - picked_up)
+
+    def observe_delivery(self, sent_at: float, acked_at: float):
+        """Registrar estágios por entrega (send e total)"""
+        self.observe("send", acked_at - sent_at)
+        if self.created_at:
+            self.observe("total", acked_at - self.created_at)
+
+
+class DeliveryLatencyService:
+    """Agrega histogramas de latência no Redis por estágio, timeframe e força"""
+
+    def __init__(self):
+        self.logger = logger
+
+    def flush(self, recorder: LatencyRecorder):
+        """Somar observações acumuladas nos histogramas do Redis (um pipeline)"""
+        if not settings.delivery_latency_tracking_enabled or not recorder.histograms:
+            return
+
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+
+            for stage, histogram in recorder.histograms.items():
+                key = f"{HISTOGRAM_KEY_PREFIX}{stage}:{recorder.timeframe}:{recorder.strength}"
+                for field, value in histogram.items():
+                    if field == "sum_ms":
+                        pipe.hincrbyfloat(key, field, value)
+                    else:
+                        pipe.hincrby(key, field, int(value))
+                pipe.expire(key, HISTOGRAM_TTL_SECONDS)
+                pipe.sadd(HISTOGRAM_INDEX_KEY, key)
+
+            pipe.expire(HISTOGRAM_INDEX_KEY, HISTOGRAM_TTL_SECONDS)
+            pipe.execute()
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao registrar latências de entrega: {e}")
+
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """
+        Obter percentis estimados por estágio, timeframe e força
+
+        Returns:
+            {stage: {"timeframe:strength": {count, mean_ms, p50_ms, p95_ms, p99_ms}}}
+        """
+        try:
+            keys = sorted(k.decode() for k in get_redis().smembers(HISTOGRAM_INDEX_KEY))
+            if not keys:
+                return {}
+
+            pipe = get_redis().pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+            histograms = pipe.execute()
+
+            stats = {}
+            for key, raw in zip(keys, histograms):
+                if not raw:
+                    continue
+                stage, timeframe, strength = key[len(HISTOGRAM_KEY_PREFIX) :].split(
+                    ":", 2
+                )
+                histogram = {
+                    field.decode(): float(value) for field, value in raw.items()
+                }
+                stats.setdefault(stage, {})[f"{timeframe}:{strength}"] = (
+                    self._summarize(histogram)
+                )
+
+            return stats
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao obter latências de entrega: {e}")
+            return {}
+
+    def _summarize(self, histogram: Dict[str, float]) -> Dict[str, Any]:
+        """Calcular média e percentis (limite superior do bucket) de um histograma"""
+        count = int(histogram.get("count", 0))
+        if not count:
+            return {"count": 0}
+
+        summary = {
+            "count": count,
+            "mean_ms": round(histogram.get("sum_ms", 0.0) / count, 1),
+        }
+
+        labels = [str(upper) for upper in LATENCY_BUCKETS_MS] + ["inf"]
+        for pct in (50, 95, 99):
+            target = count * pct / 100
+            cumulative = 0
+            for label in labels:
+                cumulative += histogram.get(label, 0)
+                if cumulative >= target:
+                    summary[f"p{pct}_ms"] = label if label == "inf" else int(label)
+                    break
+
+        return summary
+
+
+# Instância global do serviço
+delivery_latency_service = DeliveryLatencyService()
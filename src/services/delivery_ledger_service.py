@@ -0,0 +1,130 @@
+"""
+Registro de entregas por (sinal, chat) - BullBot Telegram
+Garante que retries de tasks não reenviem sinais já entregues
+"""
+
+import time
+from typing import Optional
+from src.utils.config import settings
+from src.utils.lease_lock import Fence, StaleLeaseError
+from src.utils.logger import get_logger
+from src.utils.redis_client import get_async_redis
+
+logger = get_logger(__name__)
+
+# Um set de chats entregues e um hash de reservas (chat -> prazo) por sinal
+DELIVERED_KEY_PREFIX = "delivery:"
+CLAIMS_KEY_PREFIX = "delivery_claims:"
+
+# Reserva atômica: recusada se o chat já foi entregue ou tem reserva no prazo.
+# Com KEYS[3] (chave do fence) só reserva se o token ainda for ARGV[4]
+CLAIM_SCRIPT = """
+if KEYS[3] and redis.call('get', KEYS[3]) ~= ARGV[4] then
+    return -1
+end
+if redis.call('sismember', KEYS[1], ARGV[1]) == 1 then
+    return 0
+end
+local claimed_until = redis.call('hget', KEYS[2], ARGV[1])
+if claimed_until and tonumber(claimed_until) > tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('hset', KEYS[2], ARGV[1], ARGV[2] + ARGV[3])
+redis.call('expire', KEYS[2], ARGV[3])
+return 1
+"""
+
+
+class DeliveryLedgerService:
+    """
+    Reserva atômica de cada entrega (sinal, chat) antes do envio
+
+    Usado dentro do event loop de envio, por isso fala com o Redis pelo
+    cliente assíncrono. Cada sinal tem um set com os chats já entregues e um
+    hash com as reservas em andamento; a reserva tem prazo curto e vira
+    membro do set após o ack do Telegram, e em falha é liberada para o
+    próximo retry tentar de novo. O set vive o mesmo que o checkpoint do
+    sinal (a janela em que um retry pode retomá-lo). Se o Redis estiver
+    indisponível a entrega segue sem deduplicação.
+    """
+
+    def __init__(self):
+        self.logger = logger
+
+    def _delivered_key(self, signal_id) -> str:
+        return f"{DELIVERED_KEY_PREFIX}{signal_id}"
+
+    def _claims_key(self, signal_id) -> str:
+        return f"{CLAIMS_KEY_PREFIX}{signal_id}"
+
+    async def claim(self, signal_id, chat_id, fence: Optional[Fence] = None) -> bool:
+        """
+        Reservar a entrega do sinal para o chat
+
+        Args:
+            signal_id: ID do sinal
+            chat_id: ID do chat
+            fence: Token do lease do ciclo (envios inline); None nos chunks
+
+        Returns:
+            bool: True se esta execução deve enviar, False se já foi entregue
+            ou outra execução está enviando
+
+        Raises:
+            StaleLeaseError: o lease do ciclo mudou de dono (nada foi reservado)
+        """
+        if not settings.delivery_idempotency_enabled:
+            return True
+
+        keys = [self._delivered_key(signal_id), self._claims_key(signal_id)]
+        args = [chat_id, int(time.time()), settings.delivery_claim_ttl_seconds]
+        if fence:
+            keys.append(fence.key)
+            args.append(fence.token)
+
+        try:
+            claimed = await get_async_redis().register_script(CLAIM_SCRIPT)(
+                keys=keys, args=args
+            )
+        except Exception as e:
+            self.logger.warning(
+                f"⚠️ Erro ao reservar entrega {signal_id}:{chat_id}, enviando sem deduplicação: {e}"
+            )
+            return True
+
+        if claimed == -1:
+            raise StaleLeaseError(
+                f"Token {fence.token} vencido ao reservar {signal_id}:{chat_id}"
+            )
+        return claimed == 1
+
+    async def mark_delivered(self, signal_id, chat_id) -> None:
+        """Converter a reserva em registro de entrega concluída"""
+        if not settings.delivery_idempotency_enabled:
+            return
+
+        try:
+            delivered_key = self._delivered_key(signal_id)
+            pipe = get_async_redis().pipeline()
+            pipe.sadd(delivered_key, chat_id)
+            pipe.expire(delivered_key, settings.dispatch_checkpoint_ttl_seconds)
+            pipe.hdel(self._claims_key(signal_id), chat_id)
+            await pipe.execute()
+        except Exception as e:
+            self.logger.warning(
+                f"⚠️ Erro ao registrar entrega {signal_id}:{chat_id}: {e}"
+            )
+
+    async def release(self, signal_id, chat_id) -> None:
+        """Liberar a reserva após falha de envio para permitir nova tentativa"""
+        if not settings.delivery_idempotency_enabled:
+            return
+
+        try:
+            await get_async_redis().hdel(self._claims_key(signal_id), chat_id)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Erro ao liberar entrega {signal_id}:{chat_id}: {e}")
+
+
+# Instância global do serviço
+delivery_ledger_service = DeliveryLedgerService()
@@ -0,0 +1,183 @@
+"""
+Serviço de resumo (digest) de sinais - BullBot Telegram
+Agrupa sinais elegíveis de um chat em uma janela e entrega uma única mensagem
+"""
+
+import json
+import time
+from typing import List, Dict, Any, Optional
+from src.integrations.signal_renderer import extract_rsi_value
+from src.utils.config import settings
+from src.utils.logger import get_logger
+from src.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+
+BUFFER_KEY_PREFIX = "digest_buffer:"
+DUE_KEY = "digest_due"
+
+# Chats atendidos por execução de flush_signal_digests
+DIGEST_FLUSH_LIMIT = 100
+
+# Reenvio de resumos que falharam: espera e tentativas por sinal
+DIGEST_RETRY_SECONDS = 60
+DIGEST_MAX_ATTEMPTS = 5
+
+
+class DigestService:
+    """Buffer de sinais por chat com prazo de entrega em sorted set"""
+
+    def __init__(self):
+        self.logger = logger
+
+    def get_window_seconds(
+        self, filter_config: Optional[Dict[str, Any]]
+    ) -> Optional[int]:
+        """
+        Obter janela do resumo configurada para o chat
+
+        Returns:
+            Janela em segundos, ou None se o modo resumo estiver desligado
+        """
+        digest_config = (filter_config or {}).get("digest") or {}
+        if not digest_config.get("enabled"):
+            return None
+
+        window_minutes = digest_config.get(
+            "window_minutes", settings.digest_default_window_minutes
+        )
+        window_minutes = max(
+            1, min(int(window_minutes), settings.digest_max_window_minutes)
+        )
+        return window_minutes * 60
+
+    def buffer_signal(
+        self, chat_id: str, signal_data: Dict[str, Any], window_seconds: int
+    ) -> bool:
+        """
+        Adicionar sinal ao resumo pendente do chat
+
+        O prazo de entrega é definido pelo primeiro sinal da janela.
+        """
+        try:
+            chat_id = str(chat_id)
+            buffer_key = f"{BUFFER_KEY_PREFIX}{chat_id}"
+
+            # Guardar apenas o necessário para renderizar o resumo
+            entry = {
+                "id": signal_data.get("id"),
+                "symbol": signal_data.get("symbol"),
+                "signal_type": signal_data.get("signal_type"),
+                "strength": signal_data.get("strength"),
+                "price": signal_data.get("price"),
+                "timeframe": signal_data.get("timeframe"),
+                "rsi_value": extract_rsi_value(signal_data.get("indicator_data")),
+            }
+
+            pipe = get_redis().pipeline()
+            pipe.rpush(buffer_key, json.dumps(entry, separators=(",", ":")))
+            pipe.expire(buffer_key, window_seconds * 4)
+            pipe.zadd(DUE_KEY, {chat_id: time.time() + window_seconds}, nx=True)
+            pipe.execute()
+
+            return True
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao adicionar sinal ao resumo de {chat_id}: {e}")
+            return False
+
+    def pop_due_digests(
+        self, limit: int = DIGEST_FLUSH_LIMIT
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Retirar resumos cuja janela já expirou
+
+        Returns:
+            Mapa chat_id -> lista de sinais pendentes
+        """
+        digests = {}
+
+        try:
+            due_chats = get_redis().zrangebyscore(
+                DUE_KEY, "-inf", time.time(), start=0, num=limit
+            )
+
+            for raw_chat_id in due_chats:
+                chat_id = raw_chat_id.decode()
+                buffer_key = f"{BUFFER_KEY_PREFIX}{chat_id}"
+
+                # Ler e limpar o buffer de forma atômica
+                pipe = get_redis().pipeline(transaction=True)
+                pipe.lrange(buffer_key, 0, -1)
+                pipe.delete(buffer_key)
+                pipe.zrem(DUE_KEY, chat_id)
+                entries = pipe.execute()[0]
+
+                if entries:
+                    digests[chat_id] = [json.loads(entry) for entry in entries]
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao buscar resumos pendentes: {e}")
+
+        return digests
+
+    def requeue_digest(self, chat_id: str, entries: List[Dict[str, Any]]) -> int:
+        """
+        Devolver ao buffer os sinais de um resumo que não foi enviado
+
+        Os sinais voltam à frente do buffer (antes dos que chegaram durante o
+        envio) e o resumo é reagendado para DIGEST_RETRY_SECONDS, sem adiar um
+        prazo já mais próximo. Sinais que esgotaram DIGEST_MAX_ATTEMPTS são
+        descartados.
+
+        Returns:
+            Número de sinais devolvidos ao buffer
+        """
+        chat_id = str(chat_id)
+        retry_entries = []
+        for entry in entries:
+            entry = dict(entry, attempts=entry.get("attempts", 0) + 1)
+            if entry["attempts"] < DIGEST_MAX_ATTEMPTS:
+                retry_entries.append(entry)
+
+        dropped = len(entries) - len(retry_entries)
+        if dropped:
+            self.logger.warning(
+                f"⚠️ {dropped} sinais descartados do resumo de {chat_id} após {DIGEST_MAX_ATTEMPTS} tentativas"
+            )
+        if not retry_entries:
+            return 0
+
+        try:
+            buffer_key = f"{BUFFER_KEY_PREFIX}{chat_id}"
+
+            pipe = get_redis().pipeline()
+            pipe.lpush(
+                buffer_key,
+                *(
+                    json.dumps(entry, separators=(",", ":"))
+                    for entry in reversed(retry_entries)
+                ),
+            )
+            pipe.expire(buffer_key, settings.digest_max_window_minutes * 60 * 4)
+            pipe.zadd(DUE_KEY, {chat_id: time.time() + DIGEST_RETRY_SECONDS}, lt=True)
+            pipe.execute()
+
+            return len(retry_entries)
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao devolver resumo de {chat_id} ao buffer: {e}")
+            return 0
+
+    def get_pending_count(self) -> int:
+        """Número de chats com resumo pendente"""
+        try:
+            return get_redis().zcard(DUE_KEY)
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao contar resumos pendentes: {e}")
+            return 0
+
+
+# Instância global do serviço
+digest_service = DigestService()
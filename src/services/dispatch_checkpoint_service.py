@@ -0,0 +1,182 @@
+"""
+Checkpoints de despacho por sinal - BullBot Telegram
+Permite que um retry ou outro worker retome o processamento de onde parou
+"""
+
+import json
+from typing import List, Dict, Any, Optional
+from redis.exceptions import WatchError
+from src.utils.config import settings
+from src.utils.lease_lock import Fence, StaleLeaseError
+from src.utils.logger import get_logger
+from src.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+
+CHECKPOINT_KEY_PREFIX = "dispatch_checkpoint:"
+PENDING_KEY = "dispatch_checkpoints_pending"
+
+# Estágios de um sinal no pipeline de despacho
+STAGE_MATCHED = "matched"  # Destinatários calculados e salvos
+STAGE_DISPATCHED = "dispatched"  # Envios concluídos ou enfileirados (fan-out)
+
+
+class DispatchCheckpointService:
+    """
+    Progresso de cada sinal em um hash Redis
+
+    Campos: stage, recipients (JSON serializado) e sent_upto (índice do
+    próximo destinatário). O checkpoint é removido quando o sinal é marcado
+    como processado no banco.
+
+    Escritas com fence (token do lease do ciclo) só são aplicadas se o
+    lease não mudou de dono; sem fence (ex.: chunks de fan-out) sempre são.
+    """
+
+    def __init__(self):
+        self.logger = logger
+
+    def _key(self, signal_id) -> str:
+        return f"{CHECKPOINT_KEY_PREFIX}{signal_id}"
+
+    def load(self, signal_id) -> Optional[Dict[str, Any]]:
+        """
+        Carregar checkpoint de um sinal
+
+        Returns:
+            Dict com stage, recipients e sent_upto, ou None se não existir
+        """
+        if not settings.dispatch_checkpoint_enabled:
+            return None
+
+        try:
+            data = get_redis().hgetall(self._key(signal_id))
+            if not data:
+                return None
+
+            return {
+                "stage": data[b"stage"].decode(),
+                "recipients": json.loads(data.get(b"recipients", b"[]")),
+                "sent_upto": int(data.get(b"sent_upto", 0)),
+            }
+
+        except Exception as e:
+            self.logger.warning(
+                f"⚠️ Erro ao carregar checkpoint do sinal {signal_id}: {e}"
+            )
+            return None
+
+    def save_matched(
+        self,
+        signal_id,
+        recipients: List[Dict[str, Any]],
+        fence: Optional[Fence] = None,
+    ) -> None:
+        """Salvar destinatários calculados para o sinal"""
+        self._save(
+            signal_id,
+            {
+                "stage": STAGE_MATCHED,
+                "recipients": json.dumps(recipients),
+                "sent_upto": 0,
+            },
+            fence,
+        )
+
+    def advance(self, signal_id, sent_upto: int, fence: Optional[Fence] = None) -> None:
+        """Registrar que os destinatários até sent_upto já foram atendidos"""
+        self._save(signal_id, {"sent_upto": sent_upto}, fence)
+
+    def mark_dispatched(self, signal_id, fence: Optional[Fence] = None) -> None:
+        """Registrar que todos os envios do sinal foram concluídos/enfileirados"""
+        self._save(signal_id, {"stage": STAGE_DISPATCHED}, fence)
+
+    def complete(self, signal_id, fence: Optional[Fence] = None) -> None:
+        """Remover checkpoint após o sinal ser marcado como processado"""
+        if not settings.dispatch_checkpoint_enabled:
+            return
+
+        try:
+            pipe = self._pipeline(fence)
+            pipe.delete(self._key(signal_id))
+            pipe.srem(PENDING_KEY, signal_id)
+            pipe.execute()
+        except (StaleLeaseError, WatchError):
+            self.logger.warning(
+                f"⚠️ Checkpoint do sinal {signal_id} não removido: lease do ciclo mudou de dono"
+            )
+        except Exception as e:
+            self.logger.warning(
+                f"⚠️ Erro ao remover checkpoint do sinal {signal_id}: {e}"
+            )
+
+    def discard(self, signal_ids: List[Any]) -> None:
+        """Remover checkpoints de sinais encerrados fora do ciclo (ex: stale)"""
+        if not settings.dispatch_checkpoint_enabled or not signal_ids:
+            return
+
+        try:
+            pipe = get_redis().pipeline()
+            pipe.delete(*(self._key(signal_id) for signal_id in signal_ids))
+            pipe.srem(PENDING_KEY, *signal_ids)
+            pipe.execute()
+        except Exception as e:
+            self.logger.warning(f"⚠️ Erro ao remover checkpoints descartados: {e}")
+
+    def has_pending(self) -> bool:
+        """Verificar se há sinais com processamento interrompido"""
+        if not settings.dispatch_checkpoint_enabled:
+            return False
+
+        try:
+            signal_ids = list(get_redis().smembers(PENDING_KEY))
+            if not signal_ids:
+                return False
+
+            # Checkpoints expirados (ex: sinal descartado por idade) saem do set
+            pipe = get_redis().pipeline()
+            for signal_id in signal_ids:
+                pipe.exists(self._key(signal_id.decode()))
+            expired = [
+                signal_id
+                for signal_id, exists in zip(signal_ids, pipe.execute())
+                if not exists
+            ]
+            if expired:
+                get_redis().srem(PENDING_KEY, *expired)
+
+            return len(expired) < len(signal_ids)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Erro ao verificar checkpoints pendentes: {e}")
+            return False
+
+    def _pipeline(self, fence: Optional[Fence]):
+        """Pipeline comum ou, com fence, transação condicionada ao token"""
+        return fence.pipeline() if fence else get_redis().pipeline()
+
+    def _save(
+        self, signal_id, fields: Dict[str, Any], fence: Optional[Fence] = None
+    ) -> None:
+        if not settings.dispatch_checkpoint_enabled:
+            return
+
+        try:
+            key = self._key(signal_id)
+            pipe = self._pipeline(fence)
+            pipe.hset(key, mapping=fields)
+            pipe.expire(key, settings.dispatch_checkpoint_ttl_seconds)
+            pipe.sadd(PENDING_KEY, signal_id)
+            pipe.execute()
+        except (StaleLeaseError, WatchError):
+            self.logger.warning(
+                f"⚠️ Checkpoint do sinal {signal_id} não salvo: lease do ciclo mudou de dono"
+            )
+        except Exception as e:
+            self.logger.warning(
+                f"⚠️ Erro ao salvar checkpoint do sinal {signal_id}: {e}"
+            )
+
+
+# Instância global do serviço
+dispatch_checkpoint_service = DispatchCheckpointService()
@@ -0,0 +1,157 @@
+"""
+Histórico de ciclos de monitoramento - BullBot Telegram
+Relatórios em um stream Redis limitado, codificados em JSON compacto
+"""
+
+import json
+from typing import List, Dict, Any
+from src.utils.config import settings
+from src.utils.logger import get_logger
+from src.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+
+CYCLES_STREAM_KEY = "monitoring_cycles"
+SYMBOL_COST_KEY = "monitoring_symbol_cost"
+
+# Campos persistidos de cada relatório (o restante é descartado)
+REPORT_FIELDS = (
+    "cycle_id",
+    "cycle_start_time",
+    "cycle_end_time",
+    "cycle_duration_seconds",
+    "total_symbols",
+    "total_exchanges",
+    "batches",
+    "processed_count",
+    "error_count",
+    "status",
+)
+
+
+class MonitoringHistoryService:
+    """Grava e consulta relatórios de ciclo em ordem de chegada (XADD/XREVRANGE)"""
+
+    def __init__(self):
+        self.logger = logger
+
+    def record_cycle(self, report: Dict[str, Any]) -> None:
+        """
+        Adicionar relatório ao stream, descartando os mais antigos
+
+        Args:
+            report: Relatório gerado por finalize_monitoring_cycle
+        """
+        data = json.dumps(
+            {field: report.get(field) for field in REPORT_FIELDS},
+            separators=(",", ":"),
+        )
+        get_redis().xadd(
+            CYCLES_STREAM_KEY,
+            {"d": data},
+            maxlen=settings.monitoring_history_max_cycles,
+            approximate=True,
+        )
+
+    def get_recent_cycles(self, count: int = 10) -> List[Dict[str, Any]]:
+        """
+        Obter os últimos ciclos, mais recente primeiro
+
+        Args:
+            count: Quantidade de ciclos
+        """
+        try:
+            entries = get_redis().xrevrange(CYCLES_STREAM_KEY, count=count)
+            return [json.loads(fields[b"d"]) for _, fields in entries]
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao ler histórico de ciclos: {e}")
+            return []
+
+    def get_cycle_count(self) -> int:
+        """Quantidade de ciclos retidos no stream"""
+        try:
+            return get_redis().xlen(CYCLES_STREAM_KEY)
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao contar ciclos: {e}")
+            return 0
+
+    def record_symbol_cost(self, exchange: str, seconds_per_symbol: float) -> None:
+        """
+        Atualizar a média móvel (EWMA) do custo por símbolo da exchange
+
+        Args:
+            exchange: Nome da exchange
+            seconds_per_symbol: Custo médio medido no ciclo
+        """
+        try:
+            previous = get_redis().hget(SYMBOL_COST_KEY, exchange)
+            alpha = settings.monitoring_cost_ewma_alpha
+            cost = (
+                alpha * seconds_per_symbol + (1 - alpha) * float(previous)
+                if previous
+                else seconds_per_symbol
+            )
+            get_redis().hset(SYMBOL_COST_KEY, exchange, cost)
+
+        except Exception as e:
+            self.logger.warning(
+                f"⚠️ Erro ao registrar custo por símbolo de {exchange}: {e}"
+            )
+
+    def get_batch_size(self, exchange: str) -> int:
+        """
+        Tamanho de lote para que um lote leve cerca de
+        settings.monitoring_batch_target_seconds com a concorrência configurada
+        """
+        try:
+            cost = get_redis().hget(SYMBOL_COST_KEY, exchange)
+            if not cost or float(cost) <= 0:
+                return settings.monitoring_default_batch_size
+
+            batch_size = int(
+                settings.monitoring_batch_target_seconds
+                * settings.monitoring_symbol_concurrency
+                / float(cost)
+            )
+            return max(
+                settings.monitoring_batch_min_size,
+                min(batch_size, settings.monitoring_batch_max_size),
+            )
+
+        except Exception as e:
+            self.logger.warning(
+                f"⚠️ Erro ao calcular tamanho de lote de {exchange}: {e}"
+            )
+            return settings.monitoring_default_batch_size
+
+    def summarize(self, cycles: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Agregados móveis dos ciclos informados
+
+        Returns:
+            dict: Duração média/máxima e símbolos por segundo
+        """
+        durations = [
+            cycle["cycle_duration_seconds"]
+            for cycle in cycles
+            if cycle.get("cycle_duration_seconds") is not None
+        ]
+        total_duration = sum(durations)
+        total_symbols = sum(cycle.get("total_symbols") or 0 for cycle in cycles)
+
+        return {
+            "cycles": len(cycles),
+            "mean_duration_seconds": total_duration / len(durations)
+            if durations
+            else None,
+            "max_duration_seconds": max(durations) if durations else None,
+            "symbols_per_second": total_symbols / total_duration
+            if total_duration
+            else None,
+        }
+
+
+# Instância global do serviço
+monitoring_history_service = MonitoringHistoryService()
@@ -0,0 +1,69 @@
+"""
+Manutenção incremental do Redis - BullBot Telegram
+Varredura por SCAN com cursor persistido, sem KEYS bloqueando o Redis
+compartilhado com o broker do Celery
+"""
+
+import time
+from typing import Dict, Any
+from src.utils.config import settings
+from src.utils.logger import get_logger
+from src.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+
+SWEEP_CURSOR_KEY_PREFIX = "redis_sweep_cursor:"
+
+
+class RedisMaintenanceService:
+    """Varredura SCAN incremental com orçamento de tempo por execução"""
+
+    def __init__(self):
+        self.logger = logger
+
+    def sweep(self, pattern: str) -> Dict[str, Any]:
+        """
+        Remover chaves que casam com o padrão usando SCAN incremental
+
+        A varredura para quando o orçamento de tempo acaba e continua do
+        cursor salvo na próxima execução; UNLINK libera a memória fora da
+        thread principal do Redis.
+
+        Args:
+            pattern: Padrão MATCH do SCAN (ex: "signal_cache_*")
+
+        Returns:
+            dict: Chaves removidas, cursor salvo e se a varredura completou
+        """
+        cursor_key = f"{SWEEP_CURSOR_KEY_PREFIX}{pattern}"
+        deadline = time.monotonic() + settings.redis_sweep_budget_ms / 1000
+        deleted = 0
+
+        try:
+            cursor = int(get_redis().get(cursor_key) or 0)
+
+            while True:
+                cursor, keys = get_redis().scan(
+                    cursor=cursor, match=pattern, count=settings.redis_sweep_scan_count
+                )
+                if keys:
+                    deleted += get_redis().unlink(*keys)
+
+                if cursor == 0 or time.monotonic() >= deadline:
+                    break
+
+            if cursor:
+                get_redis().set(cursor_key, cursor, ex=86400)
+            else:
+                get_redis().delete(cursor_key)
+
+            return {"pattern": pattern, "deleted": deleted, "completed": cursor == 0}
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro na varredura {pattern}: {e}")
+            return {"pattern": pattern, "deleted": deleted, "completed": False}
+
+
+# Instância global do serviço
+redis_maintenance_service = RedisMaintenanceService()
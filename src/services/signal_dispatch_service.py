@@ -3,7 +3,7 @@ Serviço para determinar quais usuários devem receber sinais - BullBot Telegram
 Aplica filtros personalizados e lógica de eligibilidade por usuário
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc
 from src.database.connection import get_db
@@ -11,11 +11,29 @@ from src.database.models import (
     UserMonitoringConfig,
     SignalHistory,
 )
+from src.services.digest_service import digest_service
+from src.utils.config import settings
 from src.utils.logger import get_logger
+from src.utils.tracing import span
 from datetime import datetime, timezone, timedelta
 
 logger = get_logger(__name__)
 
+# Colunas lidas pelos filtros de elegibilidade e anti-spam (modo enxuto)
+SLIM_CONFIG_COLUMNS = (
+    UserMonitoringConfig.id,
+    UserMonitoringConfig.user_id,
+    UserMonitoringConfig.chat_id,
+    UserMonitoringConfig.chat_type,
+    UserMonitoringConfig.config_name,
+    UserMonitoringConfig.priority,
+    UserMonitoringConfig.symbols,
+    UserMonitoringConfig.timeframes,
+    UserMonitoringConfig.indicators_config,
+    UserMonitoringConfig.filter_config,
+    UserMonitoringConfig.last_signal_at,
+)
+
 
 class SignalDispatchService:
     """Serviço para determinar usuários elegíveis para receber sinais"""
@@ -23,6 +41,10 @@ class SignalDispatchService:
     def __init__(self):
         self.logger = logger
 
+    def _now(self) -> datetime:
+        """Relógio dos filtros anti-spam (o replay histórico usa o do sinal)"""
+        return datetime.now(timezone.utc)
+
     def get_eligible_users_for_signal(
         self, signal_data: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
@@ -66,6 +88,16 @@ class SignalDispatchService:
         """
         Determinar quais usuários devem receber um sinal específico (com sessão fornecida)
         """
+        with span("get_eligible_users_for_signal_with_session") as trace_span:
+            eligible_users = self._find_eligible_users(signal_data, db)
+            if trace_span:
+                trace_span.set_attribute("matched_users", len(eligible_users))
+            return eligible_users
+
+    def _find_eligible_users(
+        self, signal_data: Dict[str, Any], db: Session
+    ) -> List[Dict[str, Any]]:
+        """Aplicar elegibilidade e anti-spam às configurações ativas"""
         try:
             symbol = signal_data.get("symbol", "").upper()
             timeframe = signal_data.get("timeframe", "")
@@ -81,6 +113,9 @@ class SignalDispatchService:
                 )
                 return []
 
+            if settings.worker_slim_mode:
+                return self._stream_eligible_users(signal_data, db)
+
             # Buscar usuários ativos diretamente da tabela unificada
             active_configs = (
                 db.query(UserMonitoringConfig)
@@ -120,6 +155,9 @@ class SignalDispatchService:
                                     "chat_type": config.chat_type,
                                     "config_name": config.config_name,
                                     "config_priority": config.priority,
+                                    "digest_window_seconds": digest_service.get_window_seconds(
+                                        config.filter_config
+                                    ),
                                     "user_config": config,
                                 }
                             )
@@ -134,6 +172,50 @@ class SignalDispatchService:
             self.logger.error(f"❌ Erro ao determinar usuários elegíveis: {e}")
             return []
 
+    def _stream_eligible_users(
+        self, signal_data: Dict[str, Any], db: Session
+    ) -> List[Dict[str, Any]]:
+        """
+        Elegibilidade no modo enxuto: só as colunas usadas pelos filtros, lidas
+        em streaming, sem objetos ORM no identity map da sessão
+        """
+        rows = (
+            db.query(*SLIM_CONFIG_COLUMNS)
+            .filter(UserMonitoringConfig.active == True)  # noqa: E712
+            .order_by(desc(UserMonitoringConfig.priority), UserMonitoringConfig.id)
+            .yield_per(max(1, settings.slim_stream_batch_size))
+        )
+
+        eligible_users = []
+        matched_chats = set()
+
+        # Linhas chegam em prioridade decrescente: a primeira configuração
+        # elegível de cada chat vence, como no agrupamento por usuário
+        for config in rows:
+            if config.chat_id in matched_chats:
+                continue
+
+            if self._is_user_eligible_for_signal(
+                config, signal_data
+            ) and self._check_anti_spam_filters_with_session(config, signal_data, db):
+                matched_chats.add(config.chat_id)
+                eligible_users.append(
+                    {
+                        "chat_id": config.chat_id,
+                        "chat_type": config.chat_type,
+                        "config_name": config.config_name,
+                        "config_priority": config.priority,
+                        "digest_window_seconds": digest_service.get_window_seconds(
+                            config.filter_config
+                        ),
+                    }
+                )
+
+        self.logger.info(
+            f"Encontrados {len(eligible_users)} usuários elegíveis para o sinal"
+        )
+        return eligible_users
+
     def _is_user_eligible_for_signal(
         self,
         config: UserMonitoringConfig,
@@ -208,7 +290,12 @@ class SignalDispatchService:
     def _check_anti_spam_filters_with_session(
         self, config: UserMonitoringConfig, signal_data: Dict[str, Any], db: Session
     ) -> bool:
-        """Verificar filtros anti-spam para evitar sinais excessivos (com sessão fornecida)"""
+        """
+        Verificar filtros anti-spam para evitar sinais excessivos (com sessão fornecida)
+
+        Os filtros usam o histórico da própria configuração avaliada (chat_id é
+        único), sem consultar o banco de novo por usuário.
+        """
         try:
             symbol = signal_data.get("symbol", "").upper()
             timeframe = signal_data.get("timeframe", "")
@@ -221,9 +308,11 @@ class SignalDispatchService:
 
             # 1. Verificar limite diário de sinais
             max_signals_per_day = filter_config.get("max_signals_per_day", 3)
-            if not self._check_daily_limit_with_session(
-                config.user_id, symbol, max_signals_per_day, db
-            ):
+            with span("anti_spam.daily_limit", user_id=config.user_id):
+                within_daily_limit = self._check_daily_limit_for_config(
+                    config, symbol, max_signals_per_day
+                )
+            if not within_daily_limit:
                 self.logger.info(
                     f"Usuário {config.user_id} atingiu limite diário para {symbol}"
                 )
@@ -231,9 +320,11 @@ class SignalDispatchService:
 
             # 2. Verificar cooldown por timeframe e força
             cooldown_config = filter_config.get("cooldown_minutes", {})
-            if not self._check_cooldown_with_session(
-                config.user_id, symbol, timeframe, strength, cooldown_config, db
-            ):
+            with span("anti_spam.cooldown", user_id=config.user_id):
+                cooldown_ok = self._check_cooldown_for_config(
+                    config, symbol, timeframe, strength, cooldown_config
+                )
+            if not cooldown_ok:
                 self.logger.info(
                     f"Usuário {config.user_id} em cooldown para {symbol} {timeframe} {strength}"
                 )
@@ -241,9 +332,11 @@ class SignalDispatchService:
 
             # 3. Verificar diferença mínima de RSI
             min_rsi_diff = filter_config.get("min_rsi_difference", 2.0)
-            if not self._check_rsi_difference_with_session(
-                config.user_id, symbol, rsi_value, min_rsi_diff, db
-            ):
+            with span("anti_spam.rsi_difference", user_id=config.user_id):
+                rsi_difference_ok = self._check_rsi_difference_for_config(
+                    config, symbol, rsi_value, min_rsi_diff
+                )
+            if not rsi_difference_ok:
                 self.logger.info(
                     f"Usuário {config.user_id} RSI muito próximo do último sinal para {symbol}"
                 )
@@ -255,6 +348,16 @@ class SignalDispatchService:
             self.logger.error(f"❌ Erro ao verificar filtros anti-spam: {e}")
             return True  # Em caso de erro, permitir o sinal
 
+    def _get_config_by_user_with_session(
+        self, user_id: int, db: Session
+    ) -> Optional[UserMonitoringConfig]:
+        """Buscar a configuração do usuário para as verificações avulsas"""
+        return (
+            db.query(UserMonitoringConfig)
+            .filter(UserMonitoringConfig.user_id == user_id)
+            .first()
+        )
+
     def _check_daily_limit(self, user_id: int, symbol: str, max_signals: int) -> bool:
         """Verificar se usuário não ultrapassou limite diário de sinais"""
         try:
@@ -271,18 +374,24 @@ class SignalDispatchService:
     ) -> bool:
         """Verificar se usuário não ultrapassou limite diário de sinais (com sessão fornecida)"""
         try:
-            # Buscar configuração do usuário para verificar histórico
-            config = (
-                db.query(UserMonitoringConfig)
-                .filter(UserMonitoringConfig.user_id == user_id)
-                .first()
-            )
+            config = self._get_config_by_user_with_session(user_id, db)
 
             if not config:
                 return True  # Usuário não encontrado, permitir sinal
 
+            return self._check_daily_limit_for_config(config, symbol, max_signals)
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao verificar limite diário: {e}")
+            return True
+
+    def _check_daily_limit_for_config(
+        self, config: UserMonitoringConfig, symbol: str, max_signals: int
+    ) -> bool:
+        """Verificar limite diário de sinais com a configuração já carregada"""
+        try:
             # Verificar se é um novo dia (reset do contador)
-            today = datetime.now(timezone.utc).date()
+            today = self._now().date()
             last_signal_date = (
                 config.last_signal_at.date() if config.last_signal_at else None
             )
@@ -307,7 +416,7 @@ class SignalDispatchService:
             symbol_count = daily_counts.get("symbols", {}).get(symbol, 0)
 
             self.logger.info(
-                f"Usuário {user_id} já recebeu {symbol_count}/{max_signals} sinais de {symbol} hoje"
+                f"Usuário {config.user_id} já recebeu {symbol_count}/{max_signals} sinais de {symbol} hoje"
             )
 
             return symbol_count < max_signals
@@ -344,6 +453,29 @@ class SignalDispatchService:
         db: Session,
     ) -> bool:
         """Verificar se cooldown foi respeitado (com sessão fornecida)"""
+        try:
+            config = self._get_config_by_user_with_session(user_id, db)
+
+            if not config:
+                return True  # Usuário não encontrado
+
+            return self._check_cooldown_for_config(
+                config, symbol, timeframe, strength, cooldown_config
+            )
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao verificar cooldown: {e}")
+            return True
+
+    def _check_cooldown_for_config(
+        self,
+        config: UserMonitoringConfig,
+        symbol: str,
+        timeframe: str,
+        strength: str,
+        cooldown_config: Dict[str, Any],
+    ) -> bool:
+        """Verificar cooldown com a configuração já carregada"""
         try:
             # Obter configuração de cooldown para este timeframe e força
             tf_config = cooldown_config.get(timeframe, {})
@@ -352,24 +484,15 @@ class SignalDispatchService:
             if cooldown_minutes <= 0:
                 return True  # Sem cooldown configurado
 
-            # Buscar configuração do usuário para verificar último sinal
-            config = (
-                db.query(UserMonitoringConfig)
-                .filter(UserMonitoringConfig.user_id == user_id)
-                .first()
-            )
-
-            if not config or not config.last_signal_at:
-                return True  # Usuário não encontrado ou sem histórico
+            if not config.last_signal_at:
+                return True  # Sem histórico
 
             # Verificar se está dentro do período de cooldown
-            cutoff_time = datetime.now(timezone.utc) - timedelta(
-                minutes=cooldown_minutes
-            )
+            cutoff_time = self._now() - timedelta(minutes=cooldown_minutes)
 
             if config.last_signal_at >= cutoff_time:
                 self.logger.info(
-                    f"Usuário {user_id} em cooldown para {symbol} ({cooldown_minutes}min)"
+                    f"Usuário {config.user_id} em cooldown para {symbol} ({cooldown_minutes}min)"
                 )
                 return False
 
@@ -402,18 +525,33 @@ class SignalDispatchService:
     ) -> bool:
         """Verificar se RSI atual tem diferença mínima do último sinal (com sessão fornecida)"""
         try:
-            if min_difference <= 0:
-                return True  # Sem diferença mínima configurada
+            config = self._get_config_by_user_with_session(user_id, db)
 
-            # Buscar configuração do usuário para verificar último RSI
-            config = (
-                db.query(UserMonitoringConfig)
-                .filter(UserMonitoringConfig.user_id == user_id)
-                .first()
+            if not config:
+                return True  # Usuário não encontrado
+
+            return self._check_rsi_difference_for_config(
+                config, symbol, current_rsi, min_difference
             )
 
-            if not config or not config.filter_config:
-                return True  # Usuário não encontrado ou sem histórico
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao verificar diferença de RSI: {e}")
+            return True
+
+    def _check_rsi_difference_for_config(
+        self,
+        config: UserMonitoringConfig,
+        symbol: str,
+        current_rsi: float,
+        min_difference: float,
+    ) -> bool:
+        """Verificar diferença mínima de RSI com a configuração já carregada"""
+        try:
+            if min_difference <= 0:
+                return True  # Sem diferença mínima configurada
+
+            if not config.filter_config:
+                return True  # Sem histórico
 
             # Verificar último RSI armazenado para este símbolo
             last_rsi_data = config.filter_config.get("last_rsi_by_symbol", {})
@@ -427,7 +565,7 @@ class SignalDispatchService:
             is_valid = rsi_difference >= min_difference
 
             self.logger.info(
-                f"Usuário {user_id} RSI {symbol}: {last_rsi} → {current_rsi} (diff: {rsi_difference:.1f}, min: {min_difference})"
+                f"Usuário {config.user_id} RSI {symbol}: {last_rsi} → {current_rsi} (diff: {rsi_difference:.1f}, min: {min_difference})"
             )
 
             return is_valid
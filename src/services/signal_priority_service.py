@@ -0,0 +1,120 @@
+"""
+Serviço de priorização de sinais - BullBot Telegram
+Ordena matching e envio por valor do sinal: força, urgência do timeframe, scores e idade
+"""
+
+import time
+from typing import List, Dict, Any
+from src.services.delivery_latency_service import parse_signal_timestamp
+from src.utils.config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Peso relativo da força do sinal (0-1)
+STRENGTH_SCORES = {
+    "STRONG": 1.0,
+    "MODERATE": 0.6,
+    "WEAK": 0.3,
+}
+
+# Urgência por timeframe: sinais curtos perdem valor mais rápido (0-1)
+TIMEFRAME_URGENCY = {
+    "15m": 1.0,
+    "1h": 0.7,
+    "4h": 0.4,
+    "1d": 0.2,
+}
+
+# Duração de cada timeframe em segundos (escala do fator de idade)
+TIMEFRAME_SECONDS = {
+    "15m": 15 * 60,
+    "1h": 60 * 60,
+    "4h": 4 * 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+
+# Prioridades de task do Celery com broker Redis: 0 = mais alta, 9 = mais baixa
+CELERY_PRIORITY_LEVELS = 10
+
+
+class SignalPriorityService:
+    """Calcula score de prioridade e ordena sinais pendentes"""
+
+    def __init__(self):
+        self.logger = logger
+
+    def score(self, signal_data: Dict[str, Any], now: float = None) -> float:
+        """
+        Calcular score de prioridade do sinal (maior = mais urgente)
+
+        Combina força, urgência do timeframe, confidence_score/combined_score
+        e idade relativa ao timeframe (evita que sinais antigos fiquem presos).
+        """
+        now = now or time.time()
+        timeframe = signal_data.get("timeframe") or ""
+        strength = (signal_data.get("strength") or "").upper()
+
+        strength_score = STRENGTH_SCORES.get(strength, 0.3)
+        urgency = TIMEFRAME_URGENCY.get(timeframe, 0.2)
+
+        # Scores de confluência normalizados para 0-1
+        if signal_data.get("confidence_score") is not None:
+            confidence = signal_data["confidence_score"] / 100
+        elif signal_data.get("combined_score") is not None:
+            confidence = signal_data["combined_score"] / 8
+        else:
+            confidence = 0.5
+        confidence = max(0.0, min(confidence, 1.0))
+
+        created_at = parse_signal_timestamp(signal_data.get("created_at"))
+        age_factor = 0.0
+        if created_at:
+            age_seconds = max(0.0, now - created_at)
+            age_factor = min(age_seconds / TIMEFRAME_SECONDS.get(timeframe, 3600), 1.0)
+
+        return (
+            settings.signal_priority_weight_strength * strength_score
+            + settings.signal_priority_weight_timeframe * urgency
+            + settings.signal_priority_weight_confidence * confidence
+            + settings.signal_priority_weight_age * age_factor
+        )
+
+    def get_max_age_minutes(self) -> Dict[str, int]:
+        """Idade máxima de envio por timeframe (configurações)"""
+        return {
+            "15m": settings.signal_max_age_minutes_15m,
+            "1h": settings.signal_max_age_minutes_1h,
+            "4h": settings.signal_max_age_minutes_4h,
+            "1d": settings.signal_max_age_minutes_1d,
+        }
+
+    def order_signals(self, signals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Ordenar sinais por score decrescente (desempate: mais recente primeiro)"""
+        now = time.time()
+        for signal in signals:
+            signal["priority_score"] = round(self.score(signal, now), 4)
+
+        return sorted(
+            signals,
+            key=lambda s: (s["priority_score"], s.get("created_at") or ""),
+            reverse=True,
+        )
+
+    def to_celery_priority(self, score: float) -> int:
+        """Converter score em prioridade de task do Celery (0 = mais alta)"""
+        max_score = (
+            settings.signal_priority_weight_strength
+            + settings.signal_priority_weight_timeframe
+            + settings.signal_priority_weight_confidence
+            + settings.signal_priority_weight_age
+        )
+        if max_score <= 0:
+            return CELERY_PRIORITY_LEVELS // 2
+
+        normalized = max(0.0, min(score / max_score, 1.0))
+        return int(round((1 - normalized) * (CELERY_PRIORITY_LEVELS - 1)))
+
+
+# Instância global do serviço
+signal_priority_service = SignalPriorityService()
@@ -3,17 +3,35 @@ Serviço para leitura de sinais do banco - BullBot Telegram
 Focado em buscar sinais não processados diretamente do banco compartilhado
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, desc, or_, update
 from src.database.connection import get_db
 from src.database.models import SignalHistory
+from src.services.dispatch_checkpoint_service import dispatch_checkpoint_service
+from src.utils.lease_lock import Fence, StaleLeaseError
 from src.utils.logger import get_logger
 from src.utils.config import settings
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 
 logger = get_logger(__name__)
 
+# Colunas usadas pela priorização, elegibilidade e render (modo enxuto)
+SLIM_SIGNAL_COLUMNS = (
+    SignalHistory.id,
+    SignalHistory.symbol,
+    SignalHistory.signal_type,
+    SignalHistory.strength,
+    SignalHistory.price,
+    SignalHistory.timeframe,
+    SignalHistory.source,
+    SignalHistory.message,
+    SignalHistory.created_at,
+    SignalHistory.indicator_data,
+    SignalHistory.confidence_score,
+    SignalHistory.combined_score,
+)
+
 
 class SignalReader:
     """Serviço para leitura direta de sinais do banco compartilhado"""
@@ -55,10 +73,15 @@ class SignalReader:
         try:
             db = next(get_db())
 
+            # Modo enxuto: só as colunas usadas no envio, sem objetos ORM
+            if settings.worker_slim_mode:
+                query = db.query(*SLIM_SIGNAL_COLUMNS)
+            else:
+                query = db.query(SignalHistory)
+
             # Query direta ao banco - muito mais performático
             signals = (
-                db.query(SignalHistory)
-                .filter(
+                query.filter(
                     and_(
                         SignalHistory.processed == False,  # noqa: E712
                         SignalHistory.signal_type.in_(
@@ -74,6 +97,14 @@ class SignalReader:
             # Converter para dicionários
             signals_data = []
             for signal in signals:
+                if settings.worker_slim_mode:
+                    signal_dict = signal._asdict()
+                    signal_dict["created_at"] = (
+                        signal.created_at.isoformat() if signal.created_at else None
+                    )
+                    signals_data.append(signal_dict)
+                    continue
+
                 signal_dict = {
                     "id": signal.id,
                     "symbol": signal.symbol,
@@ -118,9 +149,14 @@ class SignalReader:
             )
             return False
 
-    def mark_signal_processed_with_session(self, signal_id: int, db: Session) -> bool:
+    def mark_signal_processed_with_session(
+        self, signal_id: int, db: Session, fence: Optional[Fence] = None
+    ) -> bool:
         """
         Marcar sinal como processado usando sessão fornecida
+
+        Com fence (token do lease do ciclo) o commit é recusado se outro
+        worker assumiu o ciclo nesse meio tempo.
         """
         try:
             # Atualizar diretamente no banco
@@ -133,6 +169,8 @@ class SignalReader:
                 signal.processed_at = datetime.now(timezone.utc)
                 signal.processed_by = self.bot_id
 
+                if fence:
+                    fence.check()
                 db.commit()
 
                 self.logger.info(
@@ -143,12 +181,84 @@ class SignalReader:
                 self.logger.warning(f"⚠️ Sinal {signal_id} não encontrado no banco")
                 return False
 
+        except StaleLeaseError as e:
+            db.rollback()
+            self.logger.error(f"❌ Sinal {signal_id} não marcado como processado: {e}")
+            return False
         except Exception as e:
             self.logger.error(
                 f"❌ Erro ao marcar sinal {signal_id} como processado: {e}"
             )
             return False
 
+    def mark_stale_signals(
+        self, max_age_minutes_by_timeframe: Dict[str, int]
+    ) -> List[Tuple[str, str]]:
+        """
+        Marcar como processados ("stale") os sinais pendentes velhos demais
+
+        Um único UPDATE cobre todo o backlog, então a retomada após uma queda
+        não gasta ciclos nem envios com sinais que já perderam o valor. Os
+        checkpoints desses sinais são removidos para não manter o ciclo
+        retomando trabalho que não existe mais.
+
+        Args:
+            max_age_minutes_by_timeframe: Idade máxima em minutos por timeframe
+
+        Returns:
+            Lista de (timeframe, symbol) dos sinais descartados
+        """
+        try:
+            db = next(get_db())
+            now = datetime.now(timezone.utc)
+
+            cutoffs = [
+                and_(
+                    SignalHistory.timeframe == timeframe,
+                    SignalHistory.created_at < now - timedelta(minutes=max_age),
+                )
+                for timeframe, max_age in max_age_minutes_by_timeframe.items()
+                if max_age > 0
+            ]
+
+            if not cutoffs:
+                return []
+
+            result = db.execute(
+                update(SignalHistory)
+                .where(
+                    and_(
+                        SignalHistory.processed == False,  # noqa: E712
+                        SignalHistory.signal_type.in_(["BUY", "SELL", "buy", "sell"]),
+                        or_(*cutoffs),
+                    )
+                )
+                .values(
+                    processed=True,
+                    processed_at=now,
+                    processed_by=f"{self.bot_id}:stale",
+                )
+                .returning(
+                    SignalHistory.id, SignalHistory.timeframe, SignalHistory.symbol
+                )
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+            db.commit()
+
+            dispatch_checkpoint_service.discard([row.id for row in rows])
+            stale_signals = [(row.timeframe, row.symbol) for row in rows]
+
+            if stale_signals:
+                self.logger.info(
+                    f"{len(stale_signals)} sinais antigos marcados como stale sem envio"
+                )
+            return stale_signals
+
+        except Exception as e:
+            self.logger.error(f"❌ Erro ao descartar sinais antigos: {e}")
+            return []
+
     def get_system_status(self) -> Optional[Dict[str, Any]]:
         """
         Obter status do sistema via queries diretas ao banco
@@ -0,0 +1,56 @@
+"""
+Escrita em lote de estatísticas de assinantes - BullBot Telegram
+Acumula incrementos por chat durante um fan-out e aplica tudo em um único commit
+"""
+
+from typing import Dict, Any
+from sqlalchemy.orm import Session
+from src.services.user_config_service import user_config_service
+from src.utils.logger import get_logger
+from datetime import datetime, timezone
+
+logger = get_logger(__name__)
+
+
+class SignalStatsWriter:
+    """Acumulador de estatísticas de envio por chat_id"""
+
+    def __init__(self):
+        self.logger = logger
+        self.pending: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, chat_id: str, symbol: str = None, rsi_value: float = None):
+        """Registrar um envio bem-sucedido para aplicar no próximo flush"""
+        chat_id = str(chat_id)
+        increment = self.pending.get(chat_id)
+
+        if increment is None:
+            increment = {"count": 0, "symbols": {}, "last_rsi": {}}
+            self.pending[chat_id] = increment
+
+        increment["count"] += 1
+        increment["last_signal_at"] = datetime.now(timezone.utc)
+
+        if symbol:
+            increment["symbols"][symbol] = increment["symbols"].get(symbol, 0) + 1
+            if rsi_value is not None:
+                increment["last_rsi"][symbol] = rsi_value
+
+    def flush(self, db: Session) -> int:
+        """
+        Aplicar incrementos acumulados no banco
+
+        Sempre aplicados, mesmo com o lease do ciclo vencido: as mensagens já
+        foram entregues e o anti-spam depende dessas contagens.
+
+        Returns:
+            Número de chats atualizados
+        """
+        if not self.pending:
+            return 0
+
+        pending, self.pending = self.pending, {}
+        return user_config_service.apply_signal_stats_batch_with_session(pending, db)
+
+    def __len__(self) -> int:
+        return len(self.pending)
@@ -5,7 +5,7 @@ Lida com CRUD de configurações personalizadas, assinaturas e estatísticas
 
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, func
+from sqlalchemy import and_, desc, func, update
 from src.database.connection import get_db
 from src.database.models import UserMonitoringConfig
 from src.utils.logger import get_logger
@@ -388,6 +388,55 @@ class UserConfigService:
             self.logger.error(f"Erro ao atualizar filtros do usuário {user_id}: {e}")
             return False
 
+    def update_user_digest_config(
+        self,
+        user_id: int,
+        enabled: bool,
+        window_minutes: int = None,
+        config_name: str = "default",
+    ) -> bool:
+        """Ativar/desativar modo resumo (digest) na configuração de filtros"""
+        try:
+            db = next(get_db())
+
+            config = (
+                db.query(UserMonitoringConfig)
+                .filter(
+                    and_(
+                        UserMonitoringConfig.user_id == user_id,
+                        UserMonitoringConfig.config_name == config_name,
+                        UserMonitoringConfig.active == True,  # noqa: E712
+                    )
+                )
+                .first()
+            )
+
+            if not config:
+                self.logger.warning(
+                    f"Configuração '{config_name}' não encontrada para usuário {user_id}"
+                )
+                return False
+
+            filter_config = dict(config.filter_config or {})
+            digest_config = {"enabled": enabled}
+            if window_minutes is not None:
+                digest_config["window_minutes"] = window_minutes
+            filter_config["digest"] = digest_config
+
+            config.filter_config = filter_config
+            config.updated_at = datetime.now(timezone.utc)
+
+            db.commit()
+
+            self.logger.info(
+                f"Modo resumo {'ativado' if enabled else 'desativado'} para usuário {user_id}"
+            )
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Erro ao atualizar resumo do usuário {user_id}: {e}")
+            return False
+
     def get_user_config_summary(
         self, user_id: int, config_name: str = "default"
     ) -> Optional[Dict[str, Any]]:
@@ -657,7 +706,6 @@ class UserConfigService:
                 return False
 
             now = datetime.now(timezone.utc)
-            today = now.date()
 
             # Atualizar contadores básicos
             config.signals_received += 1
@@ -667,23 +715,11 @@ class UserConfigService:
             if not config.filter_config:
                 config.filter_config = {}
 
-            # Atualizar contador diário por símbolo
-            if symbol:
-                daily_counts = config.filter_config.get("daily_signal_counts", {})
-                today_str = today.isoformat()
-
-                # Reset se é um novo dia
-                if daily_counts.get("date") != today_str:
-                    daily_counts = {"date": today_str, "symbols": {}}
-
-                # Incrementar contador do símbolo
-                if "symbols" not in daily_counts:
-                    daily_counts["symbols"] = {}
-                daily_counts["symbols"][symbol] = (
-                    daily_counts["symbols"].get(symbol, 0) + 1
-                )
-
-                config.filter_config["daily_signal_counts"] = daily_counts
+            self._apply_signal_to_filter_config(
+                config.filter_config,
+                now.date().isoformat(),
+                {symbol: 1} if symbol else {},
+            )
 
             # Armazenar último RSI por símbolo para verificação de diferença
             if symbol and rsi_value is not None:
@@ -709,6 +745,99 @@ class UserConfigService:
             )
             return False
 
+    def apply_signal_stats_batch_with_session(
+        self, increments: Dict[str, Dict[str, Any]], db: Session
+    ) -> int:
+        """
+        Aplicar incrementos acumulados de vários chats em um único UPDATE em lote
+
+        Args:
+            increments: Mapa chat_id -> {"count", "symbols", "last_rsi", "last_signal_at"}
+            db: Sessão de banco de dados
+
+        Returns:
+            Número de configurações atualizadas
+        """
+        if not increments:
+            return 0
+
+        try:
+            rows = (
+                db.query(
+                    UserMonitoringConfig.id,
+                    UserMonitoringConfig.chat_id,
+                    UserMonitoringConfig.signals_received,
+                    UserMonitoringConfig.filter_config,
+                )
+                .filter(UserMonitoringConfig.chat_id.in_(list(increments.keys())))
+                .all()
+            )
+
+            today_str = datetime.now(timezone.utc).date().isoformat()
+            updates = []
+
+            for row in rows:
+                increment = increments[row.chat_id]
+
+                # Copiar JSON para não depender de mutação in-place
+                filter_config = dict(row.filter_config or {})
+                self._apply_signal_to_filter_config(
+                    filter_config, today_str, increment["symbols"]
+                )
+
+                if increment["last_rsi"]:
+                    last_rsi = dict(filter_config.get("last_rsi_by_symbol", {}))
+                    last_rsi.update(increment["last_rsi"])
+                    filter_config["last_rsi_by_symbol"] = last_rsi
+
+                updates.append(
+                    {
+                        "id": row.id,
+                        "signals_received": (row.signals_received or 0)
+                        + increment["count"],
+                        "last_signal_at": increment["last_signal_at"],
+                        "filter_config": filter_config,
+                    }
+                )
+
+            if updates:
+                # UPDATE em lote por chave primária (executemany) + um único commit
+                db.execute(update(UserMonitoringConfig), updates)
+                db.commit()
+
+            self.logger.info(
+                f"Estatísticas atualizadas em lote para {len(updates)} chats"
+            )
+            return len(updates)
+
+        except Exception as e:
+            self.logger.error(f"Erro ao aplicar estatísticas em lote: {e}")
+            db.rollback()
+            return 0
+
+    def _apply_signal_to_filter_config(
+        self,
+        filter_config: Dict[str, Any],
+        today_str: str,
+        symbol_counts: Dict[str, int],
+    ) -> None:
+        """Somar contadores diários por símbolo no filter_config"""
+        if not symbol_counts:
+            return
+
+        daily_counts = dict(filter_config.get("daily_signal_counts", {}))
+
+        # Reset se é um novo dia
+        if daily_counts.get("date") != today_str:
+            daily_counts = {"date": today_str, "symbols": {}}
+
+        symbols = dict(daily_counts.get("symbols", {}))
+        for symbol, count in symbol_counts.items():
+            symbols[symbol] = symbols.get(symbol, 0) + count
+
+        daily_counts["symbols"] = symbols
+        filter_config["daily_signal_counts"] = daily_counts
+
     def get_subscription_stats(self) -> Dict[str, Any]:
         """Obter estatísticas gerais de assinantes"""
         try:
@@ -0,0 +1,116 @@
+"""
+Autoscaler Celery guiado pela profundidade das filas - BullBot Telegram
+Ativado com --autoscale=max,min; ajusta o pool do worker à carga das filas
+que ele consome, não só às tasks já reservadas
+"""
+
+import math
+from time import monotonic
+from typing import Dict, Any, List
+from celery.worker.autoscale import Autoscaler
+from src.services.capacity_service import capacity_service
+from src.services.digest_service import DIGEST_FLUSH_LIMIT
+from src.tasks.queues import (
+    DISPATCH_QUEUE,
+    MAINTENANCE_QUEUE,
+    MONITORING_QUEUE,
+    SEND_QUEUE,
+)
+from src.utils.config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PIPELINE_QUEUES = [DISPATCH_QUEUE, SEND_QUEUE, MONITORING_QUEUE, MAINTENANCE_QUEUE]
+
+
+def measure_load(queues: List[str]) -> Dict[str, Any]:
+    """Profundidade das filas e, conforme as filas, backlog e resumos pendentes"""
+    load = {"queues": capacity_service.get_queue_lengths(queues)}
+
+    # flush_signal_digests roda na fila de despacho
+    if DISPATCH_QUEUE in queues:
+        load["digest_outbox"] = capacity_service.get_digest_outbox()
+
+    # Com fan-out o backlog de sinais vira chunks na fila de envio
+    if SEND_QUEUE in queues and settings.dispatch_fanout_enabled:
+        load["signal_backlog"] = capacity_service.get_signal_backlog()
+
+    return load
+
+
+def desired_processes(queue: str, load: Dict[str, Any]) -> int:
+    """
+    Processos desejados para a fila
+
+    Args:
+        queue: Nome da fila
+        load: Resultado de measure_load()
+    """
+    pending = load.get("queues", {}).get(queue, 0)
+
+    if queue == DISPATCH_QUEUE:
+        # O ciclo de sinais roda um por vez sob LeaseLock: o backlog não
+        # ganha processos aqui. Os resumos saem em lotes de DIGEST_FLUSH_LIMIT
+        pending += math.ceil(load.get("digest_outbox", 0) / DIGEST_FLUSH_LIMIT)
+    elif queue == SEND_QUEUE:
+        # Cada sinal do backlog enfileira ao menos um chunk de fan-out
+        pending += load.get("signal_backlog", 0)
+
+    return capacity_service.processes_for(pending)
+
+
+def recommend_capacity() -> Dict[str, Any]:
+    """Carga atual e processos recomendados para cada fila do pipeline"""
+    load = measure_load(PIPELINE_QUEUES)
+    return {
+        "load": load,
+        "recommended_processes": {
+            queue: desired_processes(queue, load) for queue in PIPELINE_QUEUES
+        },
+    }
+
+
+class QueueDepthAutoscaler(Autoscaler):
+    """
+    Autoscaler cujo alvo é o maior entre as tasks reservadas (padrão do
+    Celery) e os processos desejados para as filas consumidas. A carga é
+    consultada no máximo a cada settings.autoscale_poll_seconds; o keepalive
+    do Celery evita encolher logo após crescer.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._desired = 0
+        self._checked_at = None
+
+    def _consumed_queues(self):
+        try:
+            return [queue.name for queue in self.worker.consumer.task_consumer.queues]
+        except Exception:
+            return []
+
+    def _desired_processes(self):
+        now = monotonic()
+        if (
+            self._checked_at is not None
+            and now - self._checked_at < settings.autoscale_poll_seconds
+        ):
+            return self._desired
+
+        self._checked_at = now
+        queues = self._consumed_queues()
+        if not queues:
+            return self._desired
+
+        try:
+            load = measure_load(queues)
+            self._desired = max(desired_processes(queue, load) for queue in queues)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao calcular capacidade desejada: {e}")
+
+        return self._desired
+
+    @property
+    def qty(self):
+        return max(super().qty, self._desired_processes())
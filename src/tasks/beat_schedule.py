@@ -3,37 +3,58 @@ Configuração do Celery Beat - BullBot Telegram
 Agendamento de tasks para processamento automático de sinais
 """
 
+from src.tasks.queues import DISPATCH_QUEUE, MAINTENANCE_QUEUE
+
 # Configuração do Beat Schedule
 beat_schedule = {
-    # Processar sinais não processados a cada 1 minuto (otimizado para recursos)
+    # Processar sinais não processados a cada 1 minuto. Com polling adaptativo
+    # a task se reagenda sozinha e esta entrada só atua como watchdog
     "process-signals-every-1min": {
         "task": "src.tasks.telegram_tasks.process_unprocessed_signals",
-        "schedule": 60.0,  # 1 minuto - balanceia responsividade e eficiência
-        "options": {"queue": "telegram"},
+        "schedule": 60.0,  # 1 minuto - reinicia a cadeia adaptativa se ela morrer
+        "options": {"queue": DISPATCH_QUEUE},
+    },
+    # Enviar resumos de sinais (modo digest) com janela expirada
+    "flush-signal-digests-every-30s": {
+        "task": "src.tasks.telegram_tasks.flush_signal_digests",
+        "schedule": 30.0,  # 30 segundos - precisão da janela do resumo
+        "options": {"queue": DISPATCH_QUEUE},
     },
     # Testar conexões a cada 5 minutos
     "test-connections-every-5min": {
         "task": "src.tasks.telegram_tasks.test_connections",
         "schedule": 300.0,  # 5 minutos
-        "options": {"queue": "telegram"},
+        "options": {"queue": MAINTENANCE_QUEUE},
+    },
+    # Recomendar processos por fila conforme a carga a cada 5 minutos
+    "capacity-recommendation-every-5min": {
+        "task": "src.tasks.telegram_tasks.get_capacity_recommendation",
+        "schedule": 300.0,  # 5 minutos
+        "options": {"queue": MAINTENANCE_QUEUE},
     },
     # Obter status do sistema a cada 15 minutos
     "get-system-status-every-15min": {
         "task": "src.tasks.telegram_tasks.get_system_status",
         "schedule": 900.0,  # 15 minutos
-        "options": {"queue": "telegram"},
+        "options": {"queue": MAINTENANCE_QUEUE},
+    },
+    # Registrar latência de entrega por estágio a cada 15 minutos
+    "delivery-latency-every-15min": {
+        "task": "src.tasks.telegram_tasks.get_delivery_latency_stats",
+        "schedule": 900.0,  # 15 minutos
+        "options": {"queue": MAINTENANCE_QUEUE},
     },
     # Obter estatísticas de assinantes a cada 30 minutos
     "subscription-stats-every-30min": {
         "task": "src.tasks.telegram_tasks.get_subscription_stats",
         "schedule": 1800.0,  # 30 minutos
-        "options": {"queue": "telegram"},
+        "options": {"queue": MAINTENANCE_QUEUE},
     },
     # Limpeza de cache e otimizações a cada hora
     "cleanup-every-hour": {
         "task": "src.tasks.telegram_tasks.cleanup_old_data",
         "schedule": 3600.0,  # 1 hora
-        "options": {"queue": "telegram"},
+        "options": {"queue": MAINTENANCE_QUEUE},
     },
 }
 
@@ -5,7 +5,22 @@ Configuração principal do Celery - BullBot Telegram
 import os
 import logging
 from celery import Celery
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+)
+from src.database.connection import dispose_engine_after_fork
 from src.utils.config import settings
+from src.utils.memory import task_memory_profiler
+from src.utils.metrics import (
+    mark_process_dead,
+    reset_multiprocess_dir,
+    start_metrics_server,
+)
+from src.tasks.queues import DISPATCH_QUEUE, task_routes
 
 # Configurar Celery
 celery_app = Celery(
@@ -23,22 +38,14 @@ celery_app.conf.update(
     # Timezone
     timezone="UTC",
     enable_utc=True,
-    # Task routing - usar fila específica para telegram
-    task_routes={
-        "src.tasks.telegram_tasks.*": {"queue": "telegram"},
-        "src.tasks.monitor_tasks.*": {"queue": "telegram"},
-    },
-    task_default_queue="telegram",
-    # Concorrência e Performance
-    worker_concurrency=settings.celery_worker_count,
-    task_acks_late=settings.celery_task_acknowledge_late,
-    worker_prefetch_multiplier=settings.celery_worker_prefetch_multiplier,
-    # Timeouts
-    task_soft_time_limit=settings.celery_task_soft_time_limit,
-    task_time_limit=settings.celery_task_time_limit,
+    # Task routing - uma fila por estágio do pipeline (ver src/tasks/queues.py)
+    task_routes=task_routes,
+    task_default_queue=DISPATCH_QUEUE,
     # Configurações de Performance
     worker_max_tasks_per_child=100,  # Reiniciar worker após 100 tasks
     worker_max_memory_per_child=200000,  # 200MB por worker
+    # Autoscaler guiado pelas filas (efetivo apenas com --autoscale=max,min)
+    worker_autoscaler="src.tasks.autoscaler:QueueDepthAutoscaler",
     task_compression="gzip",  # Comprimir tasks para economizar memória
     # Configurações de Retry
     task_default_retry_delay=60,  # 1 minuto entre retries
@@ -52,12 +59,43 @@ celery_app.conf.update(
     # Configurações para warnings de deprecação
     worker_cancel_long_running_tasks_on_connection_loss=True,
     broker_connection_retry_on_startup=True,
+    # Prioridade de tasks no broker Redis (0 = mais alta) - usada pelo fan-out
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
+    task_default_priority=5,
     # Configurações de conexão Redis
     broker_connection_retry=True,
     broker_connection_max_retries=10,
     broker_connection_retry_delay=0.5,
 )
 
+
+def settings_defaults():
+    """
+    Configurações do Celery vindas de settings
+
+    Registradas como promessa: o Celery só as avalia ao carregar a
+    configuração, então importar as tasks não valida o ambiente.
+    """
+    return {
+        # Concorrência e Performance
+        "worker_concurrency": settings.celery_worker_count,
+        "task_acks_late": settings.celery_task_acknowledge_late,
+        "worker_prefetch_multiplier": settings.celery_worker_prefetch_multiplier,
+        # Timeouts
+        "task_soft_time_limit": settings.celery_task_soft_time_limit,
+        "task_time_limit": settings.celery_task_time_limit,
+        # Configurações de conexão Redis
+        "broker_pool_limit": settings.celery_broker_pool_limit,
+        "redis_max_connections": settings.celery_result_backend_max_connections,
+    }
+
+
+celery_app.add_defaults(settings_defaults)
+
 # Configuração de logging
 celery_app.conf.worker_log_format = (
     "[%(asctime)s: %(levelname)s/%(processName)s] %(message)s"
@@ -79,6 +117,37 @@ logging.getLogger("celery.worker.control").setLevel(logging.WARNING)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 
+
+# Endpoint de métricas no processo principal do worker (agrega os filhos)
+@worker_init.connect
+def start_worker_metrics(**kwargs):
+    reset_multiprocess_dir()
+    start_metrics_server(settings.metrics_port)
+
+
+# Filhos do pool (recriados a cada worker_max_tasks_per_child) criam engine,
+# cliente Telegram e clientes Redis no primeiro uso, nunca herdados do pai
+@worker_process_init.connect
+def reset_process_clients(**kwargs):
+    dispose_engine_after_fork()
+
+
+# RSS por task (gauge de métricas) e diff tracemalloc quando habilitado
+@task_prerun.connect
+def start_task_memory(task_id=None, **kwargs):
+    task_memory_profiler.start(task_id)
+
+
+@task_postrun.connect
+def finish_task_memory(task_id=None, task=None, **kwargs):
+    task_memory_profiler.finish(task_id, task.name if task else "unknown")
+
+
+@worker_process_shutdown.connect
+def cleanup_worker_metrics(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
+
+
 # Importar e configurar beat schedule
 from src.tasks.beat_schedule import (
     beat_schedule,
@@ -3,19 +3,16 @@ Tasks Celery para Monitoramento de Sinais - BullBot Telegram
 Sistema de monitoramento em lote para processamento de símbolos
 """
 
-import os
+import asyncio
 import time
-from celery import current_app
+from celery import chord
 from src.tasks.celery_app import celery_app
+from src.services.monitoring_history_service import monitoring_history_service
+from src.utils.config import settings
 from src.utils.logger import get_logger
-import redis
 
 logger = get_logger(__name__)
 
-# Cliente Redis para cache de estado
-redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
-redis_client = redis.from_url(redis_url)
-
 
 @celery_app.task(bind=True, max_retries=3)
 def process_symbol_batch(self, exchange, symbols, **kwargs):
@@ -35,31 +32,13 @@ def process_symbol_batch(self, exchange, symbols, **kwargs):
             f"Processando lote de {len(symbols)} símbolos da exchange {exchange}"
         )
 
-        # Simular processamento dos símbolos
-        processed_symbols = []
-        errors = []
+        batch_started = time.time()
 
-        for symbol in symbols:
-            try:
-                # Aqui você implementaria a lógica real de processamento
-                # Por exemplo: buscar dados de preço, analisar indicadores, etc.
-
-                # Simulação de processamento
-                time.sleep(0.1)  # Simular trabalho
-
-                processed_symbols.append(
-                    {
-                        "exchange": exchange,
-                        "symbol": symbol,
-                        "status": "processed",
-                        "timestamp": time.time(),
-                    }
-                )
+        # Processar símbolos do lote concorrentemente (limitado por semáforo)
+        outcomes = asyncio.run(process_symbols_concurrently(exchange, symbols))
 
-            except Exception as e:
-                error_msg = f"Erro ao processar {symbol}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(f"❌ {error_msg}")
+        processed_symbols = [outcome for outcome in outcomes if "error" not in outcome]
+        errors = [outcome["error"] for outcome in outcomes if "error" in outcome]
 
         result = {
             "exchange": exchange,
@@ -69,6 +48,9 @@ def process_symbol_batch(self, exchange, symbols, **kwargs):
             "processed_symbols": processed_symbols,
             "errors": errors,
             "batch_id": self.request.id,
+            "batch_seconds": time.time() - batch_started,
+            # Soma do tempo gasto por símbolo - base do tamanho adaptativo do lote
+            "symbol_seconds": sum(outcome["seconds"] for outcome in outcomes),
             "timestamp": time.time(),
         }
 
@@ -83,14 +65,65 @@ def process_symbol_batch(self, exchange, symbols, **kwargs):
         raise self.retry(countdown=60, exc=e)
 
 
+async def process_symbols_concurrently(exchange, symbols):
+    """
+    Processar símbolos em paralelo com no máximo
+    settings.monitoring_symbol_concurrency em andamento
+
+    Returns:
+        list: Um resultado por símbolo (com "error" em caso de falha)
+    """
+    semaphore = asyncio.Semaphore(max(1, settings.monitoring_symbol_concurrency))
+
+    async def run(symbol):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                outcome = await process_symbol(exchange, symbol)
+            except Exception as e:
+                error_msg = f"Erro ao processar {symbol}: {str(e)}"
+                logger.error(f"❌ {error_msg}")
+                outcome = {"symbol": symbol, "error": error_msg}
+            outcome["seconds"] = time.perf_counter() - started
+            return outcome
+
+    return await asyncio.gather(*(run(symbol) for symbol in symbols))
+
+
+async def process_symbol(exchange, symbol):
+    """
+    Processar um símbolo de uma exchange
+
+    Returns:
+        dict: Resultado do processamento do símbolo
+    """
+    # Aqui você implementaria a lógica real de processamento
+    # Por exemplo: buscar dados de preço, analisar indicadores, etc.
+    # Deve ser I/O assíncrono para não bloquear os demais símbolos do lote
+
+    # Simulação de processamento
+    await asyncio.sleep(0.1)  # Simular trabalho
+
+    return {
+        "exchange": exchange,
+        "symbol": symbol,
+        "status": "processed",
+        "timestamp": time.time(),
+    }
+
+
 @celery_app.task(bind=True)
 def finalize_monitoring_cycle(
-    self, cycle_start_time, total_symbols, total_exchanges, **kwargs
+    self, batch_results, cycle_start_time, total_symbols, total_exchanges, **kwargs
 ):
     """
     Finaliza um ciclo de monitoramento e gera relatório
 
+    Callback do chord de start_monitoring_cycle: roda somente depois que
+    todos os lotes terminam.
+
     Args:
+        batch_results (list): Resultados de process_symbol_batch
         cycle_start_time (float): Timestamp de início do ciclo
         total_symbols (int): Total de símbolos processados
         total_exchanges (int): Total de exchanges processadas
@@ -101,6 +134,20 @@ def finalize_monitoring_cycle(
     """
     try:
         cycle_duration = time.time() - cycle_start_time
+        batch_results = [result for result in batch_results if isinstance(result, dict)]
+
+        # Custo por símbolo de cada exchange ajusta o tamanho dos próximos lotes
+        symbol_costs = {}
+        for result in batch_results:
+            cost = symbol_costs.setdefault(result["exchange"], [0.0, 0])
+            cost[0] += result.get("symbol_seconds", 0.0)
+            cost[1] += result.get("total_symbols", 0)
+
+        for exchange, (symbol_seconds, symbols_count) in symbol_costs.items():
+            if symbols_count:
+                monitoring_history_service.record_symbol_cost(
+                    exchange, symbol_seconds / symbols_count
+                )
 
         # Gerar relatório do ciclo
         report = {
@@ -110,13 +157,19 @@ def finalize_monitoring_cycle(
             "cycle_duration_seconds": cycle_duration,
             "total_symbols": total_symbols,
             "total_exchanges": total_exchanges,
+            "batches": len(batch_results),
+            "processed_count": sum(
+                result.get("processed_count", 0) for result in batch_results
+            ),
+            "error_count": sum(
+                result.get("error_count", 0) for result in batch_results
+            ),
             "status": "completed",
             "timestamp": time.time(),
         }
 
-        # Salvar relatório no Redis para histórico
-        cache_key = f"monitoring_cycle_{int(cycle_start_time)}"
-        redis_client.setex(cache_key, 86400, str(report))  # Expira em 24h
+        # Salvar relatório no stream de histórico (limitado, ordem de chegada)
+        monitoring_history_service.record_cycle(report)
 
         logger.info(
             f"Ciclo de monitoramento finalizado: {total_symbols} símbolos em {total_exchanges} exchanges em {cycle_duration:.2f}s"
@@ -130,10 +183,13 @@ def finalize_monitoring_cycle(
 
 
 @celery_app.task
-def schedule_next_monitoring(**kwargs):
+def schedule_next_monitoring(cycle_report=None, **kwargs):
     """
     Agenda o próximo ciclo de monitoramento
 
+    Args:
+        cycle_report (dict): Relatório do ciclo (resultado de finalize_monitoring_cycle)
+
     Returns:
         dict: Status do agendamento
     """
@@ -179,25 +235,26 @@ def start_monitoring_cycle(exchanges_symbols, **kwargs):
         batch_tasks = []
 
         for exchange, symbols in exchanges_symbols.items():
-            # Dividir símbolos em lotes menores se necessário
-            batch_size = 50  # Máximo de símbolos por lote
+            # Tamanho do lote adaptado ao custo medido por símbolo da exchange
+            batch_size = monitoring_history_service.get_batch_size(exchange)
             symbol_batches = [
                 symbols[i : i + batch_size] for i in range(0, len(symbols), batch_size)
             ]
 
             for batch in symbol_batches:
-                task = process_symbol_batch.delay(exchange, batch)
-                batch_tasks.append(task)
+                batch_tasks.append(process_symbol_batch.s(exchange, batch))
 
-        # Agendar task de finalização
-        finalize_task = finalize_monitoring_cycle.delay(
+        # Finalização como callback do chord: roda após todos os lotes
+        finalize_signature = finalize_monitoring_cycle.s(
             cycle_start_time=cycle_start_time,
             total_symbols=total_symbols,
             total_exchanges=total_exchanges,
         )
 
         # Configurar callback para agendar próximo ciclo
-        finalize_task.link(schedule_next_monitoring.s())
+        finalize_signature.link(schedule_next_monitoring.s())
+
+        finalize_task = chord(batch_tasks)(finalize_signature)
 
         result = {
             "cycle_id": finalize_task.id,
@@ -244,30 +301,25 @@ def get_monitoring_status(**kwargs):
         dict: Status do sistema de monitoramento
     """
     try:
-        # Buscar informações do Redis
-        active_cycles = []
-        cycle_keys = redis_client.keys("monitoring_cycle_*")
-
-        for key in cycle_keys[:10]:  # Últimos 10 ciclos
-            try:
-                cycle_data = redis_client.get(key)
-                if cycle_data:
-                    active_cycles.append(eval(cycle_data))
-            except:
-                continue
+        # Últimos ciclos direto do stream, sem varrer o keyspace
+        rolling_cycles = monitoring_history_service.get_recent_cycles(
+            max(settings.monitoring_history_summary_cycles, 10)
+        )
+        recent_cycles = rolling_cycles[:10]  # Últimos 10 ciclos
 
         # Estatísticas básicas
         stats = {
-            "active_cycles_count": len(active_cycles),
-            "redis_keys_count": len(cycle_keys),
-            "last_cycle": active_cycles[-1] if active_cycles else None,
+            "active_cycles_count": len(recent_cycles),
+            "stored_cycles_count": monitoring_history_service.get_cycle_count(),
+            "last_cycle": recent_cycles[0] if recent_cycles else None,
+            "rolling": monitoring_history_service.summarize(rolling_cycles),
             "system_time": time.time(),
         }
 
         return {
             "status": "ok",
             "monitoring_stats": stats,
-            "recent_cycles": active_cycles,
+            "recent_cycles": recent_cycles,
         }
 
     except Exception as e:
@@ -0,0 +1,35 @@
+"""
+Filas Celery por estágio do pipeline - BullBot Telegram
+Cada fila tem seu próprio pool de workers, então trabalho sensível a latência
+nunca espera atrás de manutenção
+"""
+
+# Detecção e despacho de sinais (ciclo principal, fan-out, resumos)
+DISPATCH_QUEUE = "dispatch"
+
+# Envio de chunks de fan-out para o Telegram
+SEND_QUEUE = "send"
+
+# Lotes de símbolos e ciclos de monitoramento
+MONITORING_QUEUE = "monitoring"
+
+# Limpeza, testes de conexão e estatísticas periódicas
+MAINTENANCE_QUEUE = "maintenance"
+
+task_routes = {
+    # Despacho
+    "src.tasks.telegram_tasks.process_unprocessed_signals": {"queue": DISPATCH_QUEUE},
+    "src.tasks.telegram_tasks.finalize_signal_fanout": {"queue": DISPATCH_QUEUE},
+    "src.tasks.telegram_tasks.flush_signal_digests": {"queue": DISPATCH_QUEUE},
+    "src.tasks.monitor_tasks.monitor_rsi_signals": {"queue": DISPATCH_QUEUE},
+    # Envio
+    "src.tasks.telegram_tasks.send_signal_chunk": {"queue": SEND_QUEUE},
+    # Monitoramento
+    "src.tasks.monitor_tasks.start_monitoring_cycle": {"queue": MONITORING_QUEUE},
+    "src.tasks.monitor_tasks.process_symbol_batch": {"queue": MONITORING_QUEUE},
+    "src.tasks.monitor_tasks.finalize_monitoring_cycle": {"queue": MONITORING_QUEUE},
+    "src.tasks.monitor_tasks.schedule_next_monitoring": {"queue": MONITORING_QUEUE},
+    # Manutenção (demais tasks de telegram_tasks e monitor_tasks)
+    "src.tasks.telegram_tasks.*": {"queue": MAINTENANCE_QUEUE},
+    "src.tasks.monitor_tasks.*": {"queue": MAINTENANCE_QUEUE},
+}
@@ -3,150 +3,538 @@ Tasks Celery para Telegram - BullBot Telegram
 Sistema completo de processamento e envio de sinais para assinantes
 """
 
-import os
-from celery import current_app
+from functools import partial
+from celery import chord
+from celery.utils import uuid
 from src.tasks.celery_app import celery_app
-from src.integrations.telegram_bot import telegram_client
+from src.integrations.telegram_bot import get_telegram_client
+from src.integrations.telegram_errors import classify_delivery_error
+from src.integrations.signal_renderer import signal_renderer
 from src.services.signal_reader import signal_reader
 from src.services.signal_dispatch_service import signal_dispatch_service
+from src.services.signal_priority_service import signal_priority_service
+from src.services.adaptive_polling_service import adaptive_polling_service
+from src.services.redis_maintenance_service import redis_maintenance_service
+from src.tasks.autoscaler import recommend_capacity
+from src.services.capacity_service import capacity_service
 from src.services.user_config_service import user_config_service
+from src.services.signal_stats_writer import SignalStatsWriter
+from src.services.dead_chat_service import dead_chat_service
+from src.services.delivery_ledger_service import delivery_ledger_service
+from src.services.dispatch_checkpoint_service import (
+    STAGE_DISPATCHED,
+    dispatch_checkpoint_service,
+)
+from src.services.digest_service import digest_service
+from src.services.delivery_latency_service import (
+    LatencyRecorder,
+    delivery_latency_service,
+    mark_pipeline_stage,
+)
 from src.database.connection import get_db
+from src.utils.config import settings
 from src.utils.logger import get_logger
+from src.utils.redis_client import close_async_redis, get_pool_stats, get_redis
+from src.utils.lease_lock import LeaseLock, StaleLeaseError
+from src.utils.memory import MemoryRecorder
+from src.utils.tracing import record_span, span, trace_signal
+from src.utils.metrics import (
+    MATCHED_USERS,
+    SENDS,
+    SIGNAL_BACKLOG,
+    SIGNALS_FETCHED,
+    SIGNALS_STALE,
+    TELEGRAM_API_SECONDS,
+)
 import asyncio
-import redis
+import contextvars
+import time
 
 logger = get_logger(__name__)
 
-# Cliente Redis para cache de estado - usando getenv diretamente
-redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
-redis_client = redis.from_url(redis_url)
-
 
 @celery_app.task(bind=True, max_retries=3)
-def process_unprocessed_signals(self):
+def process_unprocessed_signals(self, chained=False):
     """
     Task principal para processar sinais e enviar para usuários elegíveis
     Integrado com sistema completo de assinantes e configurações personalizadas
+
+    Com polling adaptativo a task se reagenda ao final de cada ciclo; a
+    execução do beat só roda quando essa cadeia não está ativa.
+
+    Args:
+        chained: True quando agendada pela própria cadeia adaptativa
     """
+    if settings.adaptive_polling_enabled and not adaptive_polling_service.should_run(
+        self.request.id, chained
+    ):
+        logger.info("Ciclo ignorado: cadeia de polling adaptativo ativa")
+        return {"status": "skipped", "reason": "adaptive_polling_chain"}
+
+    # Lease exclusivo: execuções sobrepostas (beat, retry, redelivery) saem
+    lock = LeaseLock(
+        "process_unprocessed_signals", settings.signal_cycle_lock_ttl_seconds
+    )
+    if not lock.acquire():
+        logger.info("Outro ciclo de sinais em execução - encerrando")
+        result = {"status": "skipped", "reason": "cycle_locked"}
+        # Ciclo da cadeia: reagendar para a cadeia não parar (o dono do lock
+        # reagenda ao terminar e assume a cadeia; senão este ciclo a mantém)
+        if chained and settings.adaptive_polling_enabled:
+            schedule_next_signal_cycle(result)
+        return result
+
+    try:
+        result = _run_signal_cycle(self, lock)
+    finally:
+        lock.release()
+
+    if settings.adaptive_polling_enabled:
+        schedule_next_signal_cycle(result)
+
+    return result
+
+
+def schedule_next_signal_cycle(result):
+    """
+    Agendar o próximo ciclo conforme backlog restante e taxa de chegada
+
+    Args:
+        result: Resultado do ciclo atual
+    """
+    try:
+        # Ciclo que não tirou nada do backlog recua em vez de girar no mínimo
+        drained = result.get("processed_count", 0) + result.get("stale_signals", 0)
+        delay = adaptive_polling_service.next_delay(
+            backlog_remaining=result.get("backlog_remaining", 0),
+            new_signals=max(result.get("new_signals_detected", 0), 0),
+            made_progress=drained > 0,
+        )
+
+        task_id = uuid()
+        adaptive_polling_service.claim_next_cycle(task_id, delay)
+        process_unprocessed_signals.apply_async(
+            kwargs={"chained": True}, countdown=delay, task_id=task_id
+        )
+
+        logger.info(f"Próximo ciclo de sinais em {delay:.1f}s")
+
+    except Exception as e:
+        # O beat assume como watchdog quando a cadeia expira
+        logger.error(f"❌ Erro ao agendar próximo ciclo de sinais: {e}")
+
+
+def _run_signal_cycle(task, lock=None):
+    """
+    Executar um ciclo: detectar mudanças, descartar antigos e despachar
+
+    Args:
+        task: Task Celery em execução (retries)
+        lock: LeaseLock do ciclo; se perdido, o despacho para antes do
+            próximo sinal para não concorrer com o novo dono. Seu fencing
+            token acompanha checkpoints, reservas de entrega e a marcação de
+            processado, recusados se outro dono assumiu
+    """
+    fence = lock.fence if lock else None
+
     try:
         logger.info("Iniciando processamento de sinais não processados")
 
         # 1. Verificar se houve mudanças usando cache (otimização)
         cache_key = "last_signal_count"
         current_count = signal_reader.get_unprocessed_signals_count()
+        SIGNAL_BACKLOG.set(current_count)
+        capacity_service.record_signal_backlog(current_count)
 
         logger.info(f"Sinais não processados encontrados: {current_count}")
 
         # Buscar último count do cache
-        last_count = redis_client.get(cache_key)
+        last_count = get_redis().get(cache_key)
         last_count = int(last_count) if last_count else 0
 
-        # Se não há mudanças, não processar (economia de recursos)
-        if current_count == last_count:
+        # Se não há mudanças, não processar (economia de recursos). Retries e
+        # sinais com checkpoint pendente sempre processam para retomar o trabalho
+        if (
+            current_count == last_count
+            and not task.request.retries
+            and not dispatch_checkpoint_service.has_pending()
+        ):
             logger.info("Nenhum sinal novo detectado")
             return {"status": "no_changes", "message": "Nenhum sinal novo detectado"}
 
         # Atualizar cache
-        redis_client.setex(cache_key, 300, current_count)  # Expira em 5 min
+        get_redis().setex(cache_key, 300, current_count)  # Expira em 5 min
 
         # 2. Se há mudanças, processar sinais
         logger.info(
             f"Detectados {current_count - last_count} sinais novos! Iniciando processamento..."
         )
 
-        # Buscar sinais não processados
-        signals = signal_reader.get_unprocessed_signals(limit=50)
+        # Descartar sinais velhos demais antes de qualquer fan-out
+        stale_signals = signal_reader.mark_stale_signals(
+            signal_priority_service.get_max_age_minutes()
+        )
+        SIGNALS_STALE.inc(len(stale_signals))
+        if stale_signals and settings.stale_signal_summary_enabled:
+            await_sync(
+                get_telegram_client().send_message(
+                    signal_renderer.render_stale_summary(stale_signals)
+                )
+            )
+
+        # Variação de RSS por estágio (memory_accounting_enabled)
+        memory = MemoryRecorder()
+
+        # Buscar sinais não processados (janela maior quando há priorização)
+        fetch_started_ns = time.time_ns()
+        with memory.stage("fetch"):
+            if settings.signal_priority_enabled:
+                signals = signal_reader.get_unprocessed_signals(
+                    limit=max(
+                        settings.signal_batch_size,
+                        settings.signal_priority_candidate_limit,
+                    )
+                )
+                # Sinais cujo valor decai mais rápido são processados e enviados primeiro
+                signals = signal_priority_service.order_signals(signals)[
+                    : settings.signal_batch_size
+                ]
+            else:
+                signals = signal_reader.get_unprocessed_signals(
+                    limit=settings.signal_batch_size
+                )
+        fetch_ended_ns = time.time_ns()
 
         if not signals:
             logger.info("Nenhum sinal não processado encontrado")
-            return {"status": "no_signals", "processed_count": 0, "errors": []}
+            return {
+                "status": "no_signals",
+                "processed_count": 0,
+                "stale_signals": len(stale_signals),
+                "errors": [],
+            }
 
         logger.info(f"Encontrados {len(signals)} sinais para processar")
+        SIGNALS_FETCHED.inc(len(signals))
+
+        for signal in signals:
+            mark_pipeline_stage(signal, "picked_up")
 
         # Processar cada sinal
         processed_count = 0
         sent_count = 0
+        fanout_signals = 0
         errors = []
 
         for signal in signals:
-            # Criar uma sessão específica para este sinal - evita pool exhaustion
-            db_session = None
-            try:
-                signal_id = signal["id"]
-                symbol = signal.get("symbol", "")
-
-                logger.info(
-                    f"Processando sinal {signal_id}: {symbol} {signal.get('timeframe', '')} {signal.get('signal_type', '')}"
+            if lock and not lock.is_held():
+                errors.append("Lock do ciclo perdido - despacho interrompido")
+                logger.error("❌ Lock do ciclo perdido - interrompendo despacho")
+                break
+
+            # Um trace por sinal: busca do lote, elegibilidade, envios e marcação
+            with trace_signal(
+                signal["id"],
+                "signal.dispatch",
+                symbol=signal.get("symbol"),
+                timeframe=signal.get("timeframe"),
+                signal_type=signal.get("signal_type"),
+            ) as signal_span:
+                record_span(
+                    "fetch", fetch_started_ns, fetch_ended_ns, batch_size=len(signals)
                 )
 
-                # Criar sessão reutilizável para todo o processamento deste sinal
-                db_session = next(get_db())
-
-                # 3. Determinar usuários elegíveis para este sinal (reutilizando sessão)
-                eligible_users = (
-                    signal_dispatch_service.get_eligible_users_for_signal_with_session(
-                        signal, db_session
-                    )
-                )
+                # Criar uma sessão específica para este sinal - evita pool exhaustion
+                db_session = None
+                try:
+                    signal_id = signal["id"]
+                    symbol = signal.get("symbol", "")
 
-                if not eligible_users:
-                    logger.info(f"Sinal {signal_id} sem usuários elegíveis")
-                else:
                     logger.info(
-                        f"Sinal {signal_id} será enviado para {len(eligible_users)} usuários"
+                        f"Processando sinal {signal_id}: {symbol} {signal.get('timeframe', '')} {signal.get('signal_type', '')}"
                     )
 
-                    # 4. Enviar sinal para usuários elegíveis
-                    signal_sent_count = await_sync(
-                        send_signal_to_users_with_session(
-                            signal, eligible_users, db_session
+                    # Criar sessão reutilizável para todo o processamento deste sinal
+                    db_session = next(get_db())
+
+                    # Retomar de uma execução anterior interrompida, se houver
+                    checkpoint = dispatch_checkpoint_service.load(signal_id)
+
+                    if checkpoint:
+                        logger.info(
+                            f"Retomando sinal {signal_id} do checkpoint ({checkpoint['stage']}, {checkpoint['sent_upto']}/{len(checkpoint['recipients'])})"
+                        )
+                        eligible_users = checkpoint["recipients"]
+                    else:
+                        # 3. Determinar usuários elegíveis para este sinal (reutilizando sessão)
+                        with memory.stage("match"):
+                            eligible_users = _serialize_recipients(
+                                signal_dispatch_service.get_eligible_users_for_signal_with_session(
+                                    signal, db_session
+                                )
+                            )
+                        dispatch_checkpoint_service.save_matched(
+                            signal_id, eligible_users, fence
+                        )
+                        MATCHED_USERS.observe(len(eligible_users))
+                    mark_pipeline_stage(signal, "matched")
+
+                    # Estágios por sinal (pickup/match) uma única vez, inclusive
+                    # sem destinatários; retomadas de checkpoint já foram medidas
+                    if not checkpoint:
+                        signal_latency = LatencyRecorder(signal)
+                        signal_latency.observe_signal_stages()
+                        delivery_latency_service.flush(signal_latency)
+
+                    if checkpoint and checkpoint["stage"] == STAGE_DISPATCHED:
+                        # Envios já concluídos/enfileirados - falta apenas marcar
+                        pass
+                    elif not eligible_users:
+                        logger.info(f"Sinal {signal_id} sem usuários elegíveis")
+                    elif (
+                        settings.dispatch_fanout_enabled
+                        and len(eligible_users) > settings.dispatch_fanout_chunk_size
+                    ):
+                        # 4a. Audiência grande: distribuir envios entre workers
+                        with (
+                            span("fanout.enqueue", recipients=len(eligible_users)),
+                            memory.stage("send"),
+                        ):
+                            dispatch_signal_fanout(signal, eligible_users, fence)
+                        fanout_signals += 1
+                    else:
+                        sent_upto = checkpoint["sent_upto"] if checkpoint else 0
+                        logger.info(
+                            f"Sinal {signal_id} será enviado para {len(eligible_users) - sent_upto} usuários"
                         )
-                    )
-                    sent_count += signal_sent_count
 
-                # 5. Marcar sinal como processado (reutilizando sessão)
-                success = signal_reader.mark_signal_processed_with_session(
-                    signal_id, db_session
-                )
+                        # 4. Enviar sinal para usuários elegíveis (a partir do checkpoint)
+                        with memory.stage("send"):
+                            signal_sent_count = await_sync(
+                                send_signal_to_users_with_session(
+                                    signal,
+                                    eligible_users[sent_upto:],
+                                    db_session,
+                                    on_progress=partial(
+                                        _advance_checkpoint,
+                                        signal_id,
+                                        sent_upto,
+                                        fence=fence,
+                                    ),
+                                    fence=fence,
+                                )
+                            )
+                        sent_count += signal_sent_count
+                        dead_chat_service.flush_pending()
+
+                    dispatch_checkpoint_service.mark_dispatched(signal_id, fence)
+
+                    # 5. Marcar sinal como processado (reutilizando sessão)
+                    # Em fan-out o sinal é marcado ao enfileirar os chunks, evitando
+                    # que o próximo ciclo o busque de novo enquanto os envios rodam
+                    with span("mark_processed"), memory.stage("mark"):
+                        success = signal_reader.mark_signal_processed_with_session(
+                            signal_id, db_session, fence
+                        )
 
-                if success:
-                    processed_count += 1
-                    logger.info(f"Sinal {signal_id} processado com sucesso")
-                else:
-                    errors.append(f"Falha ao marcar sinal {signal_id} como processado")
-                    logger.error(
-                        f"❌ Falha ao marcar sinal {signal_id} como processado"
-                    )
+                    if success:
+                        dispatch_checkpoint_service.complete(signal_id, fence)
+                        processed_count += 1
+                        logger.info(f"Sinal {signal_id} processado com sucesso")
+                    else:
+                        errors.append(
+                            f"Falha ao marcar sinal {signal_id} como processado"
+                        )
+                        logger.error(
+                            f"❌ Falha ao marcar sinal {signal_id} como processado"
+                        )
 
-            except Exception as e:
-                error_msg = f"Erro no sinal {signal['id']}: {str(e)}"
-                errors.append(error_msg)
-                logger.error(f"❌ {error_msg}")
-            finally:
-                # Sempre fechar a sessão para liberar conexão
-                if db_session:
-                    try:
-                        db_session.close()
-                    except Exception as e:
-                        logger.warning(f"Erro ao fechar sessão: {e}")
+                except Exception as e:
+                    error_msg = f"Erro no sinal {signal['id']}: {str(e)}"
+                    errors.append(error_msg)
+                    if signal_span:
+                        signal_span.record_error(e)
+                    logger.error(f"❌ {error_msg}")
+                finally:
+                    # Sempre fechar a sessão para liberar conexão
+                    if db_session:
+                        try:
+                            db_session.close()
+                        except Exception as e:
+                            logger.warning(f"Erro ao fechar sessão: {e}")
 
         logger.info(
             f"Processamento concluído: {processed_count} sinais processados, {sent_count} envios realizados"
         )
 
+        backlog_remaining = max(current_count - len(stale_signals) - processed_count, 0)
+        capacity_service.record_signal_backlog(backlog_remaining)
+
         return {
             "status": "completed",
             "processed_count": processed_count,
             "total_signals": len(signals),
             "sent_count": sent_count,
+            "fanout_signals": fanout_signals,
+            "stale_signals": len(stale_signals),
             "new_signals_detected": current_count - last_count,
+            "lock_token": lock.token if lock else None,
+            "memory": memory.report(),
+            "backlog_remaining": backlog_remaining,
             "errors": errors,
         }
 
     except Exception as e:
         logger.error(f"❌ Erro na task process_unprocessed_signals: {e}")
         # Retry automático em caso de erro
-        raise self.retry(countdown=60, exc=e)
+        raise task.retry(countdown=60, exc=e)
+
+
+def dispatch_signal_fanout(signal_data, eligible_users, fence=None):
+    """
+    Dividir destinatários em chunks e enfileirar uma task de envio por chunk
+
+    Os chunks rodam em paralelo em quantos workers estiverem disponíveis e
+    finalize_signal_fanout agrega os envios quando todos terminarem.
+
+    Args:
+        signal_data: Dados do sinal
+        eligible_users: Lista de usuários elegíveis
+        fence: Token do lease do ciclo; vencido, nada é enfileirado
+
+    Returns:
+        Número de chunks enfileirados
+    """
+    chunk_size = max(1, settings.dispatch_fanout_chunk_size)
+    recipients = _serialize_recipients(eligible_users)
+    chunks = [
+        recipients[i : i + chunk_size] for i in range(0, len(recipients), chunk_size)
+    ]
+
+    # Chunks de sinais mais urgentes furam a fila do broker
+    priority = signal_priority_service.to_celery_priority(
+        signal_data.get("priority_score") or 0
+    )
+
+    # Os chunks rodam fora do lease: a verificação do token é no enfileiramento
+    if fence:
+        fence.check()
+
+    chord(
+        send_signal_chunk.s(signal_data, chunk).set(priority=priority)
+        for chunk in chunks
+    )(
+        finalize_signal_fanout.s(
+            signal_id=signal_data["id"], total_recipients=len(recipients)
+        )
+    )
+
+    logger.info(
+        f"Sinal {signal_data['id']} distribuído em {len(chunks)} chunks para {len(recipients)} usuários"
+    )
+    return len(chunks)
+
+
+def _advance_checkpoint(signal_id, offset, done, fence=None):
+    """Salvar progresso de envio relativo ao início do checkpoint"""
+    dispatch_checkpoint_service.advance(signal_id, offset + done, fence)
+
+
+def _serialize_recipients(eligible_users):
+    """Remover objetos ORM dos usuários elegíveis para envio via broker/checkpoint"""
+    if settings.worker_slim_mode:
+        # Só o que o envio lê: payloads menores no broker e nos checkpoints
+        recipients = []
+        for user_info in eligible_users:
+            recipient = {"chat_id": user_info["chat_id"]}
+            if user_info.get("digest_window_seconds"):
+                recipient["digest_window_seconds"] = user_info["digest_window_seconds"]
+            recipients.append(recipient)
+        return recipients
+
+    return [
+        {
+            "chat_id": user_info["chat_id"],
+            "chat_type": user_info.get("chat_type"),
+            "config_name": user_info.get("config_name"),
+            "config_priority": user_info.get("config_priority"),
+            "digest_window_seconds": user_info.get("digest_window_seconds"),
+        }
+        for user_info in eligible_users
+    ]
+
+
+@celery_app.task(bind=True, max_retries=3)
+def send_signal_chunk(self, signal_data, recipients):
+    """
+    Enviar um sinal para um chunk de destinatários (parte de um fan-out)
+
+    Args:
+        signal_data: Dados do sinal
+        recipients: Lista de destinatários serializados
+
+    Returns:
+        dict: Resultado do envio do chunk
+    """
+    db_session = None
+    try:
+        db_session = next(get_db())
+
+        with trace_signal(
+            signal_data.get("id"), "signal.send_chunk", recipients=len(recipients)
+        ):
+            sent_count = await_sync(
+                send_signal_to_users_with_session(signal_data, recipients, db_session)
+            )
+            dead_chat_service.flush_pending()
+
+        return {
+            "signal_id": signal_data["id"],
+            "recipients": len(recipients),
+            "sent_count": sent_count,
+        }
+
+    except Exception as e:
+        logger.error(f"❌ Erro no chunk do sinal {signal_data.get('id')}: {e}")
+        raise self.retry(countdown=30, exc=e)
+    finally:
+        if db_session:
+            try:
+                db_session.close()
+            except Exception as e:
+                logger.warning(f"Erro ao fechar sessão: {e}")
+
+
+@celery_app.task
+def finalize_signal_fanout(chunk_results, signal_id, total_recipients):
+    """
+    Callback do chord de fan-out: agregar envios de todos os chunks do sinal
+
+    Args:
+        chunk_results: Resultados de send_signal_chunk
+        signal_id: ID do sinal
+        total_recipients: Total de destinatários do fan-out
+
+    Returns:
+        dict: Resumo do fan-out
+    """
+    sent_count = sum(
+        result.get("sent_count", 0)
+        for result in chunk_results
+        if isinstance(result, dict)
+    )
+
+    logger.info(
+        f"Fan-out do sinal {signal_id} concluído: {sent_count}/{total_recipients} envios em {len(chunk_results)} chunks"
+    )
+
+    return {
+        "status": "completed",
+        "signal_id": signal_id,
+        "chunks": len(chunk_results),
+        "total_recipients": total_recipients,
+        "sent_count": sent_count,
+    }
 
 
 def await_sync(coro):
@@ -164,8 +552,9 @@ def await_sync(coro):
                 result = new_loop.run_until_complete(coro)
                 return result
             finally:
-                # Fechar o loop corretamente
+                # Fechar o loop corretamente (e o cliente Redis preso a ele)
                 try:
+                    new_loop.run_until_complete(close_async_redis())
                     new_loop.close()
                 except Exception as e:
                     logger.warning(f"Erro ao fechar loop: {e}")
@@ -176,8 +565,9 @@ def await_sync(coro):
 
     try:
         # Sempre usar thread pool para isolar completamente o event loop
+        # (copiando o contexto para que spans abertos no loop herdem o trace)
         with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(run_in_new_thread)
+            future = executor.submit(contextvars.copy_context().run, run_in_new_thread)
             return future.result(timeout=120)  # Timeout de 2 minutos
 
     except concurrent.futures.TimeoutError:
@@ -224,7 +614,9 @@ async def send_signal_to_users(signal_data, eligible_users):
     return sent_count
 
 
-async def send_signal_to_users_with_session(signal_data, eligible_users, db_session):
+async def send_signal_to_users_with_session(
+    signal_data, eligible_users, db_session, on_progress=None, fence=None
+):
     """
     Enviar sinal para lista de usuários elegíveis (com sessão de banco fornecida)
 
@@ -232,37 +624,95 @@ async def send_signal_to_users_with_session(signal_data, eligible_users, db_sess
         signal_data: Dados do sinal
         eligible_users: Lista de usuários elegíveis
         db_session: Sessão de banco de dados reutilizável
+        on_progress: Callback opcional chamado com o número de destinatários
+            atendidos a cada settings.dispatch_checkpoint_interval
+        fence: Token do lease do ciclo (envio inline); vencido, os envios
+            param na próxima reserva (as estatísticas do que já foi enviado
+            são gravadas mesmo assim)
 
     Returns:
         Número de envios bem-sucedidos
     """
     sent_count = 0
+    buffered_count = 0
+    skipped_count = 0
+    stats_writer = SignalStatsWriter()
+    latency_recorder = LatencyRecorder(signal_data)
+    signal_id = signal_data.get("id")
+
+    symbol = signal_data.get("symbol", "")
+    rsi_data = signal_data.get("indicator_data", {})
+    rsi_value = rsi_data.get("rsi_value", 0)
+
+    # Renderizar uma vez (aquece o cache) medindo o estágio de render
+    render_started = time.time()
+    with span("render"):
+        signal_renderer.render(signal_data)
+    latency_recorder.observe("render", time.time() - render_started)
+
+    checkpoint_interval = max(1, settings.dispatch_checkpoint_interval)
+
+    for index, user_info in enumerate(eligible_users):
+        if on_progress and index and index % checkpoint_interval == 0:
+            on_progress(index)
 
-    for user_info in eligible_users:
         try:
             chat_id = user_info["chat_id"]
 
+            # Já entregue (ou em envio) por uma execução anterior desta task
+            try:
+                claimed = await delivery_ledger_service.claim(signal_id, chat_id, fence)
+            except StaleLeaseError as e:
+                logger.error(f"❌ Envio do sinal {signal_id} interrompido: {e}")
+                break
+            if not claimed:
+                skipped_count += 1
+                continue
+
+            # Modo resumo: acumular sinal para envio agrupado
+            digest_window = user_info.get("digest_window_seconds")
+            if digest_window:
+                if digest_service.buffer_signal(chat_id, signal_data, digest_window):
+                    await delivery_ledger_service.mark_delivered(signal_id, chat_id)
+                    buffered_count += 1
+                    continue
+
             # Enviar sinal personalizado para cada usuário
+            sent_at = time.time()
             success = await send_signal_to_user(signal_data, chat_id)
 
             if success:
-                # Atualizar estatísticas do usuário (reutilizando sessão)
-                symbol = signal_data.get("symbol", "")
-                rsi_data = signal_data.get("indicator_data", {})
-                rsi_value = rsi_data.get("rsi_value", 0)
-                user_config_service.increment_signals_received_with_session(
-                    chat_id, db_session, symbol=symbol, rsi_value=rsi_value
-                )
+                await delivery_ledger_service.mark_delivered(signal_id, chat_id)
+                latency_recorder.observe_delivery(sent_at, time.time())
+
+                # Acumular estatísticas - aplicadas em lote ao final do fan-out
+                stats_writer.record(chat_id, symbol=symbol, rsi_value=rsi_value)
                 sent_count += 1
                 logger.info(f"Sinal enviado com sucesso para {chat_id}")
             else:
+                await delivery_ledger_service.release(signal_id, chat_id)
                 logger.error(f"❌ Falha ao enviar sinal para {chat_id}")
 
         except Exception as e:
+            await delivery_ledger_service.release(signal_id, user_info.get("chat_id"))
             logger.error(
                 f"❌ Erro ao enviar sinal para {user_info.get('chat_id', 'unknown')}: {e}"
             )
 
+    # Atualizar estatísticas de todos os destinatários em um único commit
+    with span("stats.flush", recipients=sent_count):
+        stats_writer.flush(db_session)
+    delivery_latency_service.flush(latency_recorder)
+
+    if buffered_count:
+        logger.info(
+            f"Sinal {signal_data.get('id')} adicionado ao resumo de {buffered_count} chats"
+        )
+    if skipped_count:
+        logger.info(
+            f"Sinal {signal_id}: {skipped_count} chats ignorados por entrega já registrada"
+        )
+
     return sent_count
 
 
@@ -274,6 +724,23 @@ async def send_signal_to_user(signal_data, chat_id):
         signal_data: Dados do sinal
         chat_id: ID do chat do usuário
 
+    Returns:
+        bool: True se enviado com sucesso
+    """
+    # Renderizado uma vez por sinal e compartilhado entre destinatários
+    message = signal_renderer.render(signal_data)
+
+    return await send_message_to_chat(chat_id, message)
+
+
+async def send_message_to_chat(chat_id, message):
+    """
+    Enviar mensagem HTML para um chat com retry em erros de rede
+
+    Args:
+        chat_id: ID do chat
+        message: Mensagem já renderizada
+
     Returns:
         bool: True se enviado com sucesso
     """
@@ -283,100 +750,182 @@ async def send_signal_to_user(signal_data, chat_id):
     for attempt in range(max_retries):
         try:
             from telegram.constants import ParseMode
-            from telegram.error import NetworkError, TelegramError, TimedOut
-
-            # Formatar mensagem do sinal
-            message = _format_signal_message_for_user(signal_data)
-
-            # Usar o telegram_client configurado
-            await telegram_client.bot.send_message(
-                chat_id=int(chat_id),
-                text=message,
-                parse_mode=ParseMode.HTML,
-                disable_web_page_preview=True,
+            from telegram.error import (
+                BadRequest,
+                Forbidden,
+                NetworkError,
+                RetryAfter,
+                TelegramError,
+                TimedOut,
             )
 
+            # Usar o cliente Telegram do processo
+            api_started = time.perf_counter()
+            try:
+                with span("send_message", chat_id=str(chat_id), attempt=attempt + 1):
+                    await get_telegram_client().bot.send_message(
+                        chat_id=int(chat_id),
+                        text=message,
+                        parse_mode=ParseMode.HTML,
+                        disable_web_page_preview=True,
+                    )
+            finally:
+                TELEGRAM_API_SECONDS.labels(method="sendMessage").observe(
+                    time.perf_counter() - api_started
+                )
+
+            SENDS.labels(result="success", error_class="").inc()
             return True
 
+        except (Forbidden, BadRequest) as e:
+            # BadRequest herda de NetworkError - tratar antes para não repetir
+            reason = classify_delivery_error(e)
+            SENDS.labels(result="failed", error_class=reason or type(e).__name__).inc()
+            logger.error(f"❌ Erro do Telegram ao enviar para {chat_id}: {e}")
+            if reason:
+                await dead_chat_service.record_permanent_failure(chat_id, reason)
+            return False
+
+        except RetryAfter as e:
+            # Flood control: respeitar o tempo pedido pelo Telegram
+            if attempt < max_retries - 1:
+                SENDS.labels(result="retried", error_class="RetryAfter").inc()
+                retry_after = getattr(e.retry_after, "total_seconds", None)
+                wait_seconds = retry_after() if retry_after else e.retry_after
+                logger.warning(
+                    f"⚠️ Flood control ao enviar para {chat_id}, aguardando {wait_seconds}s"
+                )
+                await asyncio.sleep(wait_seconds)
+                continue
+            SENDS.labels(result="failed", error_class="RetryAfter").inc()
+            logger.error(f"❌ Flood control persistente ao enviar para {chat_id}: {e}")
+            return False
+
         except (NetworkError, TimedOut) as e:
             if attempt < max_retries - 1:
+                SENDS.labels(result="retried", error_class=type(e).__name__).inc()
                 logger.warning(
                     f"⚠️ Erro de rede ao enviar para {chat_id}, tentativa {attempt + 1}/{max_retries}: {e}"
                 )
                 await asyncio.sleep(retry_delay * (attempt + 1))
                 continue
             else:
+                SENDS.labels(result="failed", error_class=type(e).__name__).inc()
                 logger.error(
                     f"❌ Falha definitiva ao enviar para {chat_id} após {max_retries} tentativas: {e}"
                 )
                 return False
 
         except TelegramError as e:
+            SENDS.labels(result="failed", error_class=type(e).__name__).inc()
             logger.error(f"❌ Erro do Telegram ao enviar para {chat_id}: {e}")
             return False
 
         except Exception as e:
-            logger.error(
-                f"❌ Erro inesperado ao enviar sinal para usuário {chat_id}: {e}"
-            )
+            SENDS.labels(result="failed", error_class=type(e).__name__).inc()
+            logger.error(f"❌ Erro inesperado ao enviar mensagem para {chat_id}: {e}")
             return False
 
     return False
 
 
-def _format_signal_message_for_user(signal_data):
-    """Formatar mensagem do sinal personalizada para usuário"""
+@celery_app.task
+def flush_signal_digests():
+    """
+    Task para enviar resumos de sinais cuja janela expirou
+
+    Os resumos saem do Redis antes do envio; o que não foi entregue (falha
+    de envio ou erro na task) volta ao buffer para a próxima execução.
+    """
+    db_session = None
+    digests = {}
+    undelivered = {}
     try:
-        from src.utils.price_formatter import format_crypto_price
-
-        symbol = signal_data.get("symbol", "UNKNOWN")
-        signal_type = signal_data.get("signal_type", "UNKNOWN")
-        rsi_value = signal_data.get("indicator_data", {}).get("rsi_value", 0)
-        current_price = signal_data.get("price", 0)
-        strength = signal_data.get("strength", "UNKNOWN")
-        timeframe = signal_data.get("timeframe", "UNKNOWN")
-        message = signal_data.get("message", "")
-        source = signal_data.get("source", "UNKNOWN")
-
-        # Emojis por tipo de sinal
-        emoji_map = {
-            "BUY": "🚀🟢",
-            "SELL": "📉🔴",
-            "HOLD": "⏸️🟡",
-        }
+        digests = digest_service.pop_due_digests()
+
+        if not digests:
+            return {"status": "no_digests", "sent_count": 0}
+
+        undelivered = dict(digests)
+        db_session = next(get_db())
+        sent_count = await_sync(
+            send_digests_with_session(digests, db_session, undelivered)
+        )
 
-        # Emoji de força
-        strength_emoji = {
-            "STRONG": "💪",
-            "MODERATE": "👍",
-            "WEAK": "👌",
+        logger.info(f"Resumos enviados: {sent_count}/{len(digests)} chats")
+        return {
+            "status": "completed",
+            "digests": len(digests),
+            "sent_count": sent_count,
+            "requeued_chats": len(undelivered),
         }
 
-        # Emoji do tipo de sinal
-        signal_emoji = emoji_map.get(signal_type.upper(), "📊")
-        strength_icon = strength_emoji.get(strength.upper(), "📊")
+    except Exception as e:
+        logger.error(f"❌ Erro ao enviar resumos de sinais: {e}")
+        return {"status": "error", "error": str(e)}
+    finally:
+        # Fora do event loop: devolução ao Redis e poda de chats mortos
+        for chat_id, signals in undelivered.items():
+            digest_service.requeue_digest(chat_id, signals)
+        dead_chat_service.flush_pending()
+        if db_session:
+            try:
+                db_session.close()
+            except Exception as e:
+                logger.warning(f"Erro ao fechar sessão: {e}")
+
+
+async def send_digests_with_session(digests, db_session, undelivered=None):
+    """
+    Enviar um resumo por chat e atualizar estatísticas em lote
+
+    Args:
+        digests: Mapa chat_id -> sinais acumulados
+        db_session: Sessão de banco de dados
+        undelivered: Mapa opcional chat_id -> sinais ainda não entregues;
+            atualizado a cada mensagem enviada (o chamador devolve o resto)
+
+    Returns:
+        Número de chats que receberam o resumo
+    """
+    if undelivered is None:
+        undelivered = {}
+    sent_count = 0
+    stats_writer = SignalStatsWriter()
 
-        # Formatar preço
-        formatted_price = format_crypto_price(current_price)
+    for chat_id, signals in digests.items():
+        delivered = []
+        try:
+            # Para na primeira falha: mensagens seguintes ficam para o reenvio
+            for message, message_signals in signal_renderer.render_digest_parts(
+                signals
+            ):
+                if not await send_message_to_chat(chat_id, message):
+                    break
+                delivered.extend(message_signals)
 
-        # Template da mensagem personalizada
-        template = f"""{signal_emoji} <b>SINAL DE TRADING</b> {signal_emoji}
+            if len(delivered) < len(signals):
+                logger.error(f"❌ Falha ao enviar resumo para {chat_id}")
 
-{strength_icon} <b>{symbol}</b> - {strength}
-💰 Preço: {formatted_price}
-📊 RSI: {rsi_value:.1f}
-⏰ Timeframe: {timeframe}
-🔗 Fonte: {source}
+        except Exception as e:
+            logger.error(f"❌ Erro ao enviar resumo para {chat_id}: {e}")
 
-{message}
+        for signal in delivered:
+            stats_writer.record(
+                chat_id,
+                symbol=signal.get("symbol"),
+                rsi_value=signal.get("rsi_value"),
+            )
 
-<i>🤖 BullBot Signals</i>"""
+        if len(delivered) == len(signals):
+            undelivered.pop(chat_id, None)
+            sent_count += 1
+        else:
+            undelivered[chat_id] = signals[len(delivered) :]
 
-        return template.strip()
+    stats_writer.flush(db_session)
 
-    except Exception as e:
-        logger.error(f"❌ Erro ao formatar mensagem: {e}")
-        return f"Sinal: {signal_data.get('symbol', 'N/A')} {signal_data.get('signal_type', 'N/A')}"
+    return sent_count
 
 
 @celery_app.task
@@ -384,6 +933,7 @@ def get_subscription_stats():
     """Task para obter estatísticas de assinantes"""
     try:
         stats = user_config_service.get_subscription_stats()
+        stats["dead_chats"] = dead_chat_service.get_stats()
         logger.info(f"Estatísticas de assinantes: {stats}")
         return stats
     except Exception as e:
@@ -391,6 +941,32 @@ def get_subscription_stats():
         return {"status": "error", "error": str(e)}
 
 
+@celery_app.task
+def get_delivery_latency_stats():
+    """Task para obter histogramas de latência de entrega por estágio"""
+    try:
+        stats = delivery_latency_service.get_latency_stats()
+        logger.info(f"Latência de entrega: {stats}")
+        return {"status": "ok", "latency": stats}
+    except Exception as e:
+        logger.error(f"❌ Erro ao obter latência de entrega: {e}")
+        return {"status": "error", "error": str(e)}
+
+
+@celery_app.task
+def get_capacity_recommendation():
+    """Task para recomendar processos por fila a partir da carga atual"""
+    try:
+        recommendation = recommend_capacity()
+        logger.info(
+            f"Capacidade recomendada: {recommendation['recommended_processes']} (carga: {recommendation['load']})"
+        )
+        return recommendation
+    except Exception as e:
+        logger.error(f"❌ Erro ao calcular capacidade recomendada: {e}")
+        return {"status": "error", "error": str(e)}
+
+
 @celery_app.task
 def test_connections():
     """Task para testar conexões com banco e Telegram"""
@@ -403,7 +979,9 @@ def test_connections():
             signals_ok = signal_reader.test_connection()
 
             # Testar conexão com Telegram
-            telegram_ok = loop.run_until_complete(telegram_client.test_connection())
+            telegram_ok = loop.run_until_complete(
+                get_telegram_client().test_connection()
+            )
 
             status = {
                 "database": "ok" if signals_ok else "error",
@@ -428,6 +1006,8 @@ def get_system_status():
     try:
         # Agora é síncrono - não precisa de loop
         status = signal_reader.get_system_status()
+        if status is not None:
+            status["redis_pool"] = get_pool_stats()
         return status
     except Exception as e:
         logger.error(f"❌ Erro ao obter status: {e}")
@@ -438,13 +1018,11 @@ def get_system_status():
 def cleanup_old_data():
     """Task para limpeza e otimizações periódicas"""
     try:
-        # Limpar cache Redis antigo
-        cache_keys = ["last_signal_count", "signal_cache_*"]
-        for pattern in cache_keys:
-            keys = redis_client.keys(pattern)
-            if keys:
-                redis_client.delete(*keys)
-                logger.info(f"Limpos {len(keys)} keys do cache Redis")
+        # Limpar cache Redis antigo (SCAN incremental, nunca KEYS)
+        get_redis().delete("last_signal_count")
+        sweep = redis_maintenance_service.sweep("signal_cache_*")
+        if sweep["deleted"]:
+            logger.info(f"Limpos {sweep['deleted']} keys do cache Redis")
 
         # Verificar e otimizar conexões
         status = signal_reader.get_system_status()
@@ -452,6 +1030,7 @@ def cleanup_old_data():
         return {
             "status": "cleanup_completed",
             "cache_cleaned": True,
+            "cache_sweep": sweep,
             "system_status": status,
         }
 
@@ -0,0 +1 @@
+# Ferramentas de desenvolvimento, testes de carga e diagnóstico
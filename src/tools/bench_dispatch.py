@@ -0,0 +1,363 @@
+"""
+Benchmark do matcher de sinais (SignalDispatchService) - BullBot Telegram
+Populações sintéticas de UserMonitoringConfig e fluxos de sinais com seed
+fixa, sessão falsa que conta queries e relatório estável para comparação
+
+Uso:
+    python -m src.tools.bench_dispatch
+    python -m src.tools.bench_dispatch --sizes 1000,10000 --signals 50 --json base.json
+    python -m src.tools.bench_dispatch --compare base.json --tolerance 0.25
+
+Com --compare sai com código 1 se algum cenário regredir: throughput abaixo
+da tolerância, mais queries por sinal ou pico de alocação acima da tolerância.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List
+
+SYMBOLS = [
+    "BTC", "ETH", "SOL", "ADA", "AVAX", "DOT", "LINK", "XRP", "DOGE", "BNB",
+    "MATIC", "LTC", "ATOM", "NEAR", "APT", "ARB", "OP", "FIL", "ICP", "INJ",
+    "SUI", "SEI", "TIA", "PEPE", "SHIB", "TRX", "TON", "UNI", "AAVE", "MKR",
+]  # fmt: skip
+TIMEFRAMES = ["15m", "1h", "4h", "1d"]
+STRENGTHS = ["STRONG", "MODERATE", "WEAK"]
+MODES = ("orm", "slim")
+
+# Sinais de cada cenário repetidos sob tracemalloc (pico e blocos retidos)
+TRACEMALLOC_SIGNALS = 3
+
+
+def build_population(size: int, rng: random.Random) -> List[Any]:
+    """
+    Gerar configurações sintéticas (uma por chat, como no banco)
+
+    Listas de símbolos de tamanhos variados, faixas de RSI, cooldowns,
+    limites diários, histórico de RSI e modo resumo em parte dos usuários.
+    """
+    from src.database.models import UserMonitoringConfig
+
+    now = datetime.now(timezone.utc)
+    today_str = now.date().isoformat()
+    population = []
+
+    for index in range(size):
+        symbols = rng.sample(SYMBOLS, rng.choice([1, 2, 3, 5, 8, 12, 20]))
+        timeframes = rng.sample(TIMEFRAMES, rng.randint(1, len(TIMEFRAMES)))
+
+        filter_config: Dict[str, Any] = {
+            "max_signals_per_day": rng.choice([3, 5, 10]),
+            "min_rsi_difference": rng.choice([0, 2.0, 5.0]),
+        }
+        if rng.random() < 0.4:
+            filter_config["cooldown_minutes"] = {
+                timeframe: {"strong": 15, "moderate": 30, "weak": 60}
+                for timeframe in timeframes
+            }
+        if rng.random() < 0.5:
+            filter_config["last_rsi_by_symbol"] = {
+                symbol: round(rng.uniform(5, 95), 1) for symbol in symbols
+            }
+        if rng.random() < 0.3:
+            filter_config["daily_signal_counts"] = {
+                "date": today_str,
+                "symbols": {symbol: rng.randint(0, 6) for symbol in symbols},
+            }
+        if rng.random() < 0.1:
+            filter_config["digest"] = {"enabled": True, "window_minutes": 5}
+
+        chat_id = 900000000 + index
+        population.append(
+            UserMonitoringConfig(
+                id=index + 1,
+                user_id=chat_id,
+                chat_id=str(chat_id),
+                chat_type="private",
+                config_name=f"bench_{index % 7}",
+                priority=rng.randint(1, 5),
+                active=True,
+                symbols=symbols,
+                timeframes=timeframes,
+                indicators_config={
+                    "RSI": {
+                        "enabled": rng.random() > 0.1,
+                        "oversold": rng.choice([20, 25, 30]),
+                        "overbought": rng.choice([70, 75, 80]),
+                    }
+                },
+                filter_config=filter_config,
+                last_signal_at=None
+                if rng.random() < 0.3
+                else now - timedelta(minutes=rng.randint(1, 4320)),
+            )
+        )
+
+    return population
+
+
+def build_signals(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Gerar fluxo de sinais no formato do SignalReader"""
+    signals = []
+    for index in range(count):
+        signal_type = rng.choice(["BUY", "SELL"])
+        rsi_value = rng.uniform(5, 35) if signal_type == "BUY" else rng.uniform(65, 95)
+        signals.append(
+            {
+                "id": -(index + 1),
+                "symbol": rng.choice(SYMBOLS),
+                "signal_type": signal_type,
+                "strength": rng.choice(STRENGTHS),
+                "timeframe": rng.choice(TIMEFRAMES),
+                "price": round(rng.uniform(0.01, 50000), 4),
+                "indicator_data": {"rsi_value": round(rsi_value, 2)},
+            }
+        )
+    return signals
+
+
+class CountingQuery:
+    """
+    Query em memória: aplica igualdades simples (coluna == valor), ordena
+    por prioridade e devolve entidades ORM ou tuplas de colunas
+    """
+
+    def __init__(self, session: "CountingSession", entities):
+        self.session = session
+        self.entities = entities
+        self.conditions = []
+
+    def filter(self, *criteria):
+        for criterion in criteria:
+            self.conditions.extend(getattr(criterion, "clauses", [criterion]))
+        return self
+
+    def order_by(self, *clauses):
+        return self
+
+    def _matches(self, config) -> bool:
+        for condition in self.conditions:
+            expected = getattr(condition.right, "value", True)
+            if getattr(config, condition.left.key) != expected:
+                return False
+        return True
+
+    def _rows(self):
+        if len(self.entities) == 1 and hasattr(self.entities[0], "__table__"):
+            return (config for config in self.session.ordered if self._matches(config))
+
+        # Consulta por colunas: tuplas nomeadas, como as Rows do SQLAlchemy
+        rows = self.session.column_rows(self.entities)
+        return (
+            row
+            for config, row in zip(self.session.ordered, rows)
+            if self._matches(config)
+        )
+
+    def all(self):
+        return list(self._rows())
+
+    def first(self):
+        return next(iter(self._rows()), None)
+
+    def yield_per(self, count):
+        return self._rows()
+
+
+class CountingSession:
+    """Sessão falsa que conta queries emitidas pelo matcher"""
+
+    def __init__(self, population: List[Any]):
+        self.ordered = sorted(
+            population, key=lambda config: (-config.priority, config.id)
+        )
+        self.queries = 0
+        self._column_rows: Dict[tuple, List[Any]] = {}
+
+    def column_rows(self, columns) -> List[Any]:
+        """
+        Tuplas de colunas montadas uma vez por conjunto de colunas, para que
+        os dois modos meçam só o matcher (entidades ORM também são prontas)
+        """
+        names = tuple(column.key for column in columns)
+        if names not in self._column_rows:
+            row_type = namedtuple("Row", names)
+            self._column_rows[names] = [
+                row_type(*(getattr(config, name) for name in names))
+                for config in self.ordered
+            ]
+        return self._column_rows[names]
+
+    def query(self, *entities):
+        self.queries += 1
+        return CountingQuery(self, entities)
+
+
+def run_scenario(
+    population: List[Any], signals: List[Dict[str, Any]], mode: str, runs: int
+) -> Dict[str, Any]:
+    """Medir um cenário (população x modo) em `runs` repetições"""
+    from src.services.signal_dispatch_service import signal_dispatch_service
+    from src.utils.config import get_settings
+
+    get_settings().worker_slim_mode = mode == "slim"
+    session = CountingSession(population)
+    match = signal_dispatch_service.get_eligible_users_for_signal_with_session
+
+    # Aquecimento (caches, imports tardios) fora da medição
+    for signal in signals:
+        match(signal, session)
+
+    elapsed_runs = []
+    matches = 0
+    for _ in range(runs):
+        session.queries = 0
+        matches = 0
+        started = time.perf_counter()
+        for signal in signals:
+            matches += len(match(signal, session))
+        elapsed_runs.append(time.perf_counter() - started)
+    queries = session.queries
+
+    # Alocações medidas à parte: o tracemalloc distorce o tempo
+    tracemalloc.start()
+    before_blocks = sum(
+        stat.count for stat in tracemalloc.take_snapshot().statistics("filename")
+    )
+    tracemalloc.reset_peak()
+    before_current, _ = tracemalloc.get_traced_memory()
+    for signal in signals[:TRACEMALLOC_SIGNALS]:
+        match(signal, session)
+    _, peak = tracemalloc.get_traced_memory()
+    after_blocks = sum(
+        stat.count for stat in tracemalloc.take_snapshot().statistics("filename")
+    )
+    tracemalloc.stop()
+
+    # Throughput pela melhor repetição (mais estável entre execuções)
+    elapsed = min(elapsed_runs)
+    measured = max(1, min(len(signals), TRACEMALLOC_SIGNALS))
+    return {
+        "users": len(population),
+        "mode": mode,
+        "signals": len(signals),
+        "signals_per_second": round(len(signals) / elapsed, 2) if elapsed else 0.0,
+        "candidates_per_second": round(len(signals) * len(population) / elapsed)
+        if elapsed
+        else 0,
+        "ms_per_signal": round(elapsed / len(signals) * 1000, 3),
+        "median_ms_per_signal": round(
+            statistics.median(elapsed_runs) / len(signals) * 1000, 3
+        ),
+        "matches_per_signal": round(matches / len(signals), 2),
+        "queries_per_signal": round(queries / len(signals), 2),
+        "peak_kb_per_signal": round((peak - before_current) / 1024, 1),
+        "retained_blocks_per_signal": round((after_blocks - before_blocks) / measured),
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, tolerance: float):
+    """Comparar com um relatório anterior e listar regressões"""
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = {
+            (entry["users"], entry["mode"]): entry
+            for entry in json.load(baseline_file)["results"]
+        }
+
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["users"], result["mode"]))
+        if not previous:
+            continue
+
+        scenario = f"{result['users']} usuários/{result['mode']}"
+        if result["signals_per_second"] < previous["signals_per_second"] * (
+            1 - tolerance
+        ):
+            regressions.append(
+                f"{scenario}: {result['signals_per_second']} sinais/s (antes {previous['signals_per_second']})"
+            )
+        if result["queries_per_signal"] > previous["queries_per_signal"]:
+            regressions.append(
+                f"{scenario}: {result['queries_per_signal']} queries/sinal (antes {previous['queries_per_signal']})"
+            )
+        if result["peak_kb_per_signal"] > previous["peak_kb_per_signal"] * (
+            1 + tolerance
+        ):
+            regressions.append(
+                f"{scenario}: pico {result['peak_kb_per_signal']}KB/sinal (antes {previous['peak_kb_per_signal']})"
+            )
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do matcher de sinais")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--signals", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Salvar relatório em JSON")
+    parser.add_argument("--compare", help="Relatório JSON anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:BENCHMARK")
+    os.environ.setdefault("TELEGRAM_GROUP_CHAT_ID", "0")
+    os.environ["TRACING_ENABLED"] = "false"
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    modes = [mode for mode in args.modes.split(",") if mode in MODES]
+
+    print(
+        f"{'usuários':>9} {'modo':>5} {'sinais/s':>10} {'cand/s':>11} "
+        f"{'ms/sinal':>9} {'match/sinal':>11} {'queries/sinal':>13} {'pico KB':>8}"
+    )
+
+    results = []
+    for size in sizes:
+        # Mesma seed por tamanho: populações e sinais idênticos entre execuções
+        rng = random.Random(f"{args.seed}:{size}")
+        population = build_population(size, rng)
+        signals = build_signals(args.signals, rng)
+
+        for mode in modes:
+            result = run_scenario(population, signals, mode, max(1, args.runs))
+            results.append(result)
+            print(
+                f"{result['users']:>9} {result['mode']:>5} "
+                f"{result['signals_per_second']:>10} {result['candidates_per_second']:>11} "
+                f"{result['ms_per_signal']:>9} {result['matches_per_signal']:>11} "
+                f"{result['queries_per_signal']:>13} {result['peak_kb_per_signal']:>8}"
+            )
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as report_file:
+            json.dump(
+                {
+                    "seed": args.seed,
+                    "python": sys.version.split()[0],
+                    "results": results,
+                },
+                report_file,
+                indent=2,
+            )
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSÃO {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Servidor local que simula a Telegram Bot API - BullBot Telegram
+Implementa sendMessage/getMe com latência, erros e 429 configuráveis
+
+Uso:
+    python -m src.tools.fake_telegram_api --port 8081 --latency-ms 50 --rate-limit-rate 0.01
+
+Aponte o bot para ele com TELEGRAM_API_BASE_URL=http://localhost:8081/bot
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any
+from urllib.parse import parse_qs
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class FakeTelegramConfig:
+    """Parâmetros de comportamento do servidor simulado"""
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 10.0,
+        error_rate: float = 0.0,
+        forbidden_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: int = 1,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.forbidden_rate = forbidden_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+
+
+class FakeTelegramStats:
+    """Contadores de requisições atendidas (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def increment(self, key: str):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counts)
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    """Handler HTTP no formato /bot<token>/<método>"""
+
+    server_version = "FakeTelegramBotAPI/1.0"
+
+    def log_message(self, format, *args):
+        # Evitar log por requisição durante testes de carga
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.server.stats.snapshot())
+            return
+        self._dispatch({})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        self._dispatch(self._parse_body(raw_body))
+
+    def _parse_body(self, raw_body: bytes) -> Dict[str, Any]:
+        """Aceitar corpo JSON ou form-urlencoded (usado pelo python-telegram-bot)"""
+        if not raw_body:
+            return {}
+
+        content_type = self.headers.get("Content-Type", "")
+        if "application/json" in content_type:
+            return json.loads(raw_body)
+
+        return {key: values[-1] for key, values in parse_qs(raw_body.decode()).items()}
+
+    def _dispatch(self, params: Dict[str, Any]):
+        method = self.path.rstrip("/").rsplit("/", 1)[-1]
+        config = self.server.config
+        stats = self.server.stats
+
+        # Latência simulada da API
+        delay_ms = config.latency_ms + random.uniform(
+            -config.jitter_ms, config.jitter_ms
+        )
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        if method == "getMe":
+            stats.increment("getMe")
+            self._send_ok(
+                {
+                    "id": 1000000001,
+                    "is_bot": True,
+                    "first_name": "BullBot Fake",
+                    "username": "bullbot_fake_bot",
+                    "can_join_groups": True,
+                    "can_read_all_group_messages": False,
+                    "supports_inline_queries": False,
+                }
+            )
+            return
+
+        if method != "sendMessage":
+            stats.increment("not_found")
+            self._send_error(404, "Not Found")
+            return
+
+        roll = random.random()
+
+        if roll < config.rate_limit_rate:
+            stats.increment("rate_limited")
+            self._send_error(
+                429,
+                f"Too Many Requests: retry after {config.retry_after}",
+                {"retry_after": config.retry_after},
+            )
+            return
+        roll -= config.rate_limit_rate
+
+        if roll < config.forbidden_rate:
+            stats.increment("forbidden")
+            self._send_error(403, "Forbidden: bot was blocked by the user")
+            return
+        roll -= config.forbidden_rate
+
+        if roll < config.error_rate:
+            stats.increment("server_error")
+            self._send_error(500, "Internal Server Error")
+            return
+
+        stats.increment("sendMessage")
+        chat_id = params.get("chat_id", 0)
+        self._send_ok(
+            {
+                "message_id": random.randint(1, 2**31 - 1),
+                "date": int(time.time()),
+                "chat": {"id": int(chat_id), "type": "private"},
+                "text": params.get("text", ""),
+            }
+        )
+
+    def _send_ok(self, result: Dict[str, Any]):
+        self._send_json(200, {"ok": True, "result": result})
+
+    def _send_error(
+        self, code: int, description: str, parameters: Dict[str, Any] = None
+    ):
+        body = {"ok": False, "error_code": code, "description": description}
+        if parameters:
+            body["parameters"] = parameters
+        self._send_json(code, body)
+
+    def _send_json(self, code: int, body: Dict[str, Any]):
+        payload = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def create_fake_telegram_server(
+    host: str = "127.0.0.1", port: int = 8081, config: FakeTelegramConfig = None
+) -> ThreadingHTTPServer:
+    """Criar servidor simulado (port=0 escolhe uma porta livre)"""
+    server = ThreadingHTTPServer((host, port), FakeTelegramHandler)
+    server.daemon_threads = True
+    server.config = config or FakeTelegramConfig()
+    server.stats = FakeTelegramStats()
+    return server
+
+
+def start_fake_telegram_server_in_thread(
+    host: str = "127.0.0.1", port: int = 0, config: FakeTelegramConfig = None
+) -> ThreadingHTTPServer:
+    """Iniciar servidor simulado em thread de background"""
+    server = create_fake_telegram_server(host, port, config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telegram Bot API simulada")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--forbidden-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+
+    config = FakeTelegramConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        forbidden_rate=args.forbidden_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+    )
+    server = create_fake_telegram_server(args.host, args.port, config)
+
+    print(f"Telegram Bot API simulada em http://{args.host}:{args.port}/bot")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
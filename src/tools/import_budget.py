@@ -0,0 +1,178 @@
+"""
+Verificação de custo de import dos módulos de entrada - BullBot Telegram
+Importa cada módulo em um interpretador limpo, mede o tempo (mediana de N
+execuções) e confere que nenhum cliente global foi construído no import
+
+Uso:
+    python -m src.tools.import_budget
+    python -m src.tools.import_budget --runs 5 --scale 2.0
+
+Sai com código 1 se algum módulo estourar o orçamento ou criar clientes
+(engine SQLAlchemy, cliente Telegram, pool Redis) durante o import.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, Any, List
+
+# Processo filho: mede o import e inspeciona sys.modules sem importar nada novo
+CHILD_CODE = """
+import importlib, json, sys, time
+
+started = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed_ms = (time.perf_counter() - started) * 1000
+
+heavy = [name for name in sys.argv[2].split(",") if name and name in sys.modules]
+
+eager = []
+config = sys.modules.get("src.utils.config")
+if config is not None and config.get_settings.cache_info().currsize:
+    eager.append("settings")
+connection = sys.modules.get("src.database.connection")
+if connection is not None and connection._engine is not None:
+    eager.append("engine")
+telegram_bot = sys.modules.get("src.integrations.telegram_bot")
+if telegram_bot is not None and telegram_bot._telegram_client is not None:
+    eager.append("telegram_client")
+redis_client = sys.modules.get("src.utils.redis_client")
+if redis_client is not None and redis_client._sync_client is not None:
+    eager.append("redis")
+
+print(json.dumps({"elapsed_ms": elapsed_ms, "heavy": heavy, "eager": eager}))
+"""
+
+
+class ImportTarget:
+    """Módulo de entrada com orçamento de import e restrições"""
+
+    def __init__(
+        self,
+        module: str,
+        budget_ms: float,
+        forbidden_modules: tuple = (),
+        allow_settings: bool = True,
+    ):
+        self.module = module
+        self.budget_ms = budget_ms
+        self.forbidden_modules = forbidden_modules
+        self.allow_settings = allow_settings
+
+
+# Orçamentos com folga para a máquina de desenvolvimento (use --scale em CI lenta)
+TARGETS = [
+    ImportTarget(
+        "src.utils.config",
+        budget_ms=300,
+        forbidden_modules=("sqlalchemy", "telegram", "redis", "celery"),
+        allow_settings=False,
+    ),
+    ImportTarget(
+        "src.integrations.telegram_bot",
+        budget_ms=400,
+        forbidden_modules=("telegram", "sqlalchemy"),
+        allow_settings=False,
+    ),
+    ImportTarget(
+        "src.tasks.telegram_tasks",
+        budget_ms=1200,
+        forbidden_modules=("telegram",),
+        allow_settings=False,
+    ),
+    ImportTarget(
+        "src.tasks.celery_app",
+        budget_ms=1200,
+        forbidden_modules=("telegram",),
+        allow_settings=False,
+    ),
+    ImportTarget("src.main", budget_ms=1000, forbidden_modules=("telegram",)),
+]
+
+
+def measure_import(target: ImportTarget, runs: int) -> Dict[str, Any]:
+    """Importar o módulo em `runs` interpretadores limpos e agregar"""
+    env = dict(os.environ)
+    # Valores sintéticos: módulos que leem settings no import precisam deles
+    env.setdefault("TELEGRAM_BOT_TOKEN", "123456:IMPORTBUDGET")
+    env.setdefault("TELEGRAM_GROUP_CHAT_ID", "0")
+
+    samples = []
+    heavy: List[str] = []
+    eager: List[str] = []
+
+    for _ in range(runs):
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                CHILD_CODE,
+                target.module,
+                ",".join(target.forbidden_modules),
+            ],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(
+                f"Falha ao importar {target.module}: {completed.stderr.strip()}"
+            )
+
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        samples.append(result["elapsed_ms"])
+        heavy = result["heavy"]
+        eager = result["eager"]
+
+    if target.allow_settings and "settings" in eager:
+        eager.remove("settings")
+
+    return {
+        "module": target.module,
+        "median_ms": statistics.median(samples),
+        "heavy": heavy,
+        "eager": eager,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de import")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiplicador dos orçamentos"
+    )
+    parser.add_argument("--module", action="append", help="Verificar só este módulo")
+    args = parser.parse_args()
+
+    targets = [
+        target for target in TARGETS if not args.module or target.module in args.module
+    ]
+
+    failed = False
+    for target in targets:
+        report = measure_import(target, max(1, args.runs))
+        budget_ms = target.budget_ms * args.scale
+
+        problems = []
+        if report["median_ms"] > budget_ms:
+            problems.append(f"acima do orçamento de {budget_ms:.0f}ms")
+        if report["heavy"]:
+            problems.append(f"importou {', '.join(report['heavy'])}")
+        if report["eager"]:
+            problems.append(f"criou no import: {', '.join(report['eager'])}")
+
+        status = "FALHOU" if problems else "ok"
+        print(
+            f"{status:6} {target.module:32} {report['median_ms']:7.1f}ms"
+            + (f"  ({'; '.join(problems)})" if problems else "")
+        )
+        failed = failed or bool(problems)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Teste de carga do envio de sinais - BullBot Telegram
+Gera N sinais x M usuários sintéticos e mede mensagens/s e latências p50/p99
+
+Mede só o envio (render + Bot API): elegibilidade, registro de entregas,
+estatísticas no banco e o broker do Celery ficam de fora. A concorrência
+reproduz a de produção: cada chunk de destinatários é enviado em sequência,
+como em send_signal_to_users_with_session, e --concurrency chunks rodam ao
+mesmo tempo, como os processos do pool de envio em fan-out.
+
+Uso (sobe a API simulada automaticamente):
+    python -m src.tools.load_test --signals 20 --users 500 --concurrency 4
+
+Sinais chegando ao longo do tempo (um a cada 200ms):
+    python -m src.tools.load_test --signals 50 --users 200 --signal-interval-ms 200
+
+Contra um servidor já em execução:
+    python -m src.tools.load_test --base-url http://localhost:8081/bot
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Any
+
+SYMBOLS = ["BTC", "ETH", "SOL", "ADA", "AVAX", "DOT", "LINK", "XRP", "DOGE", "BNB"]
+TIMEFRAMES = ["15m", "1h", "4h", "1d"]
+STRENGTHS = ["STRONG", "MODERATE", "WEAK"]
+
+
+def build_signals(count: int) -> List[Dict[str, Any]]:
+    """Gerar sinais sintéticos no formato do SignalReader"""
+    signals = []
+    for i in range(count):
+        signal_type = random.choice(["BUY", "SELL"])
+        rsi_value = (
+            random.uniform(5, 20) if signal_type == "BUY" else random.uniform(80, 95)
+        )
+        signals.append(
+            {
+                "id": -(i + 1),  # IDs negativos para não colidir com sinais reais
+                "symbol": random.choice(SYMBOLS),
+                "signal_type": signal_type,
+                "strength": random.choice(STRENGTHS),
+                "price": round(random.uniform(0.01, 50000), 4),
+                "timeframe": random.choice(TIMEFRAMES),
+                "source": "loadtest",
+                "message": f"Sinal sintético {i + 1} do teste de carga",
+                "indicator_data": {"rsi_value": rsi_value},
+            }
+        )
+    return signals
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil por posição mais próxima"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_load_test(
+    signals: List[Dict[str, Any]],
+    chat_ids: List[int],
+    concurrency: int,
+    chunk_size: int,
+    signal_interval: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Enviar todos os sinais para todos os chats por send_signal_to_user
+
+    Cada sinal é criado (e recebe seu created_at) ao ser enfileirado, um a
+    cada signal_interval segundos, e dividido em chunks de chunk_size chats
+    enviados um a um; no máximo `concurrency` chunks rodam em paralelo. A
+    latência de cada entrega vai da criação do seu sinal até o ack.
+    """
+    # Import tardio: as configurações precisam ler a URL base já ajustada
+    from src.tasks.telegram_tasks import send_signal_to_user
+
+    semaphore = asyncio.Semaphore(concurrency)
+    send_latencies = []
+    end_to_end_latencies = []
+    results = {"sent": 0, "failed": 0}
+
+    async def deliver_chunk(signal, chunk, created_at):
+        async with semaphore:
+            for chat_id in chunk:
+                started = time.perf_counter()
+                success = await send_signal_to_user(signal, chat_id)
+                acked = time.perf_counter()
+
+                send_latencies.append(acked - started)
+                end_to_end_latencies.append(acked - created_at)
+                results["sent" if success else "failed"] += 1
+
+    run_started = time.perf_counter()
+    deliveries = []
+    for index, signal in enumerate(signals):
+        delay = run_started + index * signal_interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        created_at = time.perf_counter()
+        signal["created_at"] = datetime.now(timezone.utc).isoformat()
+        deliveries.extend(
+            asyncio.create_task(
+                deliver_chunk(signal, chat_ids[i : i + chunk_size], created_at)
+            )
+            for i in range(0, len(chat_ids), chunk_size)
+        )
+
+    await asyncio.gather(*deliveries)
+    elapsed = time.perf_counter() - run_started
+
+    total = results["sent"] + results["failed"]
+    return {
+        "messages": total,
+        "sent": results["sent"],
+        "failed": results["failed"],
+        "elapsed_seconds": round(elapsed, 3),
+        "messages_per_second": round(total / elapsed, 2) if elapsed else 0.0,
+        "send_latency_ms": {
+            "p50": round(percentile(send_latencies, 50) * 1000, 2),
+            "p99": round(percentile(send_latencies, 99) * 1000, 2),
+        },
+        "end_to_end_latency_ms": {
+            "p50": round(percentile(end_to_end_latencies, 50) * 1000, 2),
+            "p99": round(percentile(end_to_end_latencies, 99) * 1000, 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do envio de sinais")
+    parser.add_argument("--signals", type=int, default=10)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Chunks enviados em paralelo (1 = envio inline do ciclo)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Chats por chunk (padrão: DISPATCH_FANOUT_CHUNK_SIZE)",
+    )
+    parser.add_argument(
+        "--signal-interval-ms",
+        type=float,
+        default=0.0,
+        help="Intervalo entre a criação de sinais (0 = todos de uma vez)",
+    )
+    parser.add_argument(
+        "--base-url",
+        default=None,
+        help="URL base da Bot API (padrão: sobe a API simulada localmente)",
+    )
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--forbidden-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        from src.tools.fake_telegram_api import (
+            FakeTelegramConfig,
+            start_fake_telegram_server_in_thread,
+        )
+
+        server = start_fake_telegram_server_in_thread(
+            config=FakeTelegramConfig(
+                latency_ms=args.latency_ms,
+                error_rate=args.error_rate,
+                forbidden_rate=args.forbidden_rate,
+                rate_limit_rate=args.rate_limit_rate,
+            )
+        )
+        base_url = f"http://127.0.0.1:{server.server_address[1]}/bot"
+
+    os.environ["TELEGRAM_API_BASE_URL"] = base_url
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:LOADTEST")
+    os.environ.setdefault("TELEGRAM_GROUP_CHAT_ID", "0")
+
+    from src.utils.config import settings
+
+    concurrency = max(1, args.concurrency)
+    chunk_size = max(1, args.chunk_size or settings.dispatch_fanout_chunk_size)
+    signals = build_signals(args.signals)
+    chat_ids = [900000000 + i for i in range(args.users)]
+
+    print(
+        f"Teste de carga: {len(signals)} sinais x {len(chat_ids)} usuários, "
+        f"{concurrency} chunks de {chunk_size} em paralelo, API {base_url}"
+    )
+
+    report = asyncio.run(
+        run_load_test(
+            signals, chat_ids, concurrency, chunk_size, args.signal_interval_ms / 1000
+        )
+    )
+
+    print(
+        f"Mensagens:       {report['messages']} ({report['sent']} ok, {report['failed']} falhas)"
+    )
+    print(f"Duração:         {report['elapsed_seconds']}s")
+    print(f"Throughput:      {report['messages_per_second']} msg/s (só envio)")
+    print(
+        f"Latência envio:  p50 {report['send_latency_ms']['p50']}ms | "
+        f"p99 {report['send_latency_ms']['p99']}ms"
+    )
+    print(
+        f"Criação -> ack:  p50 {report['end_to_end_latency_ms']['p50']}ms | "
+        f"p99 {report['end_to_end_latency_ms']['p99']}ms"
+    )
+
+    if server:
+        print(f"API simulada:    {server.stats.snapshot()}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
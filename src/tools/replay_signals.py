@@ -0,0 +1,339 @@
+"""
+Replay histórico de sinais pelo matcher - BullBot Telegram
+Lê um intervalo do signal_history em ordem cronológica e passa cada sinal
+pela elegibilidade e pelo anti-spam contra um snapshot das configurações
+ativas, sem enviar mensagens nem escrever no banco
+
+Uso:
+    python -m src.tools.replay_signals --start 2024-05-01 --end 2024-05-02
+    python -m src.tools.replay_signals --start 2024-05-01T12:00 --end 2024-05-01T18:00 --speed 60
+    python -m src.tools.replay_signals --start 2024-05-01 --end 2024-05-08 \\
+        --filter-override '{"min_rsi_difference": 5}' --json replay.json
+
+O estado anti-spam (último envio, contadores diários, último RSI por símbolo)
+é simulado em memória a partir do horário de cada sinal, como o
+SignalStatsWriter faria após os envios. Com --speed 0 (padrão) o replay roda
+o mais rápido possível e serve de benchmark com tráfego real.
+"""
+
+import argparse
+import copy
+import json
+import os
+import statistics
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional
+
+from src.tools.bench_dispatch import CountingSession
+
+MODES = ("orm", "slim")
+
+# Campos do filter_config mantidos pelo SignalStatsWriter (estado, não filtro)
+STATE_FILTER_KEYS = ("daily_signal_counts", "last_rsi_by_symbol")
+
+
+def parse_datetime(value: str) -> datetime:
+    """Data/hora ISO; sem fuso é tratada como UTC (como o banco grava)"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+class SnapshotSession(CountingSession):
+    """
+    Sessão em memória sobre o snapshot das configurações
+
+    Consultas por colunas devolvem os próprios objetos do snapshot (têm todas
+    as colunas), para que o estado anti-spam simulado valha nos dois modos.
+    """
+
+    def column_rows(self, columns) -> List[Any]:
+        return self.ordered
+
+
+def load_config_snapshot(
+    db, filter_override: Dict[str, Any], keep_state: bool
+) -> List[SimpleNamespace]:
+    """
+    Copiar as configurações ativas para objetos soltos da sessão
+
+    Sem keep_state o estado anti-spam atual é descartado: ele é posterior ao
+    intervalo repetido e bloquearia sinais por cooldown "no futuro".
+    """
+    from src.database.models import UserMonitoringConfig
+    from src.services.signal_dispatch_service import SLIM_CONFIG_COLUMNS
+
+    rows = (
+        db.query(*SLIM_CONFIG_COLUMNS)
+        .filter(UserMonitoringConfig.active == True)  # noqa: E712
+        .all()
+    )
+
+    snapshot = []
+    for row in rows:
+        config = SimpleNamespace(**row._asdict(), active=True)
+        config.filter_config = copy.deepcopy(row.filter_config or {})
+        config.filter_config.update(copy.deepcopy(filter_override))
+        config.last_signal_at = as_utc(config.last_signal_at)
+
+        if not keep_state:
+            config.last_signal_at = None
+            for key in STATE_FILTER_KEYS:
+                config.filter_config.pop(key, None)
+
+        snapshot.append(config)
+
+    return snapshot
+
+
+def stream_signals(db, start: datetime, end: datetime, batch_size: int):
+    """Sinais de trading do intervalo [start, end) em ordem cronológica"""
+    from sqlalchemy import and_
+    from src.database.models import SignalHistory
+    from src.services.signal_reader import SLIM_SIGNAL_COLUMNS
+
+    # A coluna é DateTime sem fuso: compara em UTC ingênuo
+    rows = (
+        db.query(*SLIM_SIGNAL_COLUMNS)
+        .filter(
+            and_(
+                SignalHistory.created_at >= start.replace(tzinfo=None),
+                SignalHistory.created_at < end.replace(tzinfo=None),
+                SignalHistory.signal_type.in_(["BUY", "SELL", "buy", "sell"]),
+            )
+        )
+        .order_by(SignalHistory.created_at, SignalHistory.id)
+        .yield_per(max(1, batch_size))
+    )
+
+    for row in rows:
+        signal = row._asdict()
+        signal["created_at"] = as_utc(row.created_at)
+        yield signal
+
+
+def apply_delivery(config: SimpleNamespace, signal: Dict[str, Any], now: datetime):
+    """Atualizar o estado simulado como o flush do SignalStatsWriter faria"""
+    from src.services.user_config_service import user_config_service
+
+    symbol = signal.get("symbol", "").upper()
+    rsi_value = (signal.get("indicator_data") or {}).get("rsi_value")
+
+    config.last_signal_at = now
+    user_config_service._apply_signal_to_filter_config(
+        config.filter_config, now.date().isoformat(), {symbol: 1}
+    )
+    if rsi_value is not None:
+        last_rsi = dict(config.filter_config.get("last_rsi_by_symbol", {}))
+        last_rsi[symbol] = rsi_value
+        config.filter_config["last_rsi_by_symbol"] = last_rsi
+
+
+def replay(
+    db,
+    snapshot: List[SimpleNamespace],
+    start: datetime,
+    end: datetime,
+    speed: float,
+    limit: Optional[int],
+    batch_size: int,
+) -> Dict[str, Any]:
+    """Repetir o intervalo e acumular entregas por chat e tempos do matcher"""
+    from src.services.signal_dispatch_service import SignalDispatchService
+
+    class ReplayDispatchService(SignalDispatchService):
+        """Matcher com o relógio no horário do sinal repetido"""
+
+        now = None
+
+        def _now(self) -> datetime:
+            return self.now
+
+    matcher = ReplayDispatchService()
+    session = SnapshotSession(snapshot)
+    configs_by_chat = {config.chat_id: config for config in session.ordered}
+
+    deliveries: Counter = Counter()
+    digest_deliveries = 0
+    signals = 0
+    silent_signals = 0
+    match_times: List[float] = []
+    first_signal_at = None
+    first_wall = None
+
+    started = time.perf_counter()
+    for signal in stream_signals(db, start, end, batch_size):
+        if limit and signals >= limit:
+            break
+
+        signal_at = signal["created_at"] or start
+        if first_signal_at is None:
+            first_signal_at, first_wall = signal_at, time.perf_counter()
+
+        # Velocidade acelerada: o intervalo entre sinais dividido por `speed`
+        if speed > 0:
+            target = (signal_at - first_signal_at).total_seconds() / speed
+            delay = target - (time.perf_counter() - first_wall)
+            if delay > 0:
+                time.sleep(delay)
+
+        matcher.now = signal_at
+        match_started = time.perf_counter()
+        eligible_users = matcher.get_eligible_users_for_signal_with_session(
+            signal, session
+        )
+        match_times.append(time.perf_counter() - match_started)
+
+        signals += 1
+        if not eligible_users:
+            silent_signals += 1
+
+        for user in eligible_users:
+            deliveries[user["chat_id"]] += 1
+            if user.get("digest_window_seconds"):
+                digest_deliveries += 1
+            apply_delivery(configs_by_chat[user["chat_id"]], signal, signal_at)
+
+    elapsed = time.perf_counter() - started
+    match_elapsed = sum(match_times)
+    per_user = [deliveries.get(config.chat_id, 0) for config in snapshot]
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "speed": speed,
+        "configs": len(snapshot),
+        "signals": signals,
+        "signals_without_recipients": silent_signals,
+        "deliveries": sum(deliveries.values()),
+        "digest_deliveries": digest_deliveries,
+        "users_reached": len(deliveries),
+        "deliveries_per_user": {
+            "p50": statistics.median(per_user) if per_user else 0,
+            "p90": statistics.quantiles(per_user, n=10)[-1]
+            if len(per_user) > 1
+            else sum(per_user),
+            "max": max(per_user, default=0),
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "signals_per_second": round(signals / elapsed, 2) if elapsed else 0.0,
+        "match_signals_per_second": round(signals / match_elapsed, 2)
+        if match_elapsed
+        else 0.0,
+        "candidates_per_second": round(signals * len(snapshot) / match_elapsed)
+        if match_elapsed
+        else 0,
+        "match_ms": {
+            "p50": round(statistics.median(match_times) * 1000, 3)
+            if match_times
+            else 0.0,
+            "p95": round(statistics.quantiles(match_times, n=20)[-1] * 1000, 3)
+            if len(match_times) > 1
+            else round(match_elapsed * 1000, 3),
+            "max": round(max(match_times, default=0.0) * 1000, 3),
+        },
+        "per_user": dict(deliveries.most_common()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay histórico de sinais")
+    parser.add_argument("--start", required=True, type=parse_datetime)
+    parser.add_argument("--end", required=True, type=parse_datetime)
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=0.0,
+        help="Aceleração sobre o tempo real (0 = o mais rápido possível)",
+    )
+    parser.add_argument("--limit", type=int, help="Máximo de sinais repetidos")
+    parser.add_argument("--mode", choices=MODES, help="Caminho do matcher")
+    parser.add_argument(
+        "--filter-override",
+        type=json.loads,
+        default={},
+        help="JSON mesclado no filter_config de todas as configurações",
+    )
+    parser.add_argument(
+        "--keep-state",
+        action="store_true",
+        help="Partir do estado anti-spam atual em vez de zerado",
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", dest="json_path", help="Salvar relatório em JSON")
+    args = parser.parse_args()
+
+    if args.end <= args.start:
+        parser.error("--end precisa ser posterior a --start")
+
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:REPLAY")
+    os.environ.setdefault("TELEGRAM_GROUP_CHAT_ID", "0")
+    os.environ["TRACING_ENABLED"] = "false"
+
+    from sqlalchemy import text
+    from src.database.connection import get_session_factory
+    from src.utils.config import get_settings
+
+    if args.mode:
+        get_settings().worker_slim_mode = args.mode == "slim"
+
+    db = get_session_factory()()
+    try:
+        # Transação somente leitura: nenhuma escrita chega ao banco
+        db.execute(text("SET TRANSACTION READ ONLY"))
+        snapshot = load_config_snapshot(db, args.filter_override, args.keep_state)
+        report = replay(
+            db,
+            snapshot,
+            args.start,
+            args.end,
+            args.speed,
+            args.limit,
+            args.batch_size,
+        )
+    finally:
+        db.rollback()
+        db.close()
+
+    report["mode"] = "slim" if get_settings().worker_slim_mode else "orm"
+    report["filter_override"] = args.filter_override
+
+    print(
+        f"{report['signals']} sinais ({report['signals_without_recipients']} sem destinatários) "
+        f"contra {report['configs']} configurações [{report['mode']}]"
+    )
+    print(
+        f"{report['deliveries']} entregas ({report['digest_deliveries']} em resumo) "
+        f"para {report['users_reached']} usuários; por usuário p50 "
+        f"{report['deliveries_per_user']['p50']} p90 {report['deliveries_per_user']['p90']} "
+        f"máx {report['deliveries_per_user']['max']}"
+    )
+    print(
+        f"{report['elapsed_seconds']}s, {report['signals_per_second']} sinais/s; matcher "
+        f"{report['match_signals_per_second']} sinais/s, {report['candidates_per_second']} cand/s, "
+        f"p50 {report['match_ms']['p50']}ms p95 {report['match_ms']['p95']}ms"
+    )
+
+    if args.top and report["per_user"]:
+        print(f"\n{'chat_id':>16} {'entregas':>9}")
+        for chat_id, count in list(report["per_user"].items())[: args.top]:
+            print(f"{chat_id:>16} {count:>9}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 Configurações do projeto BullBot Telegram
 """
 
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 
 
@@ -18,6 +19,9 @@ class Settings(BaseSettings):
     # Chat ID do grupo para envio de sinais
     telegram_group_chat_id: str
 
+    # URL base da Bot API (permite apontar para servidor simulado em testes de carga)
+    telegram_api_base_url: str = "https://api.telegram.org/bot"
+
     # Configurações de Conexão
     telegram_connection_pool_size: int = (
         10  # Pool de conexões HTTP (reduzido para t2.micro)
@@ -27,6 +31,98 @@ class Settings(BaseSettings):
         3  # Máximo de envios simultâneos (reduzido para t2.micro)
     )
 
+    # ===============================================
+    # Dispatch Settings
+    # ===============================================
+
+    # Fan-out em chunks: divide destinatários em tasks de envio separadas
+    dispatch_fanout_enabled: bool = False
+    dispatch_fanout_chunk_size: int = 200  # Destinatários por task de envio
+
+    # Priorização de sinais: busca uma janela maior de candidatos e processa
+    # primeiro os de maior score (força, urgência do timeframe, scores, idade)
+    signal_priority_enabled: bool = True
+    signal_batch_size: int = 50  # Sinais processados por ciclo
+    signal_priority_candidate_limit: int = 200  # Candidatos avaliados por ciclo
+    signal_priority_weight_strength: float = 3.0
+    signal_priority_weight_timeframe: float = 4.0
+    signal_priority_weight_confidence: float = 2.0
+    signal_priority_weight_age: float = 1.0
+
+    # Polling adaptativo: ciclo se reagenda sem espera enquanto há backlog e
+    # recua exponencialmente quando ocioso (o beat fica como watchdog)
+    adaptive_polling_enabled: bool = True
+    polling_min_interval_seconds: float = 1.0
+    polling_base_interval_seconds: float = 10.0  # Após chegada de sinais
+    polling_max_interval_seconds: float = 120.0  # Teto do recuo exponencial
+    polling_backoff_factor: float = 2.0
+    polling_rate_ewma_alpha: float = 0.3
+    polling_chain_grace_seconds: int = 120  # Folga antes do beat assumir
+
+    # Lease exclusivo do ciclo de sinais (renovado a cada 1/3 do TTL)
+    signal_cycle_lock_ttl_seconds: int = 90
+
+    # Idade máxima (minutos) para um sinal ainda ser enviado, por timeframe.
+    # Sinais mais antigos são marcados como processados ("stale") sem fan-out
+    signal_max_age_minutes_15m: int = 30
+    signal_max_age_minutes_1h: int = 120
+    signal_max_age_minutes_4h: int = 480
+    signal_max_age_minutes_1d: int = 1440
+    stale_signal_summary_enabled: bool = False  # Resumo único no grupo fixo
+
+    # Idempotência de entrega por (sinal, chat): retries só enviam o que falta
+    delivery_idempotency_enabled: bool = True
+    delivery_claim_ttl_seconds: int = 120  # Reserva durante o envio
+
+    # Checkpoints por sinal: retries retomam de onde a execução anterior parou
+    dispatch_checkpoint_enabled: bool = True
+    dispatch_checkpoint_interval: int = 50  # Destinatários entre checkpoints
+    dispatch_checkpoint_ttl_seconds: int = 86400  # Também o registro de entregas
+
+    # Poda de chats mortos (bot bloqueado, chat inexistente, bot removido)
+    dead_chat_pruning_enabled: bool = True
+    dead_chat_failure_threshold: int = 3  # Falhas permanentes até desativar
+    dead_chat_failure_ttl_seconds: int = 86400  # Janela de contagem (24h)
+
+    # Modo resumo (digest): janela padrão e máxima em minutos
+    digest_default_window_minutes: int = 5
+    digest_max_window_minutes: int = 60
+
+    # Histogramas de latência ponta a ponta (criação do sinal -> ack do Telegram)
+    delivery_latency_tracking_enabled: bool = True
+
+    # Cache de mensagens renderizadas por (sinal, variante)
+    signal_render_cache_size: int = 512
+
+    # ===============================================
+    # Redis Settings
+    # ===============================================
+
+    redis_url: str = "redis://redis:6379/0"
+
+    # Pools por processo (Redis do compose tem pouca memória e conexões)
+    redis_max_connections: int = 10  # Pool síncrono compartilhado
+    redis_async_max_connections: int = 5  # Pool do cliente assíncrono (por loop)
+    redis_socket_timeout: float = 5.0
+    redis_health_check_interval: int = 30
+
+    # Varredura SCAN de manutenção (orçamento por execução)
+    redis_sweep_budget_ms: int = 50
+    redis_sweep_scan_count: int = 200
+
+    # Histórico de ciclos de monitoramento (stream Redis limitado)
+    monitoring_history_max_cycles: int = 1000
+    monitoring_history_summary_cycles: int = 100  # Janela dos agregados
+
+    # Lotes de símbolos do monitoramento: concorrência dentro do lote e
+    # tamanho adaptado ao custo medido por símbolo (EWMA por exchange)
+    monitoring_symbol_concurrency: int = 10
+    monitoring_batch_target_seconds: float = 10.0  # Duração alvo de um lote
+    monitoring_default_batch_size: int = 50  # Sem custo medido ainda
+    monitoring_batch_min_size: int = 10
+    monitoring_batch_max_size: int = 200
+    monitoring_cost_ewma_alpha: float = 0.3
+
     # ===============================================
     # Celery Settings
     # ===============================================
@@ -45,6 +141,54 @@ class Settings(BaseSettings):
     celery_task_soft_time_limit: int = 180  # Soft limit 3 min
     celery_task_time_limit: int = 300  # Hard limit 5 min
 
+    # Autoscaling por profundidade de fila (workers com --autoscale=max,min)
+    autoscale_tasks_per_process: int = 4  # Tarefas pendentes por processo
+    autoscale_min_processes: int = 1
+    autoscale_max_processes: int = 4  # Teto da recomendação por fila
+    autoscale_poll_seconds: int = 5  # Intervalo de leitura da carga
+
+    # Conexões do Celery com o broker e o result backend
+    celery_broker_pool_limit: int = 2
+    celery_result_backend_max_connections: int = 4
+
+    # ===============================================
+    # Metrics Settings
+    # ===============================================
+
+    # Endpoint Prometheus (/metrics) nos workers e no bot
+    metrics_enabled: bool = True
+    metrics_port: int = 9100  # Processo principal de cada worker Celery
+    metrics_bot_port: int = 9101
+
+    # ===============================================
+    # Tracing Settings
+    # ===============================================
+
+    # Um trace por sinal (busca, elegibilidade, anti-spam, render, envios,
+    # estatísticas) exportado em OTLP/JSON, uma linha por trace
+    tracing_enabled: bool = False
+    tracing_service_name: str = "bullbot-telegram"
+    tracing_export_path: str = "/tmp/bullbot-traces/traces.jsonl"
+    tracing_export_max_bytes: int = 50 * 1024 * 1024  # Rotaciona para .1
+    tracing_min_duration_ms: float = 0.0  # Exporta só traces mais lentos
+    tracing_max_spans_per_trace: int = 2000  # Excedentes são contados e descartados
+
+    # ===============================================
+    # Memory Settings
+    # ===============================================
+
+    # Variação de RSS por estágio do ciclo (fetch, match, send, mark)
+    memory_accounting_enabled: bool = False
+    # Snapshot tracemalloc antes/depois de cada task (só para diagnóstico)
+    memory_tracemalloc_enabled: bool = False
+    memory_tracemalloc_frames: int = 1
+    memory_tracemalloc_top: int = 10  # Linhas de maior alocação reportadas
+
+    # Modo enxuto: consultas só com as colunas usadas (sem identity map do
+    # ORM), configurações lidas em streaming e payloads mínimos no broker
+    worker_slim_mode: bool = False
+    slim_stream_batch_size: int = 500
+
     # ===============================================
     # Logging Settings
     # ===============================================
@@ -57,5 +201,23 @@ class Settings(BaseSettings):
         extra = "ignore"
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Obter as configurações, lidas e validadas do ambiente no primeiro uso"""
+    return Settings()
+
+
+class LazySettings:
+    """
+    Acesso às configurações sem validar o ambiente no import
+
+    Encaminha cada atributo para get_settings(); ferramentas podem ajustar
+    variáveis de ambiente depois do import e antes do primeiro acesso.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+
 # Instância global das configurações
-settings = Settings()
+settings = LazySettings()
@@ -0,0 +1,190 @@
+"""
+Lock distribuído com lease, heartbeat e fencing token - BullBot Telegram
+Garante uma única execução por vez de ciclos que rodam em vários workers e
+recusa escritas de um dono cujo lease já foi assumido por outro
+"""
+
+import threading
+import time
+import uuid
+from typing import Optional
+from src.utils.logger import get_logger
+from src.utils.redis_client import get_redis
+
+logger = get_logger(__name__)
+
+LOCK_KEY_PREFIX = "lease_lock:"
+
+# Estende o lease somente se ele ainda pertence ao dono informado
+EXTEND_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Remove o lock somente se ele ainda pertence ao dono informado
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class StaleLeaseError(Exception):
+    """Escrita recusada: outro dono adquiriu o lease depois deste token"""
+
+
+class Fence:
+    """
+    Fencing token de uma aquisição, repassado às escritas do ciclo
+
+    O token é comparado com o valor atual do contador do lease: se outro
+    worker adquiriu o lease depois, o contador avançou e a escrita é recusada.
+    """
+
+    def __init__(self, key: str, token: int):
+        self.key = key
+        self.token = token
+
+    def is_current(self) -> bool:
+        """Verificar se nenhum outro dono adquiriu o lease desde este token"""
+        value = get_redis().get(self.key)
+        return value is not None and int(value) == self.token
+
+    def check(self) -> None:
+        """
+        Recusar a escrita se o token estiver vencido
+
+        Usado antes do commit de escritas no banco, que não conhece o token:
+        a janela entre a verificação e o commit fica restrita a esse intervalo.
+        """
+        if not self.is_current():
+            raise StaleLeaseError(f"Token {self.token} vencido ({self.key})")
+
+    def pipeline(self):
+        """
+        Pipeline transacional (MULTI) que só executa com o token atual
+
+        O contador fica sob WATCH: se outro dono adquirir o lease antes do
+        execute(), a transação inteira é descartada (WatchError).
+        """
+        pipe = get_redis().pipeline()
+        pipe.watch(self.key)
+        value = pipe.get(self.key)
+        if value is None or int(value) != self.token:
+            pipe.reset()
+            raise StaleLeaseError(f"Token {self.token} vencido ({self.key})")
+        pipe.multi()
+        return pipe
+
+
+class LeaseLock:
+    """
+    Lease Redis (SET NX PX) renovado por uma thread de heartbeat
+
+    Cada aquisição recebe um fencing token crescente (INCR após o SET NX) em
+    self.fence. As escritas do ciclo recebem esse fence e são recusadas se
+    outro worker assumiu o lease depois (processo pausado, heartbeat falhou).
+    """
+
+    def __init__(self, name: str, ttl_seconds: int):
+        self.name = name
+        self.key = f"{LOCK_KEY_PREFIX}{name}"
+        self.fence_key = f"{self.key}:fence"
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.token: Optional[int] = None
+        self.fence: Optional[Fence] = None
+        self._owner: Optional[str] = None
+        self._lost = threading.Event()
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+        self._redis = get_redis()
+        self._extend = self._redis.register_script(EXTEND_SCRIPT)
+        self._release = self._redis.register_script(RELEASE_SCRIPT)
+
+    def acquire(self) -> bool:
+        """
+        Tentar adquirir o lease sem bloquear
+
+        Returns:
+            bool: True se adquirido (token disponível em self.token/self.fence)
+        """
+        try:
+            owner = uuid.uuid4().hex
+
+            if not self._redis.set(self.key, owner, nx=True, px=self.ttl_ms):
+                return False
+
+            # Só quem adquiriu avança o contador: tentativas frustradas não
+            # invalidam o token do dono atual
+            self.token = self._redis.incr(self.fence_key)
+            self.fence = Fence(self.fence_key, self.token)
+            self._owner = owner
+            self._lost.clear()
+            self._stop.clear()
+            self._heartbeat = threading.Thread(
+                target=self._heartbeat_loop,
+                name=f"lease-heartbeat-{self.name}",
+                daemon=True,
+            )
+            self._heartbeat.start()
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Erro ao adquirir lock {self.name}: {e}")
+            return False
+
+    def is_held(self) -> bool:
+        """Verificar se o lease ainda pertence a esta execução"""
+        return self._owner is not None and not self._lost.is_set()
+
+    def release(self) -> None:
+        """Parar o heartbeat e liberar o lease se ainda for o dono"""
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.join(timeout=1)
+
+        if self._owner is None:
+            return
+
+        try:
+            self._release(keys=[self.key], args=[self._owner])
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao liberar lock {self.name}: {e}")
+        finally:
+            self._owner = None
+
+    def _heartbeat_loop(self):
+        """Renovar o lease a cada terço do TTL até release() ou perda"""
+        interval = self.ttl_ms / 3000
+        last_extended = time.monotonic()
+
+        while not self._stop.wait(interval):
+            try:
+                extended = self._extend(
+                    keys=[self.key], args=[self._owner, self.ttl_ms]
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Erro no heartbeat do lock {self.name}: {e}")
+                # Sem renovar por um TTL inteiro o lease pode ter expirado
+                extended = (time.monotonic() - last_extended) * 1000 < self.ttl_ms
+                if extended:
+                    continue
+            else:
+                last_extended = time.monotonic()
+
+            if not extended:
+                logger.error(
+                    f"❌ Lock {self.name} perdido (token {self.token}) - interrompendo escritas"
+                )
+                self._lost.set()
+                return
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
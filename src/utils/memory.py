@@ -0,0 +1,130 @@
+"""
+Contabilidade de memória dos workers - BullBot Telegram
+Variação de RSS por estágio do pipeline e snapshots tracemalloc por task
+"""
+
+import os
+import resource
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+from src.utils.config import settings
+from src.utils.logger import get_logger
+from src.utils.metrics import WORKER_RSS_BYTES
+
+# Relatórios só saem quando habilitados nas configurações, por isso em INFO
+logger = get_logger(__name__, "INFO")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def current_rss_bytes() -> int:
+    """
+    RSS atual do processo
+
+    Lido de /proc/self/statm (Linux); fora dele cai para o pico do getrusage.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryRecorder:
+    """Acumula a variação de RSS de cada estágio de uma execução"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = (
+            settings.memory_accounting_enabled if enabled is None else enabled
+        )
+        self.started_rss = current_rss_bytes() if self.enabled else 0
+        self.stages: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Medir a variação de RSS do bloco, somando ao estágio `name`"""
+        if not self.enabled:
+            yield
+            return
+
+        before = current_rss_bytes()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0) + (
+                current_rss_bytes() - before
+            )
+
+    def report(self) -> Dict[str, Any]:
+        """Resumo em KB: RSS inicial/final e variação por estágio"""
+        if not self.enabled:
+            return {}
+
+        return {
+            "rss_start_kb": self.started_rss // 1024,
+            "rss_end_kb": current_rss_bytes() // 1024,
+            "stages_kb": {name: delta // 1024 for name, delta in self.stages.items()},
+        }
+
+
+class TaskMemoryProfiler:
+    """
+    RSS antes/depois de cada task e, se habilitado, diff de snapshots
+    tracemalloc com as linhas que mais alocaram
+    """
+
+    def __init__(self):
+        self.logger = logger
+        self._started: Dict[str, Any] = {}
+
+    def start(self, task_id: str):
+        rss = current_rss_bytes()
+        snapshot = None
+
+        if settings.memory_tracemalloc_enabled:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(max(1, settings.memory_tracemalloc_frames))
+            tracemalloc.reset_peak()
+            snapshot = tracemalloc.take_snapshot()
+
+        self._started[task_id] = (rss, snapshot)
+
+    def finish(self, task_id: str, task_name: str):
+        rss = current_rss_bytes()
+        WORKER_RSS_BYTES.set(rss)
+
+        started = self._started.pop(task_id, None)
+        if started is None:
+            return
+        started_rss, snapshot = started
+
+        # Snapshot final antes de qualquer log para não contar o próprio relatório
+        stats, peak = None, 0
+        if snapshot is not None and tracemalloc.is_tracing():
+            try:
+                _, peak = tracemalloc.get_traced_memory()
+                ignore_self = (tracemalloc.Filter(False, tracemalloc.__file__),)
+                stats = (
+                    tracemalloc.take_snapshot()
+                    .filter_traces(ignore_self)
+                    .compare_to(snapshot.filter_traces(ignore_self), "lineno")
+                )
+            except Exception as e:
+                self.logger.warning(f"⚠️ Erro ao comparar snapshots tracemalloc: {e}")
+
+        if settings.memory_accounting_enabled:
+            self.logger.info(
+                f"Memória {task_name}: RSS {started_rss // 1024}KB -> {rss // 1024}KB ({(rss - started_rss) // 1024:+d}KB)"
+            )
+
+        if stats is not None:
+            self.logger.info(
+                f"tracemalloc {task_name}: pico {peak // 1024}KB, maiores alocações:"
+            )
+            for stat in stats[: settings.memory_tracemalloc_top]:
+                self.logger.info(f"  {stat}")
+
+
+# Instância global do profiler
+task_memory_profiler = TaskMemoryProfiler()
@@ -0,0 +1,125 @@
+"""
+Métricas Prometheus do pipeline - BullBot Telegram
+Registro único de contadores e histogramas com endpoint HTTP de exposição,
+compatível com os processos filhos do Celery (modo multiprocess)
+"""
+
+import os
+import shutil
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    multiprocess,
+    start_http_server,
+)
+from src.utils.config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Em modo multiprocess os valores são arquivos nesse diretório, criados já na
+# definição das métricas abaixo
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# Buckets em segundos para chamadas rápidas (Redis, banco) e lentas (Telegram)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+API_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+SIGNALS_FETCHED = Counter(
+    "bullbot_signals_fetched_total",
+    "Sinais buscados do banco para processamento",
+)
+SIGNALS_STALE = Counter(
+    "bullbot_signals_stale_total",
+    "Sinais descartados por idade antes do envio",
+)
+SIGNAL_BACKLOG = Gauge(
+    "bullbot_signal_backlog",
+    "Sinais não processados no início do último ciclo",
+    multiprocess_mode="livemostrecent",
+)
+MATCHED_USERS = Histogram(
+    "bullbot_matched_users_per_signal",
+    "Usuários elegíveis por sinal",
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000),
+)
+SENDS = Counter(
+    "bullbot_sends_total",
+    "Envios ao Telegram por resultado e classe de erro",
+    ["result", "error_class"],
+)
+TELEGRAM_API_SECONDS = Histogram(
+    "bullbot_telegram_api_seconds",
+    "Latência das chamadas à Bot API do Telegram",
+    ["method"],
+    buckets=API_BUCKETS,
+)
+DB_QUERY_SECONDS = Histogram(
+    "bullbot_db_query_seconds",
+    "Tempo das queries SQL por tipo de comando",
+    ["statement"],
+    buckets=FAST_BUCKETS,
+)
+WORKER_RSS_BYTES = Gauge(
+    "bullbot_worker_rss_bytes",
+    "RSS do processo ao fim da última task",
+    multiprocess_mode="liveall",
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "bullbot_redis_command_seconds",
+    "Tempo dos comandos Redis diretos (fora de pipelines) por comando",
+    ["command"],
+    buckets=FAST_BUCKETS,
+)
+
+
+def _multiprocess_dir():
+    return os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+
+def reset_multiprocess_dir():
+    """Limpar arquivos de métricas de execuções anteriores (início do worker)"""
+    metrics_dir = _multiprocess_dir()
+    if not metrics_dir:
+        return
+
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def mark_process_dead(pid: int):
+    """Descartar gauges de um processo filho encerrado"""
+    if _multiprocess_dir():
+        multiprocess.mark_process_dead(pid)
+
+
+def start_metrics_server(port: int) -> bool:
+    """
+    Subir endpoint HTTP /metrics em thread de fundo
+
+    Com PROMETHEUS_MULTIPROC_DIR definido, agrega as métricas de todos os
+    processos filhos (pool prefork do Celery).
+
+    Returns:
+        bool: True se o servidor foi iniciado
+    """
+    if not settings.metrics_enabled:
+        return False
+
+    try:
+        if _multiprocess_dir():
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            start_http_server(port, registry=registry)
+        else:
+            start_http_server(port)
+
+        logger.info(f"Métricas Prometheus expostas na porta {port}")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Erro ao iniciar servidor de métricas na porta {port}: {e}")
+        return False
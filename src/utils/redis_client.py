@@ -0,0 +1,139 @@
+"""
+Acesso compartilhado ao Redis - BullBot Telegram
+Um único pool de conexões síncrono por processo e um cliente redis.asyncio
+por event loop para o caminho de envio
+"""
+
+import asyncio
+import time
+import weakref
+from typing import Dict, Any, Optional
+from src.utils.config import settings
+from src.utils.logger import get_logger
+from src.utils.metrics import REDIS_COMMAND_SECONDS
+import redis
+import redis.asyncio as redis_async
+
+logger = get_logger(__name__)
+
+
+def _command_name(args) -> str:
+    name = args[0] if args else "unknown"
+    return (name.decode() if isinstance(name, bytes) else str(name)).upper()
+
+
+class TimedRedis(redis.Redis):
+    """Cliente síncrono que mede o tempo de cada comando direto"""
+
+    def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_SECONDS.labels(command=_command_name(args)).observe(
+                time.perf_counter() - started
+            )
+
+
+class TimedAsyncRedis(redis_async.Redis):
+    """Cliente assíncrono que mede o tempo de cada comando direto"""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_SECONDS.labels(command=_command_name(args)).observe(
+                time.perf_counter() - started
+            )
+
+
+# Pool síncrono compartilhado por todos os serviços do processo. O redis-py
+# recria as conexões automaticamente no processo filho após um fork do Celery
+_sync_pool: Optional[redis.ConnectionPool] = None
+_sync_client: Optional[redis.Redis] = None
+
+# Clientes assíncronos ficam presos ao loop em que foram criados
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis_async.Redis]" = weakref.WeakKeyDictionary()
+
+
+def get_redis() -> redis.Redis:
+    """
+    Obter cliente Redis síncrono ligado ao pool compartilhado
+
+    Nenhuma conexão é aberta até o primeiro comando.
+    """
+    global _sync_pool, _sync_client
+
+    if _sync_client is None:
+        _sync_pool = redis.ConnectionPool.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_timeout,
+            health_check_interval=settings.redis_health_check_interval,
+        )
+        _sync_client = TimedRedis(connection_pool=_sync_pool)
+
+    return _sync_client
+
+
+def get_async_redis() -> redis_async.Redis:
+    """
+    Obter cliente redis.asyncio do event loop em execução
+
+    Deve ser chamado de dentro de uma coroutine. O cliente é reutilizado
+    enquanto o loop existir; use close_async_redis() antes de fechar o loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+
+    if client is None:
+        client = TimedAsyncRedis.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_async_max_connections,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_timeout,
+            health_check_interval=settings.redis_health_check_interval,
+        )
+        _async_clients[loop] = client
+
+    return client
+
+
+async def close_async_redis():
+    """Fechar o cliente assíncrono do loop atual, liberando suas conexões"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.pop(loop, None)
+
+    if client is not None:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao fechar cliente Redis assíncrono: {e}")
+
+
+def _pool_stats(pool) -> Dict[str, Any]:
+    return {
+        "max_connections": pool.max_connections,
+        "created_connections": pool._created_connections,
+        "in_use_connections": len(pool._in_use_connections),
+        "available_connections": len(pool._available_connections),
+    }
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Obter uso dos pools de conexão Redis deste processo"""
+    try:
+        stats = {
+            "sync": _pool_stats(_sync_pool) if _sync_pool else None,
+            "async": [
+                _pool_stats(client.connection_pool)
+                for client in list(_async_clients.values())
+            ],
+        }
+        return stats
+
+    except Exception as e:
+        logger.error(f"❌ Erro ao obter estatísticas do pool Redis: {e}")
+        return {}
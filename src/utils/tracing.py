@@ -0,0 +1,270 @@
+"""
+Tracing do ciclo de vida dos sinais - BullBot Telegram
+Spans leves propagados por contextvars, um trace por sinal, exportados em
+arquivo no formato OTLP/JSON (lido pelo receiver otlpjsonfile do collector)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from src.utils.config import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Códigos de status e tipo de span do OTLP
+STATUS_OK = 1
+STATUS_ERROR = 2
+SPAN_KIND_INTERNAL = 1
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar(
+    "bullbot_current_span", default=None
+)
+
+
+def signal_trace_id(signal_id) -> str:
+    """
+    Trace ID determinístico do sinal
+
+    Retries e chunks de fan-out do mesmo sinal caem no mesmo trace.
+    """
+    return hashlib.sha256(f"bullbot-signal:{signal_id}".encode()).hexdigest()[:32]
+
+
+def _new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+def _otlp_value(value) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class _Trace:
+    """Spans finalizados de um trace, exportados juntos ao fim da raiz"""
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+        self.started = 0
+        self.dropped = 0
+
+    def reserve(self) -> bool:
+        """Reservar espaço para mais um span (limite por trace)"""
+        if self.started >= settings.tracing_max_spans_per_trace:
+            self.dropped += 1
+            return False
+        self.started += 1
+        return True
+
+
+class Span:
+    """Intervalo de tempo nomeado dentro do trace de um sinal"""
+
+    __slots__ = (
+        "trace",
+        "span_id",
+        "parent_span_id",
+        "name",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "status_code",
+        "status_message",
+    )
+
+    def __init__(
+        self,
+        trace: _Trace,
+        name: str,
+        parent_span_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+    ):
+        self.trace = trace
+        self.span_id = _new_span_id()
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = None
+        self.status_code = None
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        self.end_ns = end_ns or time.time_ns()
+        self.trace.spans.append(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        data = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+                if value is not None
+            ],
+        }
+        if self.parent_span_id:
+            data["parentSpanId"] = self.parent_span_id
+        if self.status_code:
+            data["status"] = {"code": self.status_code, "message": self.status_message}
+        return data
+
+
+class FileSpanExporter:
+    """
+    Exportador OTLP/JSON em arquivo: uma linha ExportTraceServiceRequest
+    por trace, com rotação simples por tamanho
+    """
+
+    def __init__(self):
+        self.logger = logger
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": _otlp_value(settings.tracing_service_name),
+                            },
+                            {"key": "process.pid", "value": _otlp_value(os.getpid())},
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "bullbot-telegram"},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        line = json.dumps(payload, separators=(",", ":")) + "\n"
+        path = settings.tracing_export_path
+
+        try:
+            with self._lock:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                if (
+                    os.path.exists(path)
+                    and os.path.getsize(path) >= settings.tracing_export_max_bytes
+                ):
+                    os.replace(path, f"{path}.1")
+                with open(path, "a", encoding="utf-8") as trace_file:
+                    trace_file.write(line)
+
+        except Exception as e:
+            self.logger.warning(f"⚠️ Erro ao exportar trace para {path}: {e}")
+
+
+# Instância global do exportador
+span_exporter = FileSpanExporter()
+
+
+@contextmanager
+def trace_signal(signal_id, name: str = "signal", **attributes):
+    """
+    Abrir o span raiz do trace de um sinal
+
+    Spans abertos dentro do bloco (inclusive em coroutines e em await_sync)
+    viram filhos dele. O trace é exportado ao sair do bloco, se durou ao
+    menos settings.tracing_min_duration_ms.
+    """
+    if not settings.tracing_enabled or signal_id is None:
+        yield None
+        return
+
+    trace = _Trace(signal_trace_id(signal_id))
+    trace.started = 1
+    root = Span(trace, name, attributes={"signal.id": signal_id, **attributes})
+    token = _current_span.set(root)
+
+    try:
+        yield root
+    except BaseException as e:
+        root.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        if trace.dropped:
+            root.set_attribute("tracing.dropped_spans", trace.dropped)
+        root.end()
+
+        duration_ms = (root.end_ns - root.start_ns) / 1_000_000
+        if duration_ms >= settings.tracing_min_duration_ms:
+            span_exporter.export(trace.spans)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Abrir um span filho do span corrente
+
+    Sem trace ativo (tracing desligado ou fora de trace_signal) não faz nada.
+    """
+    parent = _current_span.get()
+    if parent is None or not parent.trace.reserve():
+        yield None
+        return
+
+    current = Span(
+        parent.trace, name, parent_span_id=parent.span_id, attributes=attributes
+    )
+    token = _current_span.set(current)
+
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes) -> None:
+    """
+    Registrar no trace corrente um span já medido
+
+    Usado para etapas compartilhadas por vários sinais (ex.: a busca do lote),
+    medidas uma vez e anexadas ao trace de cada sinal.
+    """
+    parent = _current_span.get()
+    if parent is None or not parent.trace.reserve():
+        return
+
+    Span(
+        parent.trace,
+        name,
+        parent_span_id=parent.span_id,
+        attributes=attributes,
+        start_ns=start_ns,
+    ).end(end_ns)